@@ -3,7 +3,7 @@
 controllers/topology_controller.py
 
 定义 TopologyController 类，负责处理拓扑图画布的用户交互逻辑，
-例如节点选择、拖动、双击详情、Shift+拖拽连接等。
+例如节点选择、拖动、双击详情、Shift+拖拽连接、滚轮缩放和中键拖动平移等。
 使用信号/槽机制与 MainWindow 解耦。
 """
 
@@ -15,11 +15,7 @@ from PySide6.QtCore import QObject, Slot, Qt, Signal # <--- **修复: 添加了
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtWidgets import QMessageBox # 导入 QMessageBox
 
-# Matplotlib imports
-from matplotlib.lines import Line2D
-
-# NetworkX import (可能需要，例如检查图属性)
-import networkx as nx
+# Matplotlib 在创建画布时才导入 (Line2D 在开始绘制连接线时导入)
 
 # 项目模块导入 (使用字符串进行类型提示以避免循环导入)
 if TYPE_CHECKING:
@@ -29,6 +25,9 @@ if TYPE_CHECKING:
     from ui.main_window import MainWindow
     from ui.topology_canvas import MplCanvas
 
+ZOOM_STEP = 1.2 # 滚轮每一格的缩放倍数
+
+
 class TopologyController(QObject):
     """处理拓扑图画布交互的控制器。"""
 
@@ -38,15 +37,16 @@ class TopologyController(QObject):
     request_device_details = Signal(object)
     connection_attempt_failed = Signal(str, str)
     enable_fill_buttons = Signal(bool)
+    selection_changed = Signal(object) # 仅选中节点变化 (Optional[int])，只需重新设置高亮样式
 
-    def __init__(self, main_window: 'MainWindow', network_manager: 'NetworkManager', mpl_canvas: 'MplCanvas', parent: Optional[QObject] = None):
+    def __init__(self, main_window: 'MainWindow', network_manager: 'NetworkManager', mpl_canvas: Optional['MplCanvas'], parent: Optional[QObject] = None):
         """
         初始化 TopologyController。
 
         Args:
             main_window ('MainWindow'): 主窗口实例的引用 (主要用于信号连接，尽量减少直接调用)。
             network_manager ('NetworkManager'): 网络管理器实例的引用。
-            mpl_canvas ('MplCanvas'): Matplotlib 画布实例的引用。
+            mpl_canvas ('MplCanvas'): Matplotlib 画布实例的引用，画布延迟创建时为 None (之后调用 set_canvas)。
             parent (Optional[QObject]): 父对象 (通常为 None 或 main_window)。
         """
         super().__init__(parent)
@@ -61,7 +61,13 @@ class TopologyController(QObject):
         self.dragged_node_id: Optional[int] = None
         self.drag_offset: Tuple[float, float] = (0, 0)
         self.connecting_node_id: Optional[int] = None
-        self.connection_line: Optional[Line2D] = None
+        self.connection_line: Optional[Any] = None # 连接拖动时的虚线 (Line2D)
+        # 中键平移起点: (像素 x, 像素 y, 起始视口范围)
+        self.pan_start: Optional[Tuple[float, float, Tuple[float, float, float, float]]] = None
+
+    def set_canvas(self, mpl_canvas: 'MplCanvas'):
+        """设置延迟创建的画布 (画布事件只有在画布创建后才会产生)。"""
+        self.mpl_canvas = mpl_canvas
 
     # --- 公共方法 (供 MainWindow 获取状态) ---
     # !! 新增 Getter 方法 !!
@@ -80,6 +86,8 @@ class TopologyController(QObject):
         self.selected_node_id = None
         self.dragged_node_id = None
         self.connecting_node_id = None
+        self.pan_start = None
+        if self.mpl_canvas is not None: self.mpl_canvas.view_limits = None # 布局重置后显示完整视图
         self.view_needs_update.emit()
 
 
@@ -111,7 +119,7 @@ class TopologyController(QObject):
         if self.selected_node_id != node_id:
             self.selected_node_id = node_id
             print(f"选中节点 (准备拖动): ID={self.selected_node_id}")
-            self.view_needs_update.emit() # 发射信号
+            self.selection_changed.emit(node_id) # 发射信号
         else: print(f"开始拖动节点: ID={self.selected_node_id}")
 
     def _start_connection_drag(self, node_id: int):
@@ -122,15 +130,15 @@ class TopologyController(QObject):
         self.connecting_node_id = node_id; self.dragged_node_id = None
         if self.selected_node_id != node_id:
             self.selected_node_id = node_id
-            self.view_needs_update.emit() # 发射信号
+            self.selection_changed.emit(node_id) # 发射信号
 
     def _handle_background_press(self):
         """辅助函数：处理画布背景点击，清除选择和拖动状态。"""
-        needs_update = self.selected_node_id is not None or self.dragged_node_id is not None or self.connecting_node_id is not None
+        needs_update = self.selected_node_id is not None
         self.selected_node_id = None; self.dragged_node_id = None; self.connecting_node_id = None
         if needs_update:
             print("清除选中/状态 (点击背景)")
-            self.view_needs_update.emit() # 发射信号
+            self.selection_changed.emit(None) # 发射信号
 
     def _end_node_drag(self):
         """辅助函数：结束节点拖动。"""
@@ -171,12 +179,37 @@ class TopologyController(QObject):
             self.view_needs_update.emit()
 
 
+    def _start_pan(self, event):
+        """辅助函数：开始中键拖动平移，记录像素坐标 (平移过程中数据坐标会随视口变化)。"""
+        limits = self.mpl_canvas.get_view_limits()
+        if limits is None: return
+        self.pan_start = (event.x, event.y, limits)
+
+    def _update_pan(self, event):
+        """辅助函数：根据鼠标像素位移平移视口。"""
+        start_x, start_y, (x0, x1, y0, y1) = self.pan_start
+        bbox = self.mpl_canvas.axes.bbox
+        if bbox.width <= 0 or bbox.height <= 0: return
+        dx = (event.x - start_x) * (x1 - x0) / bbox.width
+        dy = (event.y - start_y) * (y1 - y0) / bbox.height
+        self.mpl_canvas.set_view_limits((x0 - dx, x1 - dx, y0 - dy, y1 - dy))
+
     # --- 作为槽函数连接到 MplCanvas 信号 ---
+    @Slot(object)
+    def on_canvas_scroll(self, event):
+        """处理画布上的滚轮事件：以鼠标位置为中心缩放。"""
+        if event.inaxes != self.mpl_canvas.axes or event.xdata is None or event.ydata is None: return
+        self.mpl_canvas.zoom_at(event.xdata, event.ydata, ZOOM_STEP ** -event.step)
+
     @Slot(object)
     def on_canvas_press(self, event):
         """处理画布上的鼠标按下事件。"""
         # !! 添加调试 Print !!
         print(f"DEBUG: on_canvas_press triggered: button={event.button}, xdata={event.xdata}, ydata={event.ydata}, dblclick={event.dblclick}")
+        if event.button == 2:
+            if event.dblclick: self.mpl_canvas.reset_view() # 中键双击恢复完整视图
+            elif event.inaxes == self.mpl_canvas.axes: self._start_pan(event)
+            return
         if self.connection_line:
             try: self.connection_line.remove(); self.connection_line = None
             except ValueError: pass
@@ -204,6 +237,8 @@ class TopologyController(QObject):
         """处理画布上的鼠标移动事件。"""
         # !! 添加调试 Print (可选，可能输出过多) !!
         # print(f"DEBUG: on_canvas_motion triggered: xdata={event.xdata}, ydata={event.ydata}, button={event.button}")
+        if self.pan_start is not None:
+            self._update_pan(event); return
         if event.inaxes != self.mpl_canvas.axes or event.xdata is None or event.ydata is None: return
         x, y = event.xdata, event.ydata
 
@@ -220,6 +255,7 @@ class TopologyController(QObject):
                     try: self.connection_line.remove(); self.connection_line = None
                     except ValueError: pass
                     except AttributeError: self.connection_line = None
+                from matplotlib.lines import Line2D # 画布已创建，Matplotlib 已导入
                 self.connection_line = Line2D([start_pos[0], x], [start_pos[1], y], ls='--', c='gray', lw=1.5, transform=self.mpl_canvas.axes.transData, zorder=10)
                 self.mpl_canvas.axes.add_line(self.connection_line)
                 self.mpl_canvas.draw_idle()
@@ -230,6 +266,8 @@ class TopologyController(QObject):
         """处理画布上的鼠标释放事件。"""
         # !! 添加调试 Print !!
         print(f"DEBUG: on_canvas_release triggered: button={event.button}, xdata={event.xdata}, ydata={event.ydata}")
+        if event.button == 2:
+            self.pan_start = None; return
         if event.button == 1:
             if self.dragged_node_id is not None: self._end_node_drag()
             elif self.connecting_node_id is not None: self._end_connection_drag(event)
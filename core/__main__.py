@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+core/__main__.py
+
+允许通过 python -m core 运行命令行计算器 (见 core/cli.py)。
+"""
+import sys
+
+from .cli import main
+
+# batch 子命令的工作进程在 spawn 模式下会重新导入主模块，此时不能再次运行命令行
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""
+core/cli.py
+
+MediorNet TDM 连接计算器的命令行入口 (python -m core)。
+加载项目文件，运行 Mesh / 环形计算或填充剩余端口，并输出项目 JSON、CSV/TXT/JSON Lines 连接列表、GraphML、
+每个设备的配线表、HTML 报告或文本报告。
+本模块只依赖 core 和 utils.export_writers，不导入 PySide6 或 Matplotlib，可在没有显示器的服务器上运行。
+
+import 子命令将 CSV 连接列表 (导出 CSV 的格式) 导入项目，一次列出全部无效行。
+batch 子命令在多个工作进程中并行处理一批项目文件，每个项目使用独立的 NetworkManager，并输出汇总表；
+同时请求的多种连接列表格式 (EXPORT_FORMATS) 通过一次遍历写出。
+
+示例:
+    python -m core solve "17 x UHD.json" --mode mesh -o connections.csv
+    python -m core solve "5 x UHD.json" --mode fill --style ring --format json -o filled.json
+    python -m core import "17 x UHD.json" cabling.csv -o imported.json
+    python -m core batch projects/ "variants/*.json" --output-dir out --formats json,csv,html
+    python -m core batch job.json --mode fill --output-dir out --formats csv,txt,jsonl,graphml,patch
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import os
+import random
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, IO, List, NamedTuple, Optional, Sequence, Tuple
+
+from .network_manager import NetworkManager, ConnectionType
+from .connection_import import import_connections_csv, format_import_issues
+from .project_io import BINARY_EXTENSION, COMPRESSION_EXTENSIONS, write_binary_project, open_project_text
+from utils.export_writers import (write_connections_csv, write_connections_txt, write_connections_jsonl, write_connections_graphml,
+                                  write_text_report, write_html_report, write_connection_exports, EXPORT_FORMATS)
+
+# --- 常量 ---
+MODES = ('mesh', 'ring', 'fill')            # 计算模式：Mesh、环形、填充剩余端口
+FILL_STYLES = ('mesh', 'ring')              # 填充风格
+OUTPUT_FORMATS = ('json', 'tdmc', 'csv', 'txt', 'jsonl', 'graphml', 'patch', 'html', 'report')
+BINARY_FORMATS = ('tdmc', 'patch')          # 只能写入文件、不能写到标准输出的格式 (patch 写入目录，每个设备一个配线表)
+FORMAT_BY_EXTENSION = {'.json': 'json', '.tdmc': 'tdmc', '.csv': 'csv', '.txt': 'txt', '.jsonl': 'jsonl',
+                       '.graphml': 'graphml', '.html': 'html'} # 未指定 --format 时按扩展名推断
+EXTENSION_BY_FORMAT = {'json': '.json', 'tdmc': '.tdmc', 'csv': '.csv', 'txt': '.txt', 'jsonl': '.jsonl', 'graphml': '.graphml',
+                       'patch': '_patch_sheets', 'html': '.html', 'report': '.report.txt'}
+BATCH_DEFAULT_FORMATS = 'json,csv'          # batch 子命令默认输出的格式
+# batch 子命令处理目录时匹配的项目文件 (与 NetworkManager.load_project() 支持的格式一致)
+PROJECT_FILE_PATTERNS = ('*.json', *('*.json' + extension for extension in COMPRESSION_EXTENSIONS), '*' + BINARY_EXTENSION)
+EXIT_OK = 0
+EXIT_ERROR = 1                              # 项目文件无法加载或输出文件无法写入 (参数错误时 argparse 以 2 退出)
+# --- 结束常量 ---
+
+
+def solve(network_manager: NetworkManager, mode: str, style: str = 'mesh') -> Tuple[List[ConnectionType], Optional[str]]:
+    """
+    在管理器上运行一次计算，与主窗口中对应按钮的行为一致。
+
+    mesh / ring 先清空已有连接再应用计算结果；fill 保留已有连接，只填充剩余端口。
+
+    Args:
+        network_manager (NetworkManager): 已加载项目的管理器。
+        mode (str): 'mesh'、'ring' 或 'fill'。
+        style (str): fill 模式下的填充风格，'mesh' 或 'ring'。
+
+    Returns:
+        Tuple[List[ConnectionType], Optional[str]]: (本次新增的连接, 警告信息或 None)。
+    """
+    if mode == 'fill':
+        if style == 'ring':
+            return network_manager.fill_connections_ring(), None
+        return network_manager.fill_connections_mesh(), None
+
+    network_manager.clear_connections()
+    error_message = None
+    if mode == 'ring':
+        calculated, error_message = network_manager.calculate_ring()
+    else:
+        calculated = network_manager.calculate_mesh()
+    return network_manager.apply_connections(calculated), error_message
+
+
+def write_output(stream: IO[str], network_manager: NetworkManager, output_format: str, group_by_device: bool = False):
+    """
+    按指定格式将管理器的当前状态写入文本流。
+
+    Args:
+        stream (IO[str]): 输出流。
+        network_manager (NetworkManager): 网络管理器。
+        output_format (str): OUTPUT_FORMATS 中除 BINARY_FORMATS 以外的格式。
+        group_by_device (bool): HTML 报告是否按设备分组列出连接 (否则连接较多时分页)。
+    """
+    connections = network_manager.get_all_connections()
+    if output_format == 'json':
+        json.dump(network_manager.to_project_dict(), stream, indent=4, ensure_ascii=False)
+        stream.write("\n")
+    elif output_format == 'csv':
+        write_connections_csv(stream, connections)
+    elif output_format == 'txt':
+        write_connections_txt(stream, connections)
+    elif output_format == 'jsonl':
+        write_connections_jsonl(stream, connections)
+    elif output_format == 'graphml':
+        write_connections_graphml(stream, network_manager.get_all_devices(), connections)
+    elif output_format == 'html':
+        write_html_report(stream, connections, group_by_device=group_by_device) # 命令行不绘制拓扑图，报告只包含连接列表
+    else:
+        write_text_report(stream, network_manager.get_all_devices(), connections,
+                          network_manager.calculate_port_totals())
+
+
+def write_output_file(filepath: str, network_manager: NetworkManager, output_format: str, group_by_device: bool = False):
+    """
+    按指定格式将管理器的当前状态写入文件 (包括二进制项目格式；patch 格式的路径为目录)。
+    文本格式的文件名以 .gz / .xz 结尾时 (例如 plan.json.gz) 通过对应的压缩流写出。
+
+    Args:
+        filepath (str): 输出文件路径。
+        network_manager (NetworkManager): 网络管理器。
+        output_format (str): OUTPUT_FORMATS 之一。
+        group_by_device (bool): HTML 报告是否按设备分组列出连接。
+    """
+    if output_format == 'tdmc':
+        write_binary_project(filepath, network_manager.get_all_devices(), network_manager.get_all_connections(), network_manager.view_state)
+        return
+    if output_format == 'patch':
+        write_connection_exports({'patch': filepath}, network_manager.get_all_devices(), network_manager.get_all_connections())
+        return
+    with open_project_text(filepath, 'w', newline='') as f:
+        write_output(f, network_manager, output_format, group_by_device)
+
+
+def _resolve_format(output: Optional[str], output_format: Optional[str]) -> str:
+    """确定输出格式：优先使用 --format，否则按输出文件扩展名推断，默认为文本报告。"""
+    if output_format:
+        return output_format
+    if output and output != '-':
+        base, extension = os.path.splitext(output)
+        if extension.lower() in COMPRESSION_EXTENSIONS: # plan.json.gz 按 .json 推断
+            base, extension = os.path.splitext(base)
+        return FORMAT_BY_EXTENSION.get(extension.lower(), 'report')
+    return 'report'
+
+
+def _run_solve(args: argparse.Namespace) -> int:
+    """执行 solve 子命令。"""
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    # 管理器的进度信息输出到 stderr (或在 --quiet 时丢弃)，保持 stdout 只包含结果
+    log_stream = io.StringIO() if args.quiet else sys.stderr
+    network_manager = NetworkManager()
+    with contextlib.redirect_stdout(log_stream):
+        if not network_manager.load_project(args.project):
+            print(f"错误: 无法加载项目文件: {args.project}", file=sys.stderr)
+            return EXIT_ERROR
+        start = time.perf_counter()
+        added, warning = solve(network_manager, args.mode, args.style)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    if warning:
+        print(f"警告: {warning}", file=sys.stderr)
+    if not args.quiet:
+        print(f"{args.mode}: 新增 {len(added)} 条连接，共 {len(network_manager.get_all_connections())} 条 "
+              f"({len(network_manager.get_all_devices())} 个设备，耗时 {elapsed_ms:.1f} ms)", file=sys.stderr)
+
+    return _write_result(args, network_manager)
+
+
+def _write_result(args: argparse.Namespace, network_manager: NetworkManager) -> int:
+    """按 -o / --format 写出结果 (solve 和 import 子命令共用)，返回退出码。"""
+    output_format = _resolve_format(args.output, args.format)
+    if args.output and args.output != '-':
+        write_output_file(args.output, network_manager, output_format, args.group_by_device)
+        if not args.quiet:
+            print(f"结果已写入: {args.output}", file=sys.stderr)
+    elif output_format in BINARY_FORMATS:
+        print(f"错误: {output_format} 格式需要用 -o 指定输出文件。", file=sys.stderr)
+        return EXIT_ERROR
+    else:
+        write_output(sys.stdout, network_manager, output_format, args.group_by_device)
+    return EXIT_OK
+
+
+def _run_import(args: argparse.Namespace) -> int:
+    """执行 import 子命令: 将 CSV 连接列表导入项目，列出全部无效行，写出结果。"""
+    log_stream = io.StringIO() if args.quiet else sys.stderr
+    network_manager = NetworkManager()
+    with contextlib.redirect_stdout(log_stream):
+        if not network_manager.load_project(args.project):
+            print(f"错误: 无法加载项目文件: {args.project}", file=sys.stderr)
+            return EXIT_ERROR
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(log_stream):
+            result, added = import_connections_csv(network_manager, args.connections, apply_partial=not args.strict)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+    except (OSError, ValueError) as e:
+        print(f"错误: 无法读取连接列表 {args.connections}: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if result.issues:
+        print(format_import_issues(result.issues, None), file=sys.stderr)
+    if not args.quiet:
+        print(f"导入 {len(added)} 条连接 (共 {result.rows} 行，{len(result.issues)} 行有错误，耗时 {elapsed_ms:.1f} ms)", file=sys.stderr)
+    if result.issues and args.strict:
+        print("错误: 连接列表中有无效行，未导入任何连接 (--strict)。", file=sys.stderr)
+        return EXIT_ERROR
+    exit_code = _write_result(args, network_manager)
+    return EXIT_ERROR if result.issues else exit_code
+
+
+# --- 批量处理 ---
+
+class BatchResult(NamedTuple):
+    """
+    批量处理中单个项目的结果 (由工作进程返回，需可被 pickle)。
+
+    Attributes:
+        project (str): 项目文件路径。
+        devices (int): 设备数。
+        connections (int): 计算后的连接总数。
+        connected_pairs (int): 至少有一条连接的设备对数。
+        total_pairs (int): 设备对总数。
+        min_links (int): 已连接设备对中每对的最少链路数。
+        max_links (int): 已连接设备对中每对的最多链路数。
+        unused_ports (int): 计算后仍未使用的端口数。
+        solve_ms (float): 计算耗时 (毫秒，不含加载和写出)。
+        outputs (Tuple[str, ...]): 已写出的输出文件。
+        warning (Optional[str]): 计算警告 (例如环形未闭合)。
+        error (Optional[str]): 处理失败时的错误信息。
+    """
+    project: str
+    devices: int = 0
+    connections: int = 0
+    connected_pairs: int = 0
+    total_pairs: int = 0
+    min_links: int = 0
+    max_links: int = 0
+    unused_ports: int = 0
+    solve_ms: float = 0.0
+    outputs: Tuple[str, ...] = ()
+    warning: Optional[str] = None
+    error: Optional[str] = None
+
+
+def expand_project_paths(inputs: Sequence[str]) -> List[str]:
+    """
+    展开命令行给出的项目路径：目录取其中所有项目文件 (PROJECT_FILE_PATTERNS: *.json、*.json.gz、*.json.xz 和 *.tdmc)，
+    包含通配符的模式按 glob 展开 (支持 **)。
+
+    Args:
+        inputs (Sequence[str]): 文件、目录或通配符模式。
+
+    Returns:
+        List[str]: 去重后的项目文件列表，保持输入顺序 (同一目录/模式内按名称排序)。
+    """
+    paths: List[str] = []
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(path for pattern in PROJECT_FILE_PATTERNS for path in glob.glob(os.path.join(item, pattern)))
+        elif any(ch in item for ch in '*?['):
+            matches = sorted(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [item]
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def _output_stems(paths: Sequence[str]) -> List[str]:
+    """为每个项目生成输出文件名 (不含扩展名)，不同目录下的同名项目追加序号以免互相覆盖。"""
+    stems: List[str] = []
+    used: Dict[str, int] = {}
+    for path in paths:
+        stem, extension = os.path.splitext(os.path.basename(path))
+        if extension.lower() in COMPRESSION_EXTENSIONS: # plan.json.gz 的输出文件名同 plan.json
+            stem = os.path.splitext(stem)[0]
+        count = used.get(stem, 0) + 1
+        used[stem] = count
+        stems.append(stem if count == 1 else f"{stem}-{count}")
+    return stems
+
+
+def _summarize(project: str, network_manager: NetworkManager, solve_ms: float,
+               outputs: Tuple[str, ...], warning: Optional[str]) -> BatchResult:
+    """统计设备对的链路数和未使用端口数。"""
+    links_per_pair: Dict[Tuple[int, int], int] = {}
+    for dev1, _, dev2, _, _ in network_manager.get_all_connections():
+        pair = (dev1.id, dev2.id) if dev1.id < dev2.id else (dev2.id, dev1.id)
+        links_per_pair[pair] = links_per_pair.get(pair, 0) + 1
+    devices = network_manager.get_all_devices()
+    return BatchResult(
+        project=project,
+        devices=len(devices),
+        connections=len(network_manager.get_all_connections()),
+        connected_pairs=len(links_per_pair),
+        total_pairs=len(devices) * (len(devices) - 1) // 2,
+        min_links=min(links_per_pair.values(), default=0),
+        max_links=max(links_per_pair.values(), default=0),
+        unused_ports=sum(len(dev.get_all_available_ports()) for dev in devices),
+        solve_ms=solve_ms,
+        outputs=outputs,
+        warning=warning)
+
+
+def solve_project_file(project: str, output_dir: str, output_stem: str, mode: str, style: str,
+                       formats: Sequence[str], seed: Optional[int]) -> BatchResult:
+    """
+    加载、计算并写出一个项目 (在工作进程中运行，每次调用使用独立的 NetworkManager)。
+
+    Args:
+        project (str): 项目文件路径。
+        output_dir (str): 输出目录。
+        output_stem (str): 输出文件名 (不含扩展名)。
+        mode (str): 计算模式，见 solve()。
+        style (str): fill 模式的填充风格。
+        formats (Sequence[str]): 要写出的格式 (OUTPUT_FORMATS 的子集)。
+        seed (Optional[int]): 随机种子；给定时每个项目的结果与处理顺序和进程数无关。
+
+    Returns:
+        BatchResult: 处理结果；任何异常都记录在 error 中，不会中断整个批次。
+    """
+    if seed is not None:
+        random.seed(seed)
+    network_manager = NetworkManager()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # 丢弃管理器的进度信息
+            if not network_manager.load_project(project):
+                return BatchResult(project=project, error="无法加载项目文件")
+            start = time.perf_counter()
+            _, warning = solve(network_manager, mode, style)
+            solve_ms = (time.perf_counter() - start) * 1000.0
+
+        outputs = []
+        list_outputs: Dict[str, str] = {} # 连接列表格式通过一次遍历同时写出
+        for output_format in formats:
+            output_path = os.path.join(output_dir, output_stem + EXTENSION_BY_FORMAT[output_format])
+            if os.path.abspath(output_path) == os.path.abspath(project):
+                raise ValueError(f"输出文件会覆盖输入项目: {output_path}")
+            if output_format in EXPORT_FORMATS:
+                list_outputs[output_format] = output_path
+            else:
+                write_output_file(output_path, network_manager, output_format)
+            outputs.append(output_path)
+        if list_outputs:
+            write_connection_exports(list_outputs, network_manager.get_all_devices(), network_manager.get_all_connections())
+        return _summarize(project, network_manager, solve_ms, tuple(outputs), warning)
+    except Exception as e:
+        return BatchResult(project=project, error=str(e))
+
+
+def _display_width(text: str) -> int:
+    """返回文本在终端中的显示宽度 (中文等宽字符计为 2)。"""
+    return sum(2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1 for ch in text)
+
+
+def format_summary_table(results: Sequence[BatchResult]) -> str:
+    """
+    生成批量处理的汇总表。
+
+    Args:
+        results (Sequence[BatchResult]): 各项目的处理结果。
+
+    Returns:
+        str: 按列对齐的文本表格。
+    """
+    header = ["项目", "设备", "连接", "已连设备对", "每对链路", "未用端口", "耗时(ms)", "状态"]
+    rows = []
+    for r in results:
+        if r.error:
+            rows.append([os.path.basename(r.project), "-", "-", "-", "-", "-", "-", f"错误: {r.error}"])
+            continue
+        links = f"{r.min_links}-{r.max_links}" if r.connected_pairs else "-"
+        status = f"警告: {r.warning}" if r.warning else "成功"
+        rows.append([os.path.basename(r.project), str(r.devices), str(r.connections),
+                     f"{r.connected_pairs}/{r.total_pairs}", links, str(r.unused_ports), f"{r.solve_ms:.1f}", status])
+    widths = [max(_display_width(row[i]) for row in [header] + rows) for i in range(len(header) - 1)]
+    lines = []
+    for row in [header] + rows:
+        cells = [cell + " " * (width - _display_width(cell)) for cell, width in zip(row, widths)]
+        lines.append("  ".join(cells + [row[-1]]))
+        if row is header:
+            lines.append("  ".join("-" * width for width in widths + [_display_width(header[-1])]))
+    return "\n".join(lines)
+
+
+def write_summary_csv(filepath: str, results: Sequence[BatchResult]):
+    """将批量处理结果写入 CSV 文件 (每个项目一行)。"""
+    with open(filepath, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["项目", "设备", "连接", "已连设备对", "设备对总数", "每对最少链路", "每对最多链路",
+                         "未用端口", "耗时(ms)", "警告", "错误"])
+        for r in results:
+            writer.writerow([r.project, r.devices, r.connections, r.connected_pairs, r.total_pairs, r.min_links,
+                             r.max_links, r.unused_ports, f"{r.solve_ms:.3f}", r.warning or "", r.error or ""])
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    """执行 batch 子命令。"""
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in OUTPUT_FORMATS]
+    if unknown or not formats:
+        print(f"错误: 无效的输出格式: {', '.join(unknown) or args.formats} (可选: {', '.join(OUTPUT_FORMATS)})", file=sys.stderr)
+        return EXIT_ERROR
+    paths = expand_project_paths(args.inputs)
+    if not paths:
+        print("错误: 没有找到项目文件。", file=sys.stderr)
+        return EXIT_ERROR
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    tasks = [(path, args.output_dir, stem, args.mode, args.style, formats, args.seed)
+             for path, stem in zip(paths, _output_stems(paths))]
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(tasks)))
+    results: List[Optional[BatchResult]] = [None] * len(tasks)
+    start = time.perf_counter()
+    if workers == 1:
+        # 单进程时直接在当前进程处理，省去启动工作进程的开销
+        for i, task in enumerate(tasks):
+            results[i] = solve_project_file(*task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(solve_project_file, *task): i for i, task in enumerate(tasks)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if not args.quiet:
+                    print(f"[{done}/{len(tasks)}] {tasks[futures[future]][0]}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    print(format_summary_table(results))
+    if args.summary:
+        write_summary_csv(args.summary, results)
+    if not args.quiet:
+        print(f"共处理 {len(results)} 个项目，{workers} 个进程，耗时 {elapsed:.2f} s "
+              f"({len(results) / elapsed if elapsed > 0 else 0.0:.1f} 个/秒)", file=sys.stderr)
+    return EXIT_ERROR if any(r.error for r in results) else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器。"""
+    parser = argparse.ArgumentParser(
+        prog='python -m core',
+        description="MediorNet TDM 连接计算器 (命令行版，无需图形界面)。")
+    subparsers = parser.add_subparsers(dest='command', metavar='命令')
+    subparsers.required = True
+
+    solve_parser = subparsers.add_parser('solve', help="加载项目并计算连接")
+    solve_parser.add_argument('project', help="项目文件 (JSON 或 .tdmc 二进制格式，JSON 也可为仅包含设备列表的旧格式)")
+    solve_parser.add_argument('--mode', choices=MODES, default='mesh',
+                              help="mesh / ring: 清空已有连接后重新计算；fill: 保留已有连接并填充剩余端口 (默认: mesh)")
+    solve_parser.add_argument('--style', choices=FILL_STYLES, default='mesh', help="fill 模式的填充风格 (默认: mesh)")
+    solve_parser.add_argument('-o', '--output', help="输出文件，省略或为 '-' 时写到标准输出")
+    solve_parser.add_argument('--format', choices=OUTPUT_FORMATS,
+                              help="输出格式 (默认按输出文件扩展名推断: .json/.tdmc/.csv/.txt/.jsonl/.graphml/.html，"
+                                   "可再加 .gz/.xz 压缩，其余为文本报告；patch 将每个设备的配线表写入 -o 指定的目录)")
+    solve_parser.add_argument('--group-by-device', action='store_true', help="HTML 报告按设备分组列出连接 (默认按序号分页)")
+    solve_parser.add_argument('--seed', type=int, help="随机种子，使 Mesh 计算结果可复现")
+    solve_parser.add_argument('-q', '--quiet', action='store_true', help="不输出进度信息")
+    solve_parser.set_defaults(handler=_run_solve)
+
+    import_parser = subparsers.add_parser('import', help="将 CSV 连接列表导入项目 (导出 CSV 的逆操作)")
+    import_parser.add_argument('project', help="项目文件，CSV 中的设备按名称与项目中的设备匹配")
+    import_parser.add_argument('connections', help="CSV 连接列表 (序号, 设备1, 端口1, 设备2, 端口2, 连接类型)")
+    import_parser.add_argument('-o', '--output', help="输出文件，省略或为 '-' 时写到标准输出")
+    import_parser.add_argument('--format', choices=OUTPUT_FORMATS, help="输出格式，同 solve")
+    import_parser.add_argument('--group-by-device', action='store_true', help="HTML 报告按设备分组列出连接")
+    import_parser.add_argument('--strict', action='store_true', help="有任何无效行时不导入任何连接")
+    import_parser.add_argument('-q', '--quiet', action='store_true', help="不输出进度信息")
+    import_parser.set_defaults(handler=_run_import)
+
+    batch_parser = subparsers.add_parser('batch', help="并行处理多个项目文件并输出汇总表")
+    batch_parser.add_argument('inputs', nargs='+', help="项目文件、目录 (处理其中所有 *.json、*.json.gz、*.json.xz 和 *.tdmc) 或通配符模式")
+    batch_parser.add_argument('--output-dir', required=True, help="输出目录，每个项目按原文件名写出各格式的结果")
+    batch_parser.add_argument('--mode', choices=MODES, default='mesh', help="计算模式，同 solve (默认: mesh)")
+    batch_parser.add_argument('--style', choices=FILL_STYLES, default='mesh', help="fill 模式的填充风格 (默认: mesh)")
+    batch_parser.add_argument('--formats', default=BATCH_DEFAULT_FORMATS,
+                              help=f"逗号分隔的输出格式，可选 {', '.join(OUTPUT_FORMATS)} (默认: {BATCH_DEFAULT_FORMATS})")
+    batch_parser.add_argument('-j', '--workers', type=int, help="工作进程数 (默认: CPU 核心数)")
+    batch_parser.add_argument('--summary', help="同时将汇总表写入此 CSV 文件")
+    batch_parser.add_argument('--seed', type=int, help="随机种子 (每个项目独立使用)，使结果可复现")
+    batch_parser.add_argument('-q', '--quiet', action='store_true', help="不输出进度信息")
+    batch_parser.set_defaults(handler=_run_batch)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口。
+
+    Args:
+        argv (Optional[List[str]]): 命令行参数 (不含程序名)，默认为 sys.argv[1:]。
+
+    Returns:
+        int: 进程退出码。
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # 标准输出被提前关闭 (例如管道到 head)，不视为错误；避免解释器退出时再次刷新失败
+        sys.stdout = open(os.devnull, 'w')
+        return EXIT_OK
+    except OSError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_ERROR
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+core/connection_import.py
+
+从 CSV 连接列表导入连接，是导出 CSV (utils.export_writers.write_connections_csv) 的逆操作。
+每行的列为: 序号, 设备1, 端口1, 设备2, 端口2, 连接类型 (第一行为表头时自动跳过，连接类型可留空)。
+
+导入分为两步:
+    1. validate_connection_rows() 通过设备名称索引解析设备，一次遍历校验全部行
+       (端口是否存在、是否已被占用或在文件中重复使用、端口兼容性)，收集每一行的错误，不修改管理器；
+    2. NetworkManager.add_connections_bulk() 在一次批量修改中添加全部有效连接。
+"""
+import csv
+import io
+from typing import Dict, IO, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+from .device import get_port_type_from_name
+from .network_manager import port_compatibility
+
+if TYPE_CHECKING:
+    from .device import Device
+    from .network_manager import NetworkManager, ConnectionType
+
+# --- 常量 ---
+IMPORT_MIN_COLUMNS = 5          # 序号, 设备1, 端口1, 设备2, 端口2 (连接类型可省略)
+IMPORT_ENCODINGS = ('utf-8-sig', 'gb18030') # 依次尝试的文件编码 (Excel 另存的 CSV 可能带 BOM 或为 GBK 编码)
+ISSUE_DISPLAY_LIMIT = 20        # format_import_issues() 默认最多列出的错误数
+# --- 结束常量 ---
+
+# CSV 中的一行: (行号, 单元格)
+CsvRow = Tuple[int, List[str]]
+
+
+class ImportIssue(NamedTuple):
+    """导入时发现的一个错误。"""
+    line: int     # CSV 文件中的行号 (从 1 开始)
+    message: str
+
+
+class ConnectionImportResult(NamedTuple):
+    """
+    CSV 连接列表的校验结果。
+
+    Attributes:
+        rows (int): 数据行数 (不含表头和空行)。
+        connections (List['ConnectionType']): 校验通过的连接 (尚未添加到管理器)。
+        issues (List[ImportIssue]): 所有无效行的错误，按行号排列。
+    """
+    rows: int
+    connections: List['ConnectionType']
+    issues: List[ImportIssue]
+
+
+def read_connection_csv(filepath: str) -> List[CsvRow]:
+    """
+    读取 CSV 连接列表文件，跳过空行和表头。
+
+    Args:
+        filepath (str): CSV 文件路径。
+
+    Returns:
+        List[CsvRow]: (行号, 单元格) 列表。
+
+    Raises:
+        OSError: 文件无法读取。
+        ValueError: 文件编码无法识别。
+    """
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    for encoding in IMPORT_ENCODINGS:
+        try:
+            text = data.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise ValueError(f"无法识别文件编码 (支持 {', '.join(IMPORT_ENCODINGS)})")
+    return parse_connection_rows(io.StringIO(text, newline=''))
+
+
+def parse_connection_rows(stream: IO[str]) -> List[CsvRow]:
+    """
+    从文本流解析 CSV 连接列表，跳过空行；第一行的序号列不是数字时视为表头并跳过。
+
+    Args:
+        stream (IO[str]): 文本流 (打开文件时应指定 newline='')。
+
+    Returns:
+        List[CsvRow]: (行号, 去除首尾空白的单元格) 列表。
+    """
+    rows: List[CsvRow] = []
+    first = True
+    for line, cells in enumerate(csv.reader(stream), 1):
+        cells = [cell.strip() for cell in cells]
+        if not any(cells):
+            continue
+        if first:
+            first = False
+            if not cells[0].isdigit(): # 表头
+                continue
+        rows.append((line, cells))
+    return rows
+
+
+def _device_name_index(devices: List['Device']) -> Dict[str, Optional['Device']]:
+    """设备名称 -> 设备；名称重复的设备映射为 None (无法按名称唯一确定)。"""
+    index: Dict[str, Optional['Device']] = {}
+    for dev in devices:
+        index[dev.name] = None if dev.name in index else dev
+    return index
+
+
+def validate_connection_rows(network_manager: 'NetworkManager', rows: List[CsvRow]) -> ConnectionImportResult:
+    """
+    针对管理器的当前状态一次校验全部行，不修改管理器。
+
+    每一行依次检查: 列数、设备名称 (通过名称索引查找，名称重复的设备无法导入)、不能连接到自身、
+    端口是否属于设备、端口是否已被占用 (管理器中已有的连接，或文件中前面的行)、端口兼容性，
+    以及连接类型列 (非空时) 是否与兼容性表给出的类型一致。
+
+    Args:
+        network_manager (NetworkManager): 网络管理器。
+        rows (List[CsvRow]): read_connection_csv() / parse_connection_rows() 的结果。
+
+    Returns:
+        ConnectionImportResult: 有效的连接和全部错误。
+    """
+    names = _device_name_index(network_manager.get_all_devices())
+    claimed: Dict[Tuple[int, str], int] = {} # (设备 ID, 端口) -> 本文件中占用该端口的行号
+    connections: List['ConnectionType'] = []
+    issues: List[ImportIssue] = []
+
+    def resolve(name: str) -> Tuple[Optional['Device'], Optional[str]]:
+        if name not in names:
+            return None, f"找不到设备 '{name}'"
+        dev = names[name]
+        return (dev, None) if dev is not None else (None, f"设备名称 '{name}' 不唯一")
+
+    def port_problem(dev: 'Device', port: str, peer: 'Device', peer_port: str) -> Optional[str]:
+        if port not in dev.get_port_catalog():
+            return f"端口 '{port}' 在设备 '{dev.name}' 上无效"
+        occupant = dev.port_connections.get(port)
+        if occupant is not None:
+            if occupant == peer.name and peer.port_connections.get(peer_port) == dev.name:
+                return f"连接 {dev.name}[{port}] <-> {peer.name}[{peer_port}] 已存在"
+            return f"端口 {dev.name}[{port}] 已被占用 (连接到 {occupant})"
+        first_line = claimed.get((dev.id, port))
+        if first_line is not None:
+            return f"端口 {dev.name}[{port}] 已在第 {first_line} 行使用"
+        return None
+
+    for line, cells in rows:
+        if len(cells) < IMPORT_MIN_COLUMNS:
+            issues.append(ImportIssue(line, f"列数不足 (需要至少 {IMPORT_MIN_COLUMNS} 列: 序号, 设备1, 端口1, 设备2, 端口2)"))
+            continue
+        _, name1, port1, name2, port2 = cells[:5]
+        expected_type = cells[5] if len(cells) > 5 else ""
+        dev1, problem = resolve(name1)
+        if problem is None:
+            dev2, problem = resolve(name2)
+        if problem is None and dev1 is dev2:
+            problem = f"不能将设备 '{name1}' 连接到自身"
+        if problem is None:
+            problem = port_problem(dev1, port1, dev2, port2) or port_problem(dev2, port2, dev1, port1)
+        if problem is None:
+            conn_type = port_compatibility(dev1.type, get_port_type_from_name(port1), dev2.type, get_port_type_from_name(port2))
+            if conn_type is None:
+                problem = f"端口 {name1}[{port1}] ({dev1.type}) 与 {name2}[{port2}] ({dev2.type}) 不兼容"
+            elif expected_type and expected_type != conn_type:
+                problem = f"连接类型 '{expected_type}' 与端口不符 (应为 '{conn_type}')"
+        if problem is not None:
+            issues.append(ImportIssue(line, problem))
+            continue
+        claimed[(dev1.id, port1)] = line
+        claimed[(dev2.id, port2)] = line
+        connections.append((dev1, port1, dev2, port2, conn_type))
+    return ConnectionImportResult(len(rows), connections, issues)
+
+
+def import_connections_csv(network_manager: 'NetworkManager', filepath: str,
+                           apply_partial: bool = True) -> Tuple[ConnectionImportResult, List['ConnectionType']]:
+    """
+    读取并校验 CSV 连接列表，然后在一次批量修改中添加有效的连接。
+
+    Args:
+        network_manager (NetworkManager): 网络管理器。
+        filepath (str): CSV 文件路径。
+        apply_partial (bool): 有错误时是否仍然添加其余的有效连接；为 False 时有任何错误都不修改管理器。
+
+    Returns:
+        Tuple[ConnectionImportResult, List[ConnectionType]]: (校验结果, 实际添加的连接)。
+
+    Raises:
+        OSError: 文件无法读取。
+        ValueError: 文件编码无法识别。
+    """
+    result = validate_connection_rows(network_manager, read_connection_csv(filepath))
+    if result.issues and not apply_partial:
+        return result, []
+    return result, network_manager.add_connections_bulk(result.connections)
+
+
+def format_import_issues(issues: List[ImportIssue], limit: Optional[int] = ISSUE_DISPLAY_LIMIT) -> str:
+    """
+    将错误列表格式化为多行文本 ("第 N 行: 错误")，超过 limit 条时只列出前面的部分。
+
+    Args:
+        issues (List[ImportIssue]): 错误列表。
+        limit (Optional[int]): 最多列出的条数；为 None 时全部列出。
+
+    Returns:
+        str: 格式化的文本。
+    """
+    shown = issues if limit is None else issues[:limit]
+    lines = [f"第 {issue.line} 行: {issue.message}" for issue in shown]
+    if len(shown) < len(issues):
+        lines.append(f"... 另有 {len(issues) - len(shown)} 个错误")
+    return "\n".join(lines)
@@ -6,6 +6,7 @@ core/device.py
 """
 import random
 from collections import defaultdict
+from functools import lru_cache
 
 # --- 设备和端口类型常量 ---
 DEV_UHD = 'MicroN UHD'
@@ -39,6 +40,18 @@ def get_port_type_from_name(port_name):
     if port_name.startswith(PORT_MPO):
         return PORT_MPO
     return PORT_UNKNOWN
+
+@lru_cache(maxsize=None)
+def _port_catalog(lc_total, sfp_total, mpo_total):
+    """
+    返回给定端口数量的设备的全部端口名称 (按 get_all_possible_ports() 的顺序) 及其集合。
+    端口名称只取决于三种端口的数量，相同配置的设备共用同一份结果。
+    """
+    ports = [f"{PORT_LC}{i+1}" for i in range(lc_total)]
+    ports.extend(f"{PORT_SFP}{i+1}" for i in range(sfp_total))
+    for i in range(mpo_total):
+        ports.extend(f"{PORT_MPO}{i+1}-Ch{j+1}" for j in range(4))
+    return tuple(ports), frozenset(ports)
 # --- 结束辅助函数 ---
 
 # --- 数据结构 ---
@@ -81,16 +94,17 @@ class Device:
         Returns:
             list[str]: 所有可能的端口名称字符串列表。
         """
-        ports = []
-        # LC 端口 (仅 UHD/HorizoN)
-        ports.extend([f"{PORT_LC}{i+1}" for i in range(self.lc_total)])
-        # SFP+ 端口 (仅 MicroN)
-        ports.extend([f"{PORT_SFP}{i+1}" for i in range(self.sfp_total)])
-        # MPO 端口 (仅 UHD/HorizoN), 每个 MPO 有 4 个 Breakout 子通道
-        for i in range(self.mpo_total):
-            base = f"{PORT_MPO}{i+1}"
-            ports.extend([f"{base}-Ch{j+1}" for j in range(4)])
-        return ports
+        # 顺序: LC 端口 (仅 UHD/HorizoN)、SFP+ 端口 (仅 MicroN)、MPO 端口 (仅 UHD/HorizoN, 每个 MPO 有 4 个 Breakout 子通道)
+        return list(_port_catalog(self.lc_total, self.sfp_total, self.mpo_total)[0])
+
+    def get_port_catalog(self):
+        """
+        获取此设备所有可能端口名称的集合 (缓存，用于快速判断端口是否属于此设备)。
+
+        Returns:
+            frozenset[str]: 端口名称集合。
+        """
+        return _port_catalog(self.lc_total, self.sfp_total, self.mpo_total)[1]
 
     def get_all_available_ports(self):
         """
@@ -116,7 +130,7 @@ class Device:
             bool: 如果端口可用且成功标记为已使用，则返回 True；否则返回 False。
         """
         # 检查端口是否属于该设备且当前是否可用
-        if port_name in self.get_all_possible_ports() and port_name not in self.port_connections:
+        if port_name in self.get_port_catalog() and port_name not in self.port_connections:
             self.port_connections[port_name] = target_device_name
             # 更新连接计数
             port_type = get_port_type_from_name(port_name)
@@ -131,6 +145,18 @@ class Device:
         print(f"调试: 尝试使用端口 {self.name}[{port_name}] 失败。可能原因：无效端口或已被占用 ({port_name in self.port_connections})")
         return False
 
+    def occupy_ports(self, assignments):
+        """
+        批量标记端口为已使用 (例如加载项目时)，连接计数只更新一次。
+        调用方需保证这些端口属于本设备 (见 get_port_catalog()) 且当前未被占用。
+
+        Args:
+            assignments (dict[str, str]): 本设备端口名 -> 对端设备名。
+        """
+        self.port_connections.update(assignments)
+        mpo_count = len([port_name for port_name in assignments if port_name.startswith(PORT_MPO)])
+        self.connections += 0.25 * mpo_count + (len(assignments) - mpo_count) # MPO Breakout 算 0.25，LC/SFP 算 1
+
     def return_port(self, port_name):
         """
         释放指定端口，使其变为可用状态，并更新连接计数。
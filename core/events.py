@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+core/events.py
+
+定义 NetworkManager 发出的变更事件类型。
+事件不依赖 Qt，订阅者 (UI 模型、缓存等) 可根据事件只做与变化量成比例的工作。
+"""
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+# --- 事件类型常量 ---
+DEVICE_ADDED = 'device_added'             # device, index: 新设备及其在设备列表中的位置
+DEVICE_REMOVED = 'device_removed'         # device, index: 被移除的设备及其移除前的位置
+DEVICE_UPDATED = 'device_updated'         # device: 名称或端口数量发生变化的设备
+CONNECTION_ADDED = 'connection_added'     # connection, index: 新连接及其在连接列表中的位置
+CONNECTION_REMOVED = 'connection_removed' # connection, index: 被移除的连接及其移除前的位置
+BULK_RESET = 'bulk_reset'                 # changes: 批量修改 (加载、清空、填充等)，订阅者应整体重新同步
+# --- 结束常量 ---
+
+
+class ChangeEvent(NamedTuple):
+    """
+    NetworkManager 的一次变更。
+
+    Attributes:
+        kind (str): 事件类型 (上面的常量之一)。
+        version (int): 变更后的 NetworkManager.version，单调递增。
+        device (Optional[Any]): 相关设备 (设备事件)。
+        connection (Optional[tuple]): 相关连接元组 (连接事件)。
+        index (Optional[int]): 设备/连接在对应列表中的位置。
+        changes (Optional[Tuple[ChangeEvent, ...]]): BULK_RESET 期间按发生顺序的逐条事件，
+            订阅者可据此只处理变化的部分；为 None 时修改无法逐条表示 (加载、清空全部设备)。
+    """
+    kind: str
+    version: int
+    device: Optional[Any] = None
+    connection: Optional[tuple] = None
+    index: Optional[int] = None
+    changes: Optional[Tuple['ChangeEvent', ...]] = None
+
+
+# 订阅者回调类型
+ChangeListener = Callable[[ChangeEvent], None]
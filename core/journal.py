@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+"""
+core/journal.py
+
+项目日志：把每次修改作为一行 JSON 追加到项目文件旁的日志文件中，后台线程定期把日志压缩为快照，
+程序崩溃后通过 "快照 + 日志" 恢复未保存的修改。
+
+每次修改只追加一条与变化量成比例的记录 (批量修改把期间的逐条修改合为一条记录)，
+自动保存的开销与项目大小无关；只有压缩 (在后台线程中进行) 才会写出完整的项目。
+
+以项目文件路径 P 为基准的文件:
+    P.journal             日志，每行一条记录 {"seq": 序号, "op": 操作, ...}
+    P.journal.compacting  压缩期间被换下的旧日志，快照写入成功后删除
+    P.autosave            快照，格式与 JSON 项目文件相同，"journal" 键记录快照包含的最后一条日志序号
+
+恢复时先读取快照，再按顺序重放两个日志文件中序号更大的记录；程序崩溃时写了一半的最后一行会被忽略。
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+from .events import ChangeEvent, DEVICE_ADDED, DEVICE_REMOVED, DEVICE_UPDATED, CONNECTION_ADDED, CONNECTION_REMOVED, BULK_RESET
+
+if TYPE_CHECKING:
+    from .network_manager import NetworkManager, ConnectionType
+
+# --- 常量 ---
+JOURNAL_SUFFIX = '.journal'
+COMPACTING_SUFFIX = '.journal.compacting'
+SNAPSHOT_SUFFIX = '.autosave'
+DEFAULT_COMPACT_INTERVAL = 30.0  # 秒，后台线程检查是否需要压缩的间隔
+DEFAULT_COMPACT_THRESHOLD = 1000 # 日志记录数达到此值时立即压缩
+
+# 日志记录的操作类型
+OP_ADD_DEVICE = 'add_device'               # device: 设备数据字典
+OP_UPDATE_DEVICE = 'update_device'         # device: 设备数据字典
+OP_REMOVE_DEVICE = 'remove_device'         # id: 设备 ID
+OP_ADD_CONNECTION = 'add_connection'       # connection: [设备1 ID, 端口1, 设备2 ID, 端口2, 类型]
+OP_REMOVE_CONNECTION = 'remove_connection' # connection: [设备1 ID, 端口1, 设备2 ID, 端口2]
+OP_BULK = 'bulk'                           # remove_devices, devices, remove_connections, add_connections: 两个状态之间的差异
+OP_BATCH = 'batch'                         # records: 批量修改期间按顺序应用的逐条记录
+OP_RESET = 'reset'                         # devices, connections: 完整状态 (加载项目等无法表示为差异的修改)
+# --- 结束常量 ---
+
+# 连接的键: (设备1 ID, 端口1, 设备2 ID, 端口2)
+ConnectionKey = Tuple[int, str, int, str]
+
+
+class JournalError(Exception):
+    """日志或快照无法读取或内容无效。"""
+
+
+class JournalPaths(NamedTuple):
+    """某个项目的日志相关文件路径。"""
+    journal: str
+    compacting: str
+    snapshot: str
+
+
+def journal_paths(project_path: str) -> JournalPaths:
+    """
+    返回项目文件对应的日志、压缩中日志和快照路径 (项目文件不必存在，例如未保存的新项目)。
+
+    Args:
+        project_path (str): 项目文件路径。
+
+    Returns:
+        JournalPaths: 文件路径。
+    """
+    return JournalPaths(project_path + JOURNAL_SUFFIX, project_path + COMPACTING_SUFFIX, project_path + SNAPSHOT_SUFFIX)
+
+
+def has_recovery_data(project_path: str) -> bool:
+    """项目文件旁是否留有可恢复的快照 (上次会话未正常结束或有未保存的修改)。"""
+    return os.path.exists(journal_paths(project_path).snapshot)
+
+
+def _connection_record(connection: 'ConnectionType') -> List[Any]:
+    """连接元组 -> 日志中的连接记录 [设备1 ID, 端口1, 设备2 ID, 端口2, 类型]。"""
+    dev1, port1, dev2, port2, conn_type = connection
+    return [dev1.id, port1, dev2.id, port2, conn_type]
+
+
+def _connection_key(record) -> ConnectionKey:
+    """连接记录 (或连接元组的 ID 形式) -> 连接的键。"""
+    return (record[0], record[1], record[2], record[3])
+
+
+class ProjectState:
+    """
+    以纯数据形式表示的项目状态 (设备数据字典和连接记录)，按日志记录逐条更新。
+
+    设备和连接都按插入顺序保存在字典中，与 NetworkManager 中列表的顺序一致
+    (修改设备保持原位置，新增的设备/连接追加在末尾)。记录中的字典和列表只会被整体替换，不会被原地修改，
+    因此浅拷贝即可安全地交给压缩线程。
+    """
+
+    def __init__(self):
+        self.devices: Dict[int, Dict[str, Any]] = {}           # 设备 ID -> 设备数据字典
+        self.connections: Dict[ConnectionKey, List[Any]] = {} # 连接的键 -> 连接记录
+        self.device_id_counter: int = 0
+
+    @classmethod
+    def from_manager(cls, manager: 'NetworkManager') -> 'ProjectState':
+        """从 NetworkManager 的当前状态创建。"""
+        state = cls()
+        state.devices = {dev.id: dev.to_dict() for dev in manager.devices}
+        for connection in manager.connections:
+            record = _connection_record(connection)
+            state.connections[_connection_key(record)] = record
+        state.device_id_counter = manager.device_id_counter
+        return state
+
+    @classmethod
+    def from_project_dict(cls, project_data: Dict[str, Any]) -> 'ProjectState':
+        """从 JSON 项目数据 (例如快照) 创建。"""
+        state = cls()
+        for data in project_data.get('devices', []):
+            state.devices[data['id']] = data
+        for conn_data in project_data.get('connections', []):
+            record = [conn_data.get('dev1_id'), conn_data.get('port1'), conn_data.get('dev2_id'),
+                      conn_data.get('port2'), conn_data.get('type', 'Unknown Type')]
+            state.connections[_connection_key(record)] = record
+        state.device_id_counter = project_data.get('journal', {}).get('device_id_counter', max(state.devices, default=0))
+        return state
+
+    def apply(self, record: Dict[str, Any]):
+        """
+        应用一条日志记录。
+
+        Raises:
+            JournalError: 记录的操作类型未知或缺少字段。
+        """
+        op = record.get('op')
+        try:
+            if op in (OP_ADD_DEVICE, OP_UPDATE_DEVICE):
+                device = record['device']
+                self.devices[device['id']] = device # 修改时保持原位置
+            elif op == OP_REMOVE_DEVICE:
+                self.devices.pop(record['id'], None) # 相关连接的移除已作为单独的记录写入
+            elif op == OP_ADD_CONNECTION:
+                connection = record['connection']
+                self.connections[_connection_key(connection)] = connection
+            elif op == OP_REMOVE_CONNECTION:
+                self.connections.pop(_connection_key(record['connection']), None)
+            elif op == OP_BULK:
+                for dev_id in record.get('remove_devices', ()):
+                    self.devices.pop(dev_id, None)
+                for device in record.get('devices', ()):
+                    self.devices[device['id']] = device
+                for connection in record.get('remove_connections', ()):
+                    self.connections.pop(_connection_key(connection), None)
+                for connection in record.get('add_connections', ()):
+                    self.connections[_connection_key(connection)] = connection
+            elif op == OP_BATCH:
+                for sub_record in record['records']:
+                    self.apply(sub_record)
+            elif op == OP_RESET:
+                self.devices = {device['id']: device for device in record['devices']}
+                self.connections = {_connection_key(connection): connection for connection in record['connections']}
+            else:
+                raise JournalError(f"未知的日志操作: {op}")
+        except (KeyError, IndexError, TypeError) as e:
+            raise JournalError(f"日志记录无效: {record} ({e})")
+        if 'counter' in record:
+            self.device_id_counter = record['counter']
+
+    def diff(self, manager: 'NetworkManager') -> Optional[Dict[str, Any]]:
+        """
+        计算从本状态到 NetworkManager 当前状态的差异记录。需要比较全部设备和连接，
+        只用于无法逐条表示的 BULK_RESET (加载项目、清空全部设备) 和 ProjectJournal.start(saved)。
+
+        Returns:
+            Optional[Dict[str, Any]]: OP_BULK 记录 (只含有变化的部分)；顺序无法通过追加表示时 (例如加载了另一个项目)
+            返回 OP_RESET 记录；没有变化时返回 None。
+        """
+        devices = {dev.id: dev for dev in manager.devices}
+        connections = {(conn[0].id, conn[1], conn[2].id, conn[3]): conn for conn in manager.connections}
+        kept_devices = [dev_id for dev_id in self.devices if dev_id in devices]
+        kept_connections = [key for key in self.connections if key in connections]
+        if (kept_devices + [dev_id for dev_id in devices if dev_id not in self.devices] != list(devices)
+                or kept_connections + [key for key in connections if key not in self.connections] != list(connections)):
+            return {'op': OP_RESET, 'counter': manager.device_id_counter,
+                    'devices': [dev.to_dict() for dev in manager.devices],
+                    'connections': [_connection_record(conn) for conn in manager.connections]}
+
+        record: Dict[str, Any] = {'op': OP_BULK}
+        remove_devices = [dev_id for dev_id in self.devices if dev_id not in devices]
+        changed_devices = [data for data in (dev.to_dict() for dev in manager.devices) if self.devices.get(data['id']) != data]
+        remove_connections = [list(key) for key in self.connections if key not in connections]
+        add_connections = [_connection_record(conn) for key, conn in connections.items()
+                           if key not in self.connections or self.connections[key][4] != conn[4]]
+        if remove_devices: record['remove_devices'] = remove_devices
+        if changed_devices: record['devices'] = changed_devices
+        if remove_connections: record['remove_connections'] = remove_connections
+        if add_connections: record['add_connections'] = add_connections
+        if manager.device_id_counter != self.device_id_counter: record['counter'] = manager.device_id_counter
+        return record if len(record) > 1 else None
+
+    def to_records(self) -> Tuple[List[Dict[str, Any]], List[Tuple]]:
+        """返回 NetworkManager.load_records() 所需的 (设备数据字典列表, 连接记录列表)。"""
+        # Device.from_dict() 会为缺少 ID 的数据补充默认值，这里传入副本
+        return [dict(data) for data in self.devices.values()], [tuple(record) for record in self.connections.values()]
+
+
+def _write_snapshot(path: str, devices: List[Dict[str, Any]], connections: List[List[Any]], device_id_counter: int, seq: int):
+    """写入快照 (先写临时文件再替换，写到一半时崩溃不会破坏已有快照)。"""
+    project_data = {
+        'version': '1.1-refactored',
+        'devices': devices,
+        'connections': [{'dev1_id': c[0], 'port1': c[1], 'dev2_id': c[2], 'port2': c[3], 'type': c[4]} for c in connections],
+        'journal': {'seq': seq, 'device_id_counter': device_id_counter},
+    }
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(project_data, ensure_ascii=False)) # json.dumps 整体使用 C 编码器，比 json.dump 逐块编码快得多
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _read_journal_lines(path: str) -> List[Dict[str, Any]]:
+    """读取日志文件中的记录；最后一行不完整 (写入时崩溃) 时忽略该行。"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    records = []
+    for line_no, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            if line_no == len(lines) - 1: # 未以换行结尾的最后一行
+                print(f"警告: 忽略日志 {path} 末尾不完整的记录。")
+                break
+            raise JournalError(f"日志 {path} 第 {line_no + 1} 行损坏")
+    return records
+
+
+def read_recovery_state(project_path: str) -> Tuple[ProjectState, int]:
+    """
+    读取快照并重放日志。
+
+    Args:
+        project_path (str): 项目文件路径 (见 journal_paths())。
+
+    Returns:
+        Tuple[ProjectState, int]: (恢复后的状态, 重放的日志记录数)。
+
+    Raises:
+        JournalError: 快照不存在或日志/快照损坏。
+        OSError: 文件无法读取。
+    """
+    paths = journal_paths(project_path)
+    try:
+        with open(paths.snapshot, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        raise JournalError(f"找不到快照: {paths.snapshot}")
+    except json.JSONDecodeError as e:
+        raise JournalError(f"快照损坏: {e}")
+    if not isinstance(snapshot, dict):
+        raise JournalError("快照格式无效")
+
+    state = ProjectState.from_project_dict(snapshot)
+    last_seq = snapshot.get('journal', {}).get('seq', 0)
+    replayed = 0
+    for record in _read_journal_lines(paths.compacting) + _read_journal_lines(paths.journal):
+        if record.get('seq', 0) <= last_seq:
+            continue # 已包含在快照中
+        state.apply(record)
+        last_seq = record['seq']
+        replayed += 1
+    return state, replayed
+
+
+def recover_project(manager: 'NetworkManager', project_path: str) -> int:
+    """
+    用 "快照 + 日志" 恢复的状态替换 NetworkManager 的当前状态 (只发出一次 BULK_RESET)。
+
+    Args:
+        manager (NetworkManager): 网络管理器。
+        project_path (str): 项目文件路径 (见 journal_paths())。
+
+    Returns:
+        int: 重放的日志记录数。
+
+    Raises:
+        JournalError: 快照不存在或日志/快照损坏。
+        OSError: 文件无法读取。
+    """
+    state, replayed = read_recovery_state(project_path)
+    devices_data, connection_records = state.to_records()
+    manager.load_records(devices_data, connection_records, state.device_id_counter)
+    print(f"已从日志恢复项目: 设备数 {len(manager.devices)}, 连接数 {len(manager.connections)} (重放 {replayed} 条记录)")
+    return replayed
+
+
+def discard_recovery_data(project_path: str):
+    """删除项目的日志和快照文件 (文件不存在时忽略)。"""
+    for path in journal_paths(project_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class ProjectJournal:
+    """
+    订阅 NetworkManager 的变更事件，把每次修改追加到日志文件，并在后台线程中定期把日志压缩为快照。
+
+    用法:
+        journal = ProjectJournal(manager, project_path)
+        journal.start()   # 写入初始快照并开始记录 (会删除该项目已有的日志，需要恢复时应先调用 recover_project())
+        ...
+        journal.close()   # 停止记录；discard=True 时删除日志和快照 (例如已保存项目)
+
+    追加记录在发出事件的线程 (通常是主线程) 中进行，每条记录写入后立即 flush，
+    程序崩溃时已记录的修改不会丢失。压缩线程只读取内部的 ProjectState 副本，不访问 NetworkManager。
+    """
+
+    def __init__(self, manager: 'NetworkManager', project_path: str,
+                 compact_interval: float = DEFAULT_COMPACT_INTERVAL, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD):
+        """
+        Args:
+            manager (NetworkManager): 要记录的网络管理器。
+            project_path (str): 项目文件路径，日志和快照保存在其旁边 (见 journal_paths())。
+            compact_interval (float): 后台线程检查是否需要压缩的间隔 (秒)。
+            compact_threshold (int): 未压缩的记录数达到此值时立即压缩。
+        """
+        self.manager = manager
+        self.project_path = project_path
+        self.paths = journal_paths(project_path)
+        self.compact_interval = compact_interval
+        self.compact_threshold = compact_threshold
+        self._state = ProjectState()
+        self._seq: int = 0               # 最后一条记录的序号
+        self._pending: int = 0           # 上次压缩后追加的记录数
+        self._file = None                # 当前日志文件
+        self._lock = threading.Lock()    # 保护 _state / _seq / _pending / _file 和文件轮换
+        self._wake = threading.Event()   # 唤醒压缩线程 (达到阈值或关闭时)
+        self._closed = True
+        self._failed = False             # 写入日志失败后为 True: 不再记录和压缩，关闭时删除恢复数据
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending_records(self) -> int:
+        """上次压缩后追加的记录数。"""
+        return self._pending
+
+    @property
+    def failed(self) -> bool:
+        """写入日志是否失败 (此后的修改无法恢复，自动保存已停止)。"""
+        return self._failed
+
+    def start(self, saved: Optional['NetworkManager'] = None):
+        """
+        写入初始快照 (这是唯一一次与项目大小成比例的同步写入)，然后开始记录修改。
+
+        Args:
+            saved (Optional[NetworkManager]): 已写入项目文件的状态 (后台保存所用的 NetworkManager.snapshot())。
+                给定时快照写入该状态，它与当前状态之间的差异 (保存期间的修改) 作为第一条记录追加，仍可恢复；
+                为 None 时快照写入当前状态。
+
+        Raises:
+            OSError: 日志或快照无法写入。
+        """
+        if not self._closed:
+            return
+        directory = os.path.dirname(os.path.abspath(self.project_path))
+        os.makedirs(directory, exist_ok=True)
+        for path in (self.paths.journal, self.paths.compacting):
+            if os.path.exists(path):
+                os.remove(path)
+        self._state = ProjectState.from_manager(saved if saved is not None else self.manager)
+        self._seq = 0
+        self._pending = 0
+        self._failed = False
+        _write_snapshot(self.paths.snapshot, list(self._state.devices.values()), list(self._state.connections.values()),
+                        self._state.device_id_counter, self._seq)
+        self._file = open(self.paths.journal, 'a', encoding='utf-8')
+        self._closed = False
+        self._wake.clear()
+        self.manager.subscribe(self._on_change)
+        self._thread = threading.Thread(target=self._compact_loop, name='ProjectJournalCompactor', daemon=True)
+        self._thread.start()
+        if saved is not None:
+            record = self._state.diff(self.manager)
+            if record is not None:
+                self.append(record)
+        print(f"项目日志已启动: {self.paths.journal}")
+
+    def close(self, discard: bool = False):
+        """
+        停止记录并等待压缩线程结束。
+
+        Args:
+            discard (bool): 为 True 时删除日志和快照 (修改已保存到项目文件)；
+                否则把剩余日志压缩进快照，下次打开时可以恢复。启动后没有任何修改或写入日志失败时同样删除。
+        """
+        if self._closed:
+            return
+        self.manager.unsubscribe(self._on_change)
+        self._closed = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        if discard or self._seq == 0 or self._failed:
+            discard_recovery_data(self.project_path)
+        elif self._pending:
+            try:
+                self.compact()
+            except OSError as e:
+                print(f"警告: 关闭项目日志时压缩失败 - {e}")
+
+    # --- 记录 ---
+
+    def _on_change(self, event: ChangeEvent):
+        """NetworkManager 变更事件回调: 把变化转换为日志记录并追加。"""
+        record = self._record_for_event(event)
+        if record is None:
+            return
+        try:
+            self.append(record)
+        except OSError as e: # 磁盘已满等: 停止记录，不影响编辑
+            print(f"错误: 写入项目日志失败，已停止自动保存 - {e}")
+            self._fail()
+
+    def _fail(self):
+        """
+        写入日志失败: 停止记录和压缩线程，并删除日志和快照。
+        它们只包含失败前的修改，保留下来会在下次打开时提供一个静默丢弃之后全部修改的 "恢复"。
+        """
+        self.manager.unsubscribe(self._on_change)
+        with self._lock:
+            self._failed = True
+            if self._file:
+                self._file.close()
+                self._file = None
+        self._wake.set()
+        if self._thread:
+            self._thread.join() # 等待进行中的压缩结束，之后不会再写入快照
+            self._thread = None
+        discard_recovery_data(self.project_path)
+
+    def _record_for_event(self, event: ChangeEvent) -> Optional[Dict[str, Any]]:
+        """根据变更事件生成日志记录 (不含序号)；没有需要记录的变化时返回 None。"""
+        if event.kind == DEVICE_ADDED:
+            return {'op': OP_ADD_DEVICE, 'device': event.device.to_dict(), 'counter': self.manager.device_id_counter}
+        if event.kind == DEVICE_UPDATED:
+            return {'op': OP_UPDATE_DEVICE, 'device': event.device.to_dict()}
+        if event.kind == DEVICE_REMOVED:
+            return {'op': OP_REMOVE_DEVICE, 'id': event.device.id}
+        if event.kind == CONNECTION_ADDED:
+            return {'op': OP_ADD_CONNECTION, 'connection': _connection_record(event.connection)}
+        if event.kind == CONNECTION_REMOVED:
+            return {'op': OP_REMOVE_CONNECTION, 'connection': _connection_record(event.connection)[:4]}
+        if event.kind == BULK_RESET:
+            if event.changes is None: # 加载、清空等: 比较完整状态
+                return self._state.diff(self.manager)
+            records = [record for record in map(self._record_for_event, event.changes) if record is not None]
+            return {'op': OP_BATCH, 'records': records} if records else None
+        return None
+
+    def append(self, record: Dict[str, Any]):
+        """
+        为记录分配序号，追加到日志文件并应用到内部状态。
+
+        Raises:
+            OSError: 日志无法写入。
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            self._seq += 1
+            record['seq'] = self._seq
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            self._state.apply(record)
+            self._pending += 1
+            if self._pending >= self.compact_threshold:
+                self._wake.set()
+
+    # --- 压缩 ---
+
+    def _compact_loop(self):
+        """压缩线程: 定期 (或被唤醒时) 把日志压缩为快照。"""
+        while True:
+            self._wake.wait(self.compact_interval)
+            self._wake.clear()
+            if self._closed or self._failed:
+                return
+            if self._pending:
+                try:
+                    self.compact()
+                except OSError as e:
+                    print(f"警告: 压缩项目日志失败，将在下次重试 - {e}")
+
+    def compact(self):
+        """
+        把当前状态写入快照并丢弃已包含在快照中的日志。
+
+        在锁内换下当前日志 (重命名为 .journal.compacting) 并复制状态，写快照在锁外进行，
+        期间新的修改照常追加到新的日志文件。任何一步中断时，快照中的序号保证恢复时不会重复应用记录。
+
+        Raises:
+            OSError: 快照无法写入。
+        """
+        with self._lock:
+            # 上次压缩失败时 .compacting 仍然存在，此时不再轮换 (旧记录按序号跳过，下次压缩时清理)
+            if self._file is not None and not os.path.exists(self.paths.compacting):
+                self._file.close()
+                os.replace(self.paths.journal, self.paths.compacting)
+                self._file = open(self.paths.journal, 'a', encoding='utf-8')
+            devices = list(self._state.devices.values())
+            connections = list(self._state.connections.values())
+            device_id_counter = self._state.device_id_counter
+            seq = self._seq
+            pending = self._pending
+        _write_snapshot(self.paths.snapshot, devices, connections, device_id_counter, seq)
+        if os.path.exists(self.paths.compacting):
+            os.remove(self.paths.compacting)
+        with self._lock:
+            self._pending -= pending
+            if self._file is None and os.path.exists(self.paths.journal): # 已关闭: 全部记录都已在快照中
+                os.remove(self.paths.journal)
@@ -4,13 +4,17 @@ core/network_manager.py
 
 定义 NetworkManager 类，负责管理设备、连接、计算和项目状态。
 这是应用程序的核心模型。
+核心模块不依赖 NetworkX：聚合图只在调用 get_graph() 时才导入 NetworkX 并构建，
+只做计算的场景 (命令行、批量处理) 无需安装或导入 NetworkX。
 """
 import copy
+import gc
 import itertools
 import random
 import json
-import networkx as nx
-from typing import List, Dict, Tuple, Optional, Set, Any # 导入 Any
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, Set, Any, TYPE_CHECKING # 导入 Any
 from collections import defaultdict # <--- **修复: 添加了 defaultdict 导入**
 
 # 从同级目录的 device 模块导入
@@ -21,19 +25,169 @@ from .device import (
     get_port_type_from_name
 )
 
+if TYPE_CHECKING:
+    import networkx as nx
+from .project_io import (
+    BINARY_EXTENSION, ProjectFormatError, ConnectionRecord,
+    is_binary_project, read_binary_project, write_binary_project, open_project_text,
+    read_project_bytes
+)
+from .events import (
+    ChangeEvent, ChangeListener,
+    DEVICE_ADDED, DEVICE_REMOVED, DEVICE_UPDATED, CONNECTION_ADDED, CONNECTION_REMOVED, BULK_RESET
+)
+
 # 定义连接元组的类型别名，提高可读性
 # (源设备, 源端口名, 目标设备, 目标端口名, 连接类型描述)
 ConnectionType = Tuple[Device, str, Device, str, str]
 
+# 端口类型顺序，与 Device.get_all_possible_ports() 生成端口名称的顺序一致
+PORT_TYPE_ORDER = (PORT_LC, PORT_SFP, PORT_MPO)
+
+@contextmanager
+def _gc_paused():
+    """
+    暂停循环垃圾回收 (加载大型项目时会一次性创建大量容器对象，反复触发回收只会重复扫描这些新对象)。
+    退出时恢复原有状态。
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+@lru_cache(maxsize=None)
+def port_compatibility(dev1_type: str, port1_type: str, dev2_type: str, port2_type: str) -> Optional[str]:
+    """
+    端口兼容性表：返回两种设备上两类端口之间的连接类型描述，不兼容时返回 None。
+    结果按参数缓存 (组合数很少)，批量校验时每行只是一次字典查找。
+
+    Args:
+        dev1_type (str): 设备 1 的类型。
+        port1_type (str): 设备 1 的端口类型 (get_port_type_from_name() 的结果)。
+        dev2_type (str): 设备 2 的类型。
+        port2_type (str): 设备 2 的端口类型。
+
+    Returns:
+        Optional[str]: 连接类型描述字符串或 None。
+    """
+    is_uhd1 = dev1_type in UHD_TYPES
+    is_uhd2 = dev2_type in UHD_TYPES
+    is_mn1 = dev1_type == DEV_MN
+    is_mn2 = dev2_type == DEV_MN
+
+    # 规则 1: LC 只能 UHD/HorizoN 之间互连
+    if port1_type == PORT_LC and port2_type == PORT_LC and is_uhd1 and is_uhd2:
+        return f"{PORT_LC}-{PORT_LC} (100G)"
+    # 规则 2: MPO 只能 UHD/HorizoN 之间互连
+    if port1_type == PORT_MPO and port2_type == PORT_MPO and is_uhd1 and is_uhd2:
+        return f"{PORT_MPO}-{PORT_MPO} (25G)"
+    # 规则 3: SFP 只能 MicroN 之间互连
+    if port1_type == PORT_SFP and port2_type == PORT_SFP and is_mn1 and is_mn2:
+        return f"{PORT_SFP}-{PORT_SFP} (10G)"
+    # 规则 4: MPO (UHD/HorizoN) 可以连接 SFP (MicroN)
+    if port1_type == PORT_MPO and port2_type == PORT_SFP and is_uhd1 and is_mn2:
+        return f"{PORT_MPO}-{PORT_SFP} (10G)"
+    if port1_type == PORT_SFP and port2_type == PORT_MPO and is_mn1 and is_uhd2:
+        return f"{PORT_MPO}-{PORT_SFP} (10G)" # 描述统一
+
+    # 其他组合均不兼容
+    return None
+
+
 class NetworkManager:
     """管理 MediorNet 设备网络状态和连接的核心类。"""
 
     def __init__(self):
         """初始化 NetworkManager。"""
         self.devices: List[Device] = []            # 当前系统中的设备列表
+        self._device_index: Dict[int, Device] = {} # 设备 ID -> 设备对象，与 self.devices 同步维护
         self.connections: List[ConnectionType] = [] # 当前系统中的连接列表
-        self.graph: nx.Graph = nx.Graph()          # NetworkX 图对象，用于拓扑可视化
+        self.graph: Optional['nx.Graph'] = None    # NetworkX 图对象，用于拓扑可视化 (通过 get_graph() 按需构建)
         self.device_id_counter: int = 0            # 用于生成唯一的设备 ID
+        self.version: int = 0                      # 设备/连接每次变化时递增，视图据此判断是否需要重建
+        self._graph_version: int = -1              # self.graph 对应的版本号
+        self._listeners: List[ChangeListener] = [] # 变更事件订阅者
+        self._batch_depth: int = 0                 # batch_update() 嵌套层数，大于 0 时暂存事件
+        self._batch_dirty: bool = False            # 批量修改期间是否发生过变化
+        # 批量修改期间的逐条事件 (随 BULK_RESET 发出)；发生无法逐条表示的修改 (加载、清空全部设备) 后为 None
+        self._batch_changes: Optional[List[ChangeEvent]] = []
+        # 可用端口缓存: 设备 ID -> {端口类型: 可用端口名称列表}，该设备的端口占用变化时失效
+        self._available_port_cache: Dict[int, Dict[str, List[str]]] = {}
+        # 与项目一起保存的视图状态 (可序列化为 JSON，由界面维护): 节点位置、布局算法、视口
+        self.view_state: Optional[Dict[str, Any]] = None
+
+    # --- 变更通知 ---
+
+    def subscribe(self, listener: ChangeListener):
+        """
+        订阅变更事件。回调在修改完成后同步调用，参数为 ChangeEvent。
+
+        Args:
+            listener (ChangeListener): 回调函数。
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: ChangeListener):
+        """取消订阅变更事件。"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, kind: str, device: Optional[Device] = None,
+                connection: Optional[ConnectionType] = None, index: Optional[int] = None,
+                changes: Optional[Tuple[ChangeEvent, ...]] = None):
+        """
+        递增版本号并向订阅者发出变更事件。
+
+        批量修改期间只暂存逐条事件，退出 batch_update() 时统一发出一次携带这些事件的 BULK_RESET。
+        聚合图在下次调用 get_graph() 时按需重建，批量修改只需聚合一次。
+        """
+        self.version += 1
+        self._invalidate_port_cache(kind, device, connection) # 批量修改期间同样需要失效
+        event = ChangeEvent(kind, self.version, device, connection, index, changes)
+        if self._batch_depth > 0:
+            self._batch_dirty = True
+            if self._batch_changes is not None:
+                if kind != BULK_RESET:
+                    self._batch_changes.append(event)
+                elif changes is not None:
+                    self._batch_changes.extend(changes)
+                else:
+                    self._batch_changes = None
+            return
+        for listener in list(self._listeners):
+            listener(event)
+
+    def _invalidate_port_cache(self, kind: str, device: Optional[Device], connection: Optional[ConnectionType]):
+        """根据变更类型使受影响设备的可用端口缓存失效。"""
+        if kind in (CONNECTION_ADDED, CONNECTION_REMOVED):
+            self._available_port_cache.pop(connection[0].id, None)
+            self._available_port_cache.pop(connection[2].id, None)
+        elif kind in (DEVICE_REMOVED, DEVICE_UPDATED):
+            self._available_port_cache.pop(device.id, None)
+        elif kind == BULK_RESET:
+            self._available_port_cache.clear()
+
+    @contextmanager
+    def batch_update(self):
+        """
+        批量修改上下文，可嵌套。期间不发出逐条事件，
+        最外层退出时若有变化则发出一次 BULK_RESET (changes 为期间的逐条事件)。
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_dirty:
+                changes = self._batch_changes
+                self._batch_dirty = False
+                self._batch_changes = []
+                self.version -= 1 # BULK_RESET 本身不算一次新的修改
+                self._notify(BULK_RESET, changes=tuple(changes) if changes is not None else None)
 
     # --- 设备管理 ---
 
@@ -57,7 +211,8 @@ class NetworkManager:
         self.device_id_counter += 1
         new_device = Device(self.device_id_counter, name, type, mpo_ports, lc_ports, sfp_ports)
         self.devices.append(new_device)
-        self._update_graph() # 添加节点到图中
+        self._device_index[new_device.id] = new_device
+        self._notify(DEVICE_ADDED, device=new_device, index=len(self.devices) - 1)
         print(f"设备已添加: {new_device}")
         return new_device
 
@@ -81,20 +236,19 @@ class NetworkManager:
         print(f"移除设备 {device_to_remove.name} 时，移除了 {connections_removed_count} 条相关连接。")
 
         # 2. 从设备列表中移除设备
-        self.devices.remove(device_to_remove)
+        device_row = self.devices.index(device_to_remove)
+        del self.devices[device_row]
+        del self._device_index[device_id]
 
-        # 3. 从图中移除节点 (如果 _remove_connections_for_device 没有处理边导致节点孤立的话)
-        # _update_graph 会处理节点的移除，所以这里不需要显式移除
-        # if self.graph.has_node(device_id):
-        #     self.graph.remove_node(device_id)
-        self._update_graph() # 确保图状态正确
+        # 3. 通知订阅者 (图节点在下次 get_graph() 时移除)
+        self._notify(DEVICE_REMOVED, device=device_to_remove, index=device_row)
 
         print(f"设备已移除: {device_to_remove.name}")
         return True
 
     def get_device_by_id(self, device_id: int) -> Optional[Device]:
-        """根据 ID 获取设备对象。"""
-        return next((dev for dev in self.devices if dev.id == device_id), None)
+        """根据 ID 获取设备对象 (通过索引 O(1) 查找)。"""
+        return self._device_index.get(device_id)
 
     def get_device_by_name(self, name: str) -> Optional[Device]:
         """根据名称获取设备对象。"""
@@ -157,6 +311,7 @@ class NetworkManager:
         if port_changed:
             print(f"警告: 设备 '{device.name}' 的端口数量已更改，将清除所有现有连接。")
             self.clear_connections() # 清除所有连接并重置所有设备端口状态
+            self._notify(DEVICE_UPDATED, device=device) # 没有连接时 clear_connections 不会发出事件
             return True # 端口修改成功（即使清空了连接）
 
         # 如果只是名称改变，需要更新连接中的目标名称和图标签
@@ -165,8 +320,8 @@ class NetworkManager:
                  if other_dev.id != device.id:
                      ports_to_update = {p: new_name for p, target in other_dev.port_connections.items() if target == old_name}
                      other_dev.port_connections.update(ports_to_update)
-             # 更新图中的标签
-             self._update_graph()
+             # 更新图中的标签和视图中的名称
+             self._notify(DEVICE_UPDATED, device=device)
              return True
 
         # 如果没有任何改变
@@ -178,9 +333,11 @@ class NetworkManager:
     def clear_all_devices_and_connections(self):
         """清空所有设备和连接。"""
         self.devices = []
+        self._device_index = {}
         self.connections = []
-        self.graph.clear()
         self.device_id_counter = 0
+        self.view_state = None # 节点位置随设备一起失效
+        self._notify(BULK_RESET)
         print("所有设备和连接已清空。")
 
     # --- 连接管理 ---
@@ -210,16 +367,16 @@ class NetworkManager:
              return None
 
         # 检查端口是否有效且可用
-        if port1_name not in dev1.get_all_possible_ports():
+        if port1_name not in dev1.get_port_catalog():
              print(f"错误: 端口 '{port1_name}' 在设备 '{dev1.name}' 上无效。")
              return None
-        if port2_name not in dev2.get_all_possible_ports():
+        if port2_name not in dev2.get_port_catalog():
              print(f"错误: 端口 '{port2_name}' 在设备 '{dev2.name}' 上无效。")
              return None
-        if port1_name not in dev1.get_all_available_ports():
+        if port1_name in dev1.port_connections:
              print(f"错误: 端口 '{port1_name}' 在设备 '{dev1.name}' 上已被占用 ({dev1.port_connections.get(port1_name)})。")
              return None
-        if port2_name not in dev2.get_all_available_ports():
+        if port2_name in dev2.port_connections:
              print(f"错误: 端口 '{port2_name}' 在设备 '{dev2.name}' 上已被占用 ({dev2.port_connections.get(port2_name)})。")
              return None
 
@@ -234,8 +391,7 @@ class NetworkManager:
             if dev2.use_specific_port(port2_name, dev1.name):
                 connection: ConnectionType = (dev1, port1_name, dev2, port2_name, conn_type_str)
                 self.connections.append(connection)
-                # 更新图
-                self._update_graph()
+                self._notify(CONNECTION_ADDED, connection=connection, index=len(self.connections) - 1)
                 print(f"连接已添加: {dev1.name}[{port1_name}] <-> {dev2.name}[{port2_name}] ({conn_type_str})")
                 return connection
             else:
@@ -324,8 +480,7 @@ class NetworkManager:
             if actual_dev2: actual_dev2.return_port(port2)
             else: print(f"警告: 移除连接时找不到设备 ID {dev2.id}")
 
-            # 更新图
-            self._update_graph()
+            self._notify(CONNECTION_REMOVED, connection=removed_conn, index=found_index)
             print(f"连接已移除: {dev1.name}[{port1}] <-> {dev2.name}[{port2}]")
             return True
         else:
@@ -364,12 +519,10 @@ class NetworkManager:
 
 
             # 从主连接列表中移除
-            # 从后往前删除，避免索引问题
+            # 从后往前删除，避免索引问题；每条连接发出一次移除事件，索引对应移除时的位置
             for index in sorted(list(indices_to_remove), reverse=True):
-                self.connections.pop(index)
-
-            # 更新图 (移除相关边)
-            self._update_graph()
+                removed_conn = self.connections.pop(index)
+                self._notify(CONNECTION_REMOVED, connection=removed_conn, index=index)
 
         return removed_count
 
@@ -382,16 +535,72 @@ class NetworkManager:
         # 重置所有设备的端口状态
         for dev in self.devices:
             dev.reset_ports()
-        # 清空连接列表
+        # 清空连接列表 (按从后往前的顺序记录每条连接的移除，索引对应移除时的位置)
+        removed = self.connections
         self.connections = []
-        # 更新图 (移除所有边)
-        self._update_graph()
+        self._notify(BULK_RESET, changes=tuple(ChangeEvent(CONNECTION_REMOVED, self.version + 1, connection=conn, index=index)
+                                               for index, conn in reversed(list(enumerate(removed)))))
         print("所有连接已清除，设备端口状态已重置。")
 
     def get_all_connections(self) -> List[ConnectionType]:
         """获取当前所有连接的列表。"""
         return self.connections
 
+    def apply_connections(self, connections: List[ConnectionType]) -> List[ConnectionType]:
+        """
+        批量添加连接 (例如 calculate_mesh/calculate_ring 的计算结果)，只发出一次 BULK_RESET。
+
+        Args:
+            connections (List[ConnectionType]): 待添加的连接，端口会重新校验和占用。
+
+        Returns:
+            List[ConnectionType]: 成功添加的连接。
+        """
+        added: List[ConnectionType] = []
+        with self.batch_update():
+            for dev1, port1, dev2, port2, _ in connections:
+                connection = self.add_connection(dev1.id, port1, dev2.id, port2)
+                if connection: added.append(connection)
+                else: print(f"警告: 将计算出的连接 {dev1.name}[{port1}]<->{dev2.name}[{port2}] 添加到管理器时失败。")
+        return added
+
+    def add_connections_bulk(self, connections: List[ConnectionType]) -> List[ConnectionType]:
+        """
+        在一次批量修改中添加已校验的连接 (例如从 CSV 导入)：每个设备只调用一次 Device.occupy_ports()，
+        只发出一次 BULK_RESET (changes 为每条连接的 CONNECTION_ADDED)。不重新检查兼容性；端口已被占用 (或在本批中重复) 的连接会被跳过。
+
+        Args:
+            connections (List[ConnectionType]): 连接，设备必须是本管理器中的设备对象。
+
+        Returns:
+            List[ConnectionType]: 成功添加的连接。
+        """
+        added: List[ConnectionType] = []
+        claims: Dict[int, Dict[str, str]] = defaultdict(dict) # 设备 ID -> {端口: 对端设备名}
+        for connection in connections:
+            dev1, port1, dev2, port2, _ = connection
+            claims1 = claims[dev1.id]
+            claims2 = claims[dev2.id]
+            if (dev1 is dev2 or port1 in dev1.port_connections or port1 in claims1
+                    or port2 in dev2.port_connections or port2 in claims2):
+                print(f"警告: 批量添加时跳过端口已被占用的连接 {dev1.name}[{port1}]<->{dev2.name}[{port2}]。")
+                continue
+            claims1[port1] = dev2.name
+            claims2[port2] = dev1.name
+            added.append(connection)
+        if not added:
+            return added
+        with self.batch_update():
+            for dev_id, assignments in claims.items():
+                if assignments:
+                    self._device_index[dev_id].occupy_ports(assignments)
+            start = len(self.connections)
+            self.connections.extend(added)
+            for offset, connection in enumerate(added):
+                self._notify(CONNECTION_ADDED, connection=connection, index=start + offset)
+        print(f"批量添加了 {len(added)} 条连接。")
+        return added
+
     # --- 计算逻辑 ---
 
     def _find_best_single_link(self, dev1_copy: Device, dev2_copy: Device) -> Tuple[Optional[str], Optional[str], Optional[str]]:
@@ -658,39 +867,40 @@ class NetworkManager:
         num_devices = len(sorted_dev_ids)
 
         connection_made_in_full_pass = True
-        while connection_made_in_full_pass:
-            connection_made_in_full_pass = False
-            # 根据风格选择迭代顺序
-            iterator: Any = all_pairs_ids if style == 'mesh' else range(num_devices)
-            if style == 'mesh': random.shuffle(iterator) # Mesh 随机化
-
-            for item in iterator:
-                if style == 'mesh':
-                    dev1_id, dev2_id = item
-                else: # style == 'ring'
-                    i = item
-                    dev1_id = sorted_dev_ids[i]
-                    dev2_id = sorted_dev_ids[(i + 1) % num_devices]
-
-                dev1 = self.get_device_by_id(dev1_id)
-                dev2 = self.get_device_by_id(dev2_id)
-
-                if not dev1 or not dev2 or dev1_id == dev2_id: continue # 设备不存在或相同
-
-                # 使用副本进行探测，避免修改真实状态
-                dev1_copy = copy.deepcopy(dev1)
-                dev2_copy = copy.deepcopy(dev2)
-                port1, port2, conn_type = self._find_best_single_link(dev1_copy, dev2_copy)
+        with self.batch_update():
+            while connection_made_in_full_pass:
+                connection_made_in_full_pass = False
+                # 根据风格选择迭代顺序
+                iterator: Any = all_pairs_ids if style == 'mesh' else range(num_devices)
+                if style == 'mesh': random.shuffle(iterator) # Mesh 随机化
+
+                for item in iterator:
+                    if style == 'mesh':
+                        dev1_id, dev2_id = item
+                    else: # style == 'ring'
+                        i = item
+                        dev1_id = sorted_dev_ids[i]
+                        dev2_id = sorted_dev_ids[(i + 1) % num_devices]
+
+                    dev1 = self.get_device_by_id(dev1_id)
+                    dev2 = self.get_device_by_id(dev2_id)
+
+                    if not dev1 or not dev2 or dev1_id == dev2_id: continue # 设备不存在或相同
+
+                    # 使用副本进行探测，避免修改真实状态
+                    dev1_copy = copy.deepcopy(dev1)
+                    dev2_copy = copy.deepcopy(dev2)
+                    port1, port2, conn_type = self._find_best_single_link(dev1_copy, dev2_copy)
 
-                if port1 and port2:
-                    # 找到可用连接，现在尝试在真实对象上添加
-                    # 需要确保端口在真实对象上仍然可用（理论上应该可用，因为我们没修改真实状态）
-                    actual_port1_name = port1 if dev1_copy.id == dev1_id else port2
-                    actual_port2_name = port2 if dev1_copy.id == dev1_id else port1
-                    added_connection = self.add_connection(dev1_id, actual_port1_name, dev2_id, actual_port2_name)
-                    if added_connection:
-                        newly_added_connections.append(added_connection)
-                        connection_made_in_full_pass = True # 成功添加，可能还有更多
+                    if port1 and port2:
+                        # 找到可用连接，现在尝试在真实对象上添加
+                        # 需要确保端口在真实对象上仍然可用（理论上应该可用，因为我们没修改真实状态）
+                        actual_port1_name = port1 if dev1_copy.id == dev1_id else port2
+                        actual_port2_name = port2 if dev1_copy.id == dev1_id else port1
+                        added_connection = self.add_connection(dev1_id, actual_port1_name, dev2_id, actual_port2_name)
+                        if added_connection:
+                            newly_added_connections.append(added_connection)
+                            connection_made_in_full_pass = True # 成功添加，可能还有更多
 
         print(f"填充完成 ({style} 风格). 新增连接数: {len(newly_added_connections)}")
         return newly_added_connections
@@ -723,31 +933,8 @@ class NetworkManager:
         dev2 = self.get_device_by_id(dev2_id)
         if not dev1 or not dev2:
             return False, None
-
-        port1_type = get_port_type_from_name(port1_name)
-        port2_type = get_port_type_from_name(port2_name)
-        is_uhd1 = dev1.type in UHD_TYPES
-        is_uhd2 = dev2.type in UHD_TYPES
-        is_mn1 = dev1.type == DEV_MN
-        is_mn2 = dev2.type == DEV_MN
-
-        # 规则 1: LC 只能 UHD/HorizoN 之间互连
-        if port1_type == PORT_LC and port2_type == PORT_LC and is_uhd1 and is_uhd2:
-            return True, f"{PORT_LC}-{PORT_LC} (100G)"
-        # 规则 2: MPO 只能 UHD/HorizoN 之间互连
-        if port1_type == PORT_MPO and port2_type == PORT_MPO and is_uhd1 and is_uhd2:
-            return True, f"{PORT_MPO}-{PORT_MPO} (25G)"
-        # 规则 3: SFP 只能 MicroN 之间互连
-        if port1_type == PORT_SFP and port2_type == PORT_SFP and is_mn1 and is_mn2:
-            return True, f"{PORT_SFP}-{PORT_SFP} (10G)"
-        # 规则 4: MPO (UHD/HorizoN) 可以连接 SFP (MicroN)
-        if port1_type == PORT_MPO and port2_type == PORT_SFP and is_uhd1 and is_mn2:
-            return True, f"{PORT_MPO}-{PORT_SFP} (10G)"
-        if port1_type == PORT_SFP and port2_type == PORT_MPO and is_mn1 and is_uhd2:
-            return True, f"{PORT_MPO}-{PORT_SFP} (10G)" # 描述统一
-
-        # 其他组合均不兼容
-        return False, None
+        conn_type = port_compatibility(dev1.type, get_port_type_from_name(port1_name), dev2.type, get_port_type_from_name(port2_name))
+        return conn_type is not None, conn_type
 
     def get_compatible_port_types(self, target_dev_id: int, target_port_name: str) -> List[str]:
         """
@@ -778,12 +965,33 @@ class NetworkManager:
 
         return compatible_here
 
-    def get_available_ports(self, device_id: int) -> List[str]:
-        """获取指定设备的所有可用端口列表。"""
-        device = self.get_device_by_id(device_id)
-        if device:
-            return device.get_all_available_ports()
-        return []
+    def get_available_ports(self, device_id: int, port_types: Optional[List[str]] = None) -> List[str]:
+        """
+        获取指定设备的可用端口列表 (按端口类型缓存，只在该设备的端口占用变化时重新生成)。
+
+        Args:
+            device_id (int): 设备 ID。
+            port_types (Optional[List[str]]): 只返回这些类型的端口 (例如 get_compatible_port_types 的结果)，
+                None 表示所有类型。
+
+        Returns:
+            List[str]: 可用端口名称列表，顺序与 Device.get_all_available_ports() 一致。
+        """
+        ports_by_type = self._available_port_cache.get(device_id)
+        if ports_by_type is None:
+            device = self.get_device_by_id(device_id)
+            if not device:
+                return []
+            ports_by_type = {port_type: [] for port_type in PORT_TYPE_ORDER}
+            for port in device.get_all_available_ports():
+                ports_by_type.setdefault(get_port_type_from_name(port), []).append(port)
+            self._available_port_cache[device_id] = ports_by_type
+
+        available: List[str] = []
+        for port_type, ports in ports_by_type.items():
+            if port_types is None or port_type in port_types:
+                available.extend(ports)
+        return available
 
     def calculate_port_totals(self) -> Dict[str, int]:
         """计算当前所有设备各类端口的总数。"""
@@ -794,13 +1002,14 @@ class NetworkManager:
 
     # --- 图管理 ---
 
-    def _update_graph(self):
-        """根据当前的设备和连接列表更新 NetworkX 图对象。"""
-        self.graph.clear() # 清空旧图
+    def _rebuild_graph(self):
+        """根据当前的设备和连接列表重建 NetworkX 图对象 (节点/边属性中包含聚合后的标签、颜色和端口)。"""
+        import networkx as nx # 仅在需要图时导入，核心计算不依赖 NetworkX
+        self.graph = nx.Graph() # 新建图对象，调用方此前获取的旧图保持不变
 
         # 添加所有设备作为节点
         for dev in self.devices:
-            self.graph.add_node(dev.id, label=f"{dev.name}\n({dev.type})", device_type=dev.type) # 添加属性
+            self.graph.add_node(dev.id, label=f"{dev.name}\n({dev.type})", name=dev.name, device_type=dev.type) # 添加属性
 
         # 添加所有连接作为边
         edge_data = defaultdict(lambda: defaultdict(int)) # {(u,v): {conn_type: count}}
@@ -857,19 +1066,76 @@ class NetworkManager:
         print(f"图已更新: {self.graph.number_of_nodes()} 个节点, {self.graph.number_of_edges()} 条边")
 
 
-    def get_graph(self) -> nx.Graph:
-        """获取当前的 NetworkX 图对象。"""
-        # 确保图是最新的
-        # 在每次获取前都更新可能效率不高，取决于调用频率
-        # 更好的方式是在修改 devices 或 connections 后调用 _update_graph
-        # self._update_graph() # 暂时注释掉，依赖于修改方法调用它
+    def get_graph(self) -> 'nx.Graph':
+        """
+        获取当前的 NetworkX 图对象 (首次调用时才导入 NetworkX)。
+
+        图按版本号缓存，只有设备或连接变化后首次调用时才重新聚合。
+        调用方不应修改返回的图。
+
+        Raises:
+            ImportError: 未安装 NetworkX。
+        """
+        if self._graph_version != self.version:
+            self._rebuild_graph()
+            self._graph_version = self.version
         return self.graph
 
     # --- 保存与加载 ---
 
+    def to_project_dict(self) -> Dict[str, Any]:
+        """
+        返回当前设备列表和连接列表的项目数据 (与项目 JSON 文件的结构一致)。
+
+        Returns:
+            Dict[str, Any]: 可直接序列化为 JSON 的项目数据。
+        """
+        project_data = {
+            'version': '1.1-refactored', # 添加版本标记
+            'devices': [dev.to_dict() for dev in self.devices],
+            'connections': [
+                {
+                    'dev1_id': conn[0].id,
+                    'port1': conn[1],
+                    'dev2_id': conn[2].id,
+                    'port2': conn[3],
+                    'type': conn[4]
+                }
+                for conn in self.connections
+            ]
+        }
+        if self.view_state is not None:
+            project_data['view'] = self.view_state # 节点位置、布局算法和视口 (见 view_state)
+        return project_data
+
+    def snapshot(self) -> 'NetworkManager':
+        """
+        返回当前设备和连接的独立副本 (新的 NetworkManager，没有订阅者)，供后台线程保存或导出使用。
+        副本中的设备是新的 Device 对象，之后对本管理器的修改不会影响副本。
+
+        Returns:
+            NetworkManager: 状态副本。
+        """
+        snapshot = NetworkManager()
+        device_copies: Dict[int, Device] = {}
+        for dev in self.devices:
+            dev_copy = copy.copy(dev)
+            dev_copy.port_connections = dict(dev.port_connections)
+            device_copies[dev.id] = dev_copy
+        snapshot.devices = list(device_copies.values())
+        snapshot._device_index = dict(device_copies)
+        snapshot.connections = [(device_copies[dev1.id], port1, device_copies[dev2.id], port2, conn_type)
+                                for dev1, port1, dev2, port2, conn_type in self.connections]
+        snapshot.device_id_counter = self.device_id_counter
+        snapshot.version = self.version
+        snapshot.view_state = copy.deepcopy(self.view_state)
+        return snapshot
+
     def save_project(self, filepath: str) -> bool:
         """
-        将当前设备列表和连接列表保存到 JSON 文件。
+        将当前设备列表和连接列表保存到项目文件。
+        扩展名为 .tdmc 时保存为紧凑的二进制格式 (见 core/project_io.py)，否则保存为 JSON；
+        扩展名为 .gz / .xz (例如 .json.gz) 时 JSON 通过对应的压缩流逐块写出。
 
         Args:
             filepath (str): 保存文件的完整路径。
@@ -878,74 +1144,78 @@ class NetworkManager:
             bool: 保存是否成功。
         """
         try:
-            project_data = {
-                'version': '1.1-refactored', # 添加版本标记
-                'devices': [dev.to_dict() for dev in self.devices],
-                'connections': [
-                    {
-                        'dev1_id': conn[0].id,
-                        'port1': conn[1],
-                        'dev2_id': conn[2].id,
-                        'port2': conn[3],
-                        'type': conn[4]
-                    }
-                    for conn in self.connections
-                ]
-                # TODO: 未来可以保存 node_positions 等视图状态
-            }
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, indent=4, ensure_ascii=False)
+            if filepath.lower().endswith(BINARY_EXTENSION):
+                write_binary_project(filepath, self.devices, self.connections, self.view_state)
+            else:
+                project_data = self.to_project_dict()
+                with open_project_text(filepath, 'w') as f:
+                    json.dump(project_data, f, indent=4, ensure_ascii=False)
             print(f"项目已保存到: {filepath}")
             return True
         except Exception as e:
             print(f"错误: 保存项目失败 - {e}")
             return False
 
-    def load_project(self, filepath: str) -> bool:
+    def _rebuild_connections(self, connection_records: List[ConnectionRecord],
+                             device_map: Dict[int, Device]) -> List[ConnectionType]:
         """
-        从 JSON 文件加载设备列表和连接列表，覆盖当前状态。
-        **增加了对旧格式（仅设备列表）的兼容性处理。**
+        根据连接记录重建连接列表并批量占用端口 (加载项目时使用)。
+
+        先用每个设备的端口目录 (Device.get_port_catalog()) 和本次已占用的端口校验全部记录，
+        最后每个设备只调用一次 Device.occupy_ports()。端口已被占用或不属于设备的记录会被跳过
+        (与逐条占用时的结果相同：先出现的连接生效)。不进行兼容性检查，假设保存的文件是有效的。
 
         Args:
-            filepath (str): 加载文件的完整路径。
+            connection_records (List[ConnectionRecord]): 连接记录 (设备1 ID, 端口1, 设备2 ID, 端口2, 类型)。
+            device_map (Dict[int, Device]): 设备 ID -> 新加载的设备对象 (端口均未占用)。
 
         Returns:
-            bool: 加载是否成功。
+            List[ConnectionType]: 有效的连接列表。
         """
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                project_data = json.load(f)
+        rebuilt_connections: List[ConnectionType] = []
+        claims: Dict[int, Dict[str, str]] = {dev_id: {} for dev_id in device_map} # 设备 ID -> {端口: 对端设备名}
+        catalogs = {dev_id: dev.get_port_catalog() for dev_id, dev in device_map.items()}
+        for record in connection_records:
+            dev1_id, port1, dev2_id, port2, conn_type = record
+            dev1 = device_map.get(dev1_id)
+            dev2 = device_map.get(dev2_id)
+            if not (dev1 and dev2 and port1 and port2 and isinstance(port1, str) and isinstance(port2, str)):
+                print(f"警告: 加载连接数据时跳过无效条目: {record} (设备 ID {dev1_id} 或 {dev2_id} 未找到，或端口信息缺失)")
+                continue
+            claims1 = claims[dev1_id]
+            claims2 = claims[dev2_id]
+            if port1 not in catalogs[dev1_id] or port1 in claims1:
+                print(f"警告: 加载连接时，设备 {dev1.name} 端口 {port1} 占用失败。")
+                continue
+            if port2 not in catalogs[dev2_id] or port2 in claims2 or (dev1_id == dev2_id and port1 == port2):
+                print(f"警告: 加载连接时，设备 {dev2.name} 端口 {port2} 占用失败，已跳过该连接。")
+                continue
+            claims1[port1] = dev2.name
+            claims2[port2] = dev1.name
+            rebuilt_connections.append((dev1, port1, dev2, port2, conn_type))
+
+        for dev_id, assignments in claims.items():
+            if assignments:
+                device_map[dev_id].occupy_ports(assignments)
+        return rebuilt_connections
+
+    def load_records(self, devices_data: List[Dict], connection_records: List[ConnectionRecord],
+                     device_id_counter: Optional[int] = None):
+        """
+        用设备数据和连接记录替换当前全部设备和连接 (加载项目、从日志恢复时使用)，只发出一次 BULK_RESET。
 
-            # 1. 清空当前状态
+        Args:
+            devices_data (List[Dict]): 设备数据字典列表 (与 Device.from_dict() 的参数格式一致)。
+            connection_records (List[ConnectionRecord]): 连接记录 (设备1 ID, 端口1, 设备2 ID, 端口2, 类型)。
+            device_id_counter (Optional[int]): 设备 ID 计数器；为 None 时取最大的设备 ID。
+        """
+        with self.batch_update(), _gc_paused():
             self.clear_all_devices_and_connections()
-            print(f"尝试从 {filepath} 加载项目...") # 移到清空之后打印
-
-            loaded_devices_data = []
-            loaded_connections_data = []
-
-            # **修复: 检查加载的数据格式**
-            if isinstance(project_data, dict):
-                # 新格式：包含 'devices' 和 'connections' 键的字典
-                loaded_devices_data = project_data.get('devices', [])
-                loaded_connections_data = project_data.get('connections', [])
-                print("检测到新格式配置文件 (包含设备和连接)。")
-            elif isinstance(project_data, list):
-                # 旧格式：只包含设备列表
-                loaded_devices_data = project_data
-                loaded_connections_data = [] # 旧格式无连接信息
-                print("警告: 检测到旧格式配置文件 (仅包含设备)，连接信息将不会被加载。")
-                # 可以在这里通过 parent_window 显示一个更明显的警告
-                # if parent_window: # 需要将 parent_window 传递进来
-                #     QMessageBox.warning(parent_window, "旧格式文件", "加载的文件是旧格式，仅设备信息被加载，连接信息丢失。")
-            else:
-                # 无效格式
-                raise TypeError("无法识别的项目文件格式 (既不是列表也不是字典)。")
-
 
-            # 2. 加载设备
+            # 1. 加载设备
             max_id = 0
             temp_device_map: Dict[int, Device] = {} # 用于查找设备对象
-            for data in loaded_devices_data:
+            for data in devices_data:
                 try:
                     # 确保 data 是字典
                     if not isinstance(data, dict):
@@ -953,69 +1223,119 @@ class NetworkManager:
                          continue
                     new_device = Device.from_dict(data)
                     self.devices.append(new_device)
+                    self._device_index[new_device.id] = new_device
                     temp_device_map[new_device.id] = new_device
                     if new_device.id > max_id:
                         max_id = new_device.id
                 except Exception as e:
                     print(f"警告: 加载设备数据时出错: {data} - {e}")
-            self.device_id_counter = max_id # 更新 ID 计数器
-
-            # 3. 加载并重建连接状态 (仅对新格式有效)
-            rebuilt_connections: List[ConnectionType] = []
-            if loaded_connections_data: # 只有新格式才有连接数据
-                print(f"正在加载 {len(loaded_connections_data)} 条连接...")
-                for conn_data in loaded_connections_data:
-                    # 确保 conn_data 是字典
-                    if not isinstance(conn_data, dict):
-                        print(f"警告: 跳过无效的连接条目 (非字典): {conn_data}")
-                        continue
-
-                    dev1_id = conn_data.get('dev1_id')
-                    port1 = conn_data.get('port1')
-                    dev2_id = conn_data.get('dev2_id')
-                    port2 = conn_data.get('port2')
-                    conn_type = conn_data.get('type', 'Unknown Type') # 提供默认值
-
-                    dev1 = temp_device_map.get(dev1_id)
-                    dev2 = temp_device_map.get(dev2_id)
-
-                    if dev1 and dev2 and port1 and port2:
-                        # 尝试在设备上标记端口占用
-                        # 注意：这里不进行兼容性检查，假设保存的文件是有效的
-                        if dev1.use_specific_port(port1, dev2.name):
-                            if dev2.use_specific_port(port2, dev1.name):
-                                rebuilt_connections.append((dev1, port1, dev2, port2, conn_type))
-                            else:
-                                print(f"警告: 加载连接时，设备 {dev2.name} 端口 {port2} 占用失败，已回滚 {dev1.name} 端口 {port1}。")
-                                dev1.return_port(port1) # 回滚
-                        else:
-                             print(f"警告: 加载连接时，设备 {dev1.name} 端口 {port1} 占用失败。")
-                    else:
-                        print(f"警告: 加载连接数据时跳过无效条目: {conn_data} (设备 ID {dev1_id} 或 {dev2_id} 未找到，或端口信息缺失)")
+            self.device_id_counter = max(max_id, device_id_counter or 0) # 更新 ID 计数器
 
-            self.connections = rebuilt_connections
+            # 2. 加载并重建连接状态 (仅对新格式有效)
+            if connection_records: # 只有新格式才有连接数据
+                print(f"正在加载 {len(connection_records)} 条连接...")
+            self.connections = self._rebuild_connections(connection_records, temp_device_map)
 
-            # 4. 更新图
-            self._update_graph()
+            # 3. 标记变化
+            self._notify(BULK_RESET)
 
-            print(f"项目已从 {filepath} 加载。 设备数: {len(self.devices)}, 连接数: {len(self.connections)}")
-            return True
+    def _read_json_project(self, filepath: str) -> Tuple[List[Dict], List[ConnectionRecord], Optional[Dict[str, Any]]]:
+        """
+        读取 JSON 项目文件 (新格式字典或仅包含设备列表的旧格式)，gzip / xz 压缩的文件按魔数自动解压。
 
-        except FileNotFoundError:
-            print(f"错误: 找不到项目文件: {filepath}")
-            # 清空状态以防部分加载
-            self.clear_all_devices_and_connections()
-            return False
-        except json.JSONDecodeError:
-            print(f"错误: 项目文件格式错误 (无法解析 JSON): {filepath}")
-            self.clear_all_devices_and_connections()
-            return False
-        except TypeError as e: # 捕获我们自己抛出的 TypeError
-             print(f"错误: 加载项目失败 - {e}")
-             self.clear_all_devices_and_connections()
-             return False
-        except Exception as e:
-            print(f"错误: 加载项目时发生未知错误 - {e}")
-            # 确保状态清空
-            self.clear_all_devices_and_connections()
-            return False
+        Args:
+            filepath (str): 项目文件路径。
+
+        Returns:
+            Tuple[List[Dict], List[ConnectionRecord], Optional[Dict[str, Any]]]: (设备数据字典列表, 连接记录列表, 视图数据)。
+
+        Raises:
+            json.JSONDecodeError: 文件不是有效的 JSON。
+            TypeError: JSON 顶层既不是列表也不是字典。
+        """
+        project_data = json.loads(read_project_bytes(filepath))
+
+        loaded_devices_data = []
+        loaded_connections_data = []
+        view = None
+
+        # **修复: 检查加载的数据格式**
+        if isinstance(project_data, dict):
+            # 新格式：包含 'devices' 和 'connections' 键的字典
+            loaded_devices_data = project_data.get('devices', [])
+            loaded_connections_data = project_data.get('connections', [])
+            view = project_data.get('view') if isinstance(project_data.get('view'), dict) else None # 旧文件没有视图数据
+            print("检测到新格式配置文件 (包含设备和连接)。")
+        elif isinstance(project_data, list):
+            # 旧格式：只包含设备列表
+            loaded_devices_data = project_data
+            loaded_connections_data = [] # 旧格式无连接信息
+            print("警告: 检测到旧格式配置文件 (仅包含设备)，连接信息将不会被加载。")
+            # 可以在这里通过 parent_window 显示一个更明显的警告
+            # if parent_window: # 需要将 parent_window 传递进来
+            #     QMessageBox.warning(parent_window, "旧格式文件", "加载的文件是旧格式，仅设备信息被加载，连接信息丢失。")
+        else:
+            # 无效格式
+            raise TypeError("无法识别的项目文件格式 (既不是列表也不是字典)。")
+
+        connection_records: List[ConnectionRecord] = []
+        for conn_data in loaded_connections_data:
+            # 确保 conn_data 是字典
+            if not isinstance(conn_data, dict):
+                print(f"警告: 跳过无效的连接条目 (非字典): {conn_data}")
+                continue
+            connection_records.append((conn_data.get('dev1_id'), conn_data.get('port1'), conn_data.get('dev2_id'),
+                                       conn_data.get('port2'), conn_data.get('type', 'Unknown Type'))) # 类型提供默认值
+        return loaded_devices_data, connection_records, view
+
+    def load_project(self, filepath: str) -> bool:
+        """
+        从项目文件加载设备列表和连接列表，覆盖当前状态；文件中保存的视图数据放入 view_state (没有时为 None)。
+        根据文件开头的魔数自动识别二进制格式 (.tdmc) 和压缩的 JSON (gzip / xz)，否则按 JSON 解析。
+        **增加了对旧格式（仅设备列表）的兼容性处理。**
+
+        Args:
+            filepath (str): 加载文件的完整路径。
+
+        Returns:
+            bool: 加载是否成功。
+        """
+        with self.batch_update(), _gc_paused(): # 加载期间不发出逐条事件，也不触发循环垃圾回收
+            try:
+                # 1. 读取项目文件 (按魔数识别格式)，读取成功后再清空当前状态
+                if is_binary_project(filepath):
+                    loaded_devices_data, connection_records, view = read_binary_project(filepath)
+                    print("检测到二进制项目文件。")
+                else:
+                    loaded_devices_data, connection_records, view = self._read_json_project(filepath)
+                print(f"尝试从 {filepath} 加载项目...")
+
+                # 2. 用读取到的记录替换当前状态 (退出 batch_update 时统一发出 BULK_RESET)
+                self.load_records(loaded_devices_data, connection_records)
+                self.view_state = view # 保存时的节点位置、布局算法和视口 (界面据此跳过布局计算)
+
+                print(f"项目已从 {filepath} 加载。 设备数: {len(self.devices)}, 连接数: {len(self.connections)}")
+                return True
+
+            except FileNotFoundError:
+                print(f"错误: 找不到项目文件: {filepath}")
+                # 清空状态以防部分加载
+                self.clear_all_devices_and_connections()
+                return False
+            except json.JSONDecodeError:
+                print(f"错误: 项目文件格式错误 (无法解析 JSON): {filepath}")
+                self.clear_all_devices_and_connections()
+                return False
+            except ProjectFormatError as e:
+                print(f"错误: 二进制项目文件格式错误 - {e}: {filepath}")
+                self.clear_all_devices_and_connections()
+                return False
+            except TypeError as e: # 捕获我们自己抛出的 TypeError
+                 print(f"错误: 加载项目失败 - {e}")
+                 self.clear_all_devices_and_connections()
+                 return False
+            except Exception as e:
+                print(f"错误: 加载项目时发生未知错误 - {e}")
+                # 确保状态清空
+                self.clear_all_devices_and_connections()
+                return False
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+core/project_io.py
+
+定义紧凑的二进制项目格式 (.tdmc) 的读写函数，以及打开 (可能经过压缩的) JSON 项目文件的函数。
+
+与 JSON 项目文件相比，二进制格式把所有字符串 (设备名称、类型、端口名称、连接类型) 去重后存入字符串表，
+设备和连接记录都是定长的 32 位无符号整数 (字符串以字符串表中的序号表示)，
+读取时通过内存映射直接把记录区转换为整数数组，无需逐条解析。
+
+文件布局 (小端序):
+    文件头      HEADER_STRUCT: 魔数 b'TDMC'、格式版本、保留标志、字符串数、设备数、连接数、字符串数据字节数
+    字符串偏移  (字符串数 + 1) 个 u32，第 i 个字符串为字符串数据中 [offset[i], offset[i+1]) 的 UTF-8 字节
+    设备记录    每个设备 DEVICE_FIELDS 个 u32: ID、名称序号、类型序号、MPO 数、LC 数、SFP+ 数
+    连接记录    每条连接 CONNECTION_FIELDS 个 u32: 设备1 记录序号、端口1 序号、设备2 记录序号、端口2 序号、类型序号
+    字符串数据  UTF-8 字节
+    视图数据    (仅当标志包含 FLAG_VIEW 时) u32 字节数 + UTF-8 JSON: 节点位置、布局算法和视口 (格式版本 2 起)
+
+JSON 项目文件还可以用 gzip 或 xz 压缩 (.json.gz / .json.xz)，读取时按文件开头的魔数识别。
+保存时 JSON 通过压缩流逐块写出 (open_project_text)；加载时先把解压后的整个文件读入一个 bytes 对象
+(read_project_bytes)，再由 json.loads() 一次解析。
+"""
+import gzip
+import json
+import lzma
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, IO, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .device import Device
+    from .network_manager import ConnectionType
+
+# --- 格式常量 ---
+MAGIC = b'TDMC'
+FORMAT_VERSION = 2 # 版本 2 增加了可选的视图数据 (版本 1 的文件仍可读取)
+BINARY_EXTENSION = '.tdmc'
+HEADER_STRUCT = struct.Struct('<4sHHIIII') # 魔数, 版本, 标志, 字符串数, 设备数, 连接数, 字符串数据字节数
+DEVICE_FIELDS = 6
+CONNECTION_FIELDS = 5
+FLAG_VIEW = 0x1 # 文件末尾包含视图数据
+# array 中 4 字节无符号整数的类型码 ('I' 在常见平台上为 4 字节)
+U32 = 'I' if array('I').itemsize == 4 else 'L'
+
+# 压缩格式: 名称 -> 魔数 / 扩展名
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_XZ = 'xz'
+COMPRESSION_MAGIC = {COMPRESSION_GZIP: b'\x1f\x8b', COMPRESSION_XZ: b'\xfd7zXZ\x00'}
+COMPRESSION_EXTENSIONS = {'.gz': COMPRESSION_GZIP, '.xz': COMPRESSION_XZ}
+# --- 结束常量 ---
+
+# 从二进制文件读出的连接记录: (设备1 ID, 端口1, 设备2 ID, 端口2, 连接类型)
+ConnectionRecord = Tuple[int, str, int, str, str]
+
+
+class ProjectFormatError(ValueError):
+    """项目文件内容不符合二进制格式 (魔数、版本或长度不匹配)。"""
+
+
+def is_binary_project(filepath: str) -> bool:
+    """
+    根据文件开头的魔数判断是否为二进制项目文件 (与扩展名无关)。
+
+    Args:
+        filepath (str): 项目文件路径。
+
+    Returns:
+        bool: 文件以 MAGIC 开头时返回 True。
+    """
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def detect_compression(filepath: str) -> Optional[str]:
+    """
+    根据文件开头的魔数判断文件的压缩格式。
+
+    Args:
+        filepath (str): 文件路径。
+
+    Returns:
+        Optional[str]: COMPRESSION_GZIP / COMPRESSION_XZ；未压缩时返回 None。
+    """
+    with open(filepath, 'rb') as f:
+        head = f.read(max(len(magic) for magic in COMPRESSION_MAGIC.values()))
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def compression_for_path(filepath: str) -> Optional[str]:
+    """根据扩展名 (.gz / .xz) 返回保存时使用的压缩格式，其他扩展名返回 None。"""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(filepath)[1].lower())
+
+
+def open_project_text(filepath: str, mode: str = 'r', newline: Optional[str] = None) -> IO[str]:
+    """
+    以文本模式打开 JSON 项目文件 (或其他文本输出文件)，透明处理 gzip / xz 压缩。
+
+    读取时按魔数识别压缩格式 (与扩展名无关)，写入时按扩展名选择压缩格式。
+    返回的流逐块压缩/解压；保存项目和命令行输出用它逐块写出。加载项目不经过此函数，见 read_project_bytes()。
+
+    Args:
+        filepath (str): 文件路径。
+        mode (str): 'r' 或 'w'。
+        newline (Optional[str]): 与内置 open() 的 newline 参数相同。
+
+    Returns:
+        IO[str]: UTF-8 文本流。
+    """
+    compression = detect_compression(filepath) if mode == 'r' else compression_for_path(filepath)
+    text_mode = mode + 't'
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(filepath, text_mode, encoding='utf-8', newline=newline)
+    if compression == COMPRESSION_XZ:
+        return lzma.open(filepath, text_mode, encoding='utf-8', newline=newline)
+    return open(filepath, mode, encoding='utf-8', newline=newline)
+
+
+def read_project_bytes(filepath: str) -> bytes:
+    """
+    读取 (可能经过 gzip / xz 压缩的) 项目文件的全部字节，压缩格式按魔数识别。
+
+    返回的是整个解压后的文件内容 (内存占用与解压后的文件大小相同)；
+    json.loads() 可以直接解析 UTF-8 字节，省去文本流逐块解码的开销。
+
+    Args:
+        filepath (str): 文件路径。
+
+    Returns:
+        bytes: 解压后的文件内容。
+    """
+    compression = detect_compression(filepath)
+    if compression == COMPRESSION_GZIP:
+        opener = gzip.open
+    elif compression == COMPRESSION_XZ:
+        opener = lzma.open
+    else:
+        opener = open
+    with opener(filepath, 'rb') as f:
+        return f.read()
+
+
+def _u32_array(values) -> array:
+    """创建小端序的 u32 数组 (用于写入)。"""
+    data = array(U32, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+
+def _read_u32(buffer, start: int, count: int) -> array:
+    """从缓冲区 start 处读取 count 个小端序 u32。"""
+    data = array(U32)
+    data.frombytes(buffer[start:start + count * 4])
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+
+def write_binary_project(filepath: str, devices: List['Device'], connections: List['ConnectionType'],
+                         view: Optional[Dict[str, Any]] = None):
+    """
+    将设备和连接写入二进制项目文件。
+
+    Args:
+        filepath (str): 输出文件路径。
+        devices (List['Device']): 设备列表。
+        connections (List['ConnectionType']): 连接列表 (两端设备必须在 devices 中)。
+        view (Optional[Dict[str, Any]]): 视图数据 (可序列化为 JSON，见 NetworkManager.view_state)；为 None 时不写入。
+
+    Raises:
+        OSError: 文件无法写入。
+        ValueError: 连接引用了不在设备列表中的设备。
+    """
+    strings: List[str] = []
+    string_index: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(strings)
+            strings.append(value)
+        return index
+
+    device_records: List[int] = []
+    device_row: Dict[int, int] = {} # 设备 ID -> 设备记录序号
+    for row, dev in enumerate(devices):
+        device_row[dev.id] = row
+        device_records.extend((dev.id, intern(dev.name), intern(dev.type), dev.mpo_total, dev.lc_total, dev.sfp_total))
+
+    connection_records: List[int] = []
+    for dev1, port1, dev2, port2, conn_type in connections:
+        if dev1.id not in device_row or dev2.id not in device_row:
+            raise ValueError(f"连接引用了未知设备: {dev1.name} <-> {dev2.name}")
+        connection_records.extend((device_row[dev1.id], intern(port1), device_row[dev2.id], intern(port2), intern(conn_type)))
+
+    encoded = [value.encode('utf-8') for value in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    view_data = json.dumps(view, ensure_ascii=False).encode('utf-8') if view is not None else b''
+    flags = FLAG_VIEW if view is not None else 0
+
+    with open(filepath, 'wb') as f:
+        f.write(HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, flags, len(strings), len(devices), len(connections), offsets[-1]))
+        _u32_array(offsets).tofile(f)
+        _u32_array(device_records).tofile(f)
+        _u32_array(connection_records).tofile(f)
+        f.write(b''.join(encoded))
+        if flags & FLAG_VIEW:
+            _u32_array([len(view_data)]).tofile(f)
+            f.write(view_data)
+
+
+def read_binary_project(filepath: str) -> Tuple[List[Dict], List[ConnectionRecord], Optional[Dict[str, Any]]]:
+    """
+    通过内存映射读取二进制项目文件。
+
+    Args:
+        filepath (str): 项目文件路径。
+
+    Returns:
+        Tuple[List[Dict], List[ConnectionRecord], Optional[Dict[str, Any]]]:
+            (设备数据字典列表 (与 Device.from_dict() 的参数格式一致), 连接记录列表, 视图数据 (没有时为 None))。
+
+    Raises:
+        ProjectFormatError: 文件不是受支持的二进制项目文件或内容被截断/损坏。
+        OSError: 文件无法读取。
+    """
+    with open(filepath, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # 空文件无法映射
+            raise ProjectFormatError("文件为空")
+        with buffer:
+            if len(buffer) < HEADER_STRUCT.size:
+                raise ProjectFormatError("文件头不完整")
+            magic, version, flags, n_strings, n_devices, n_connections, string_bytes = HEADER_STRUCT.unpack_from(buffer, 0)
+            if magic != MAGIC:
+                raise ProjectFormatError("不是二进制项目文件 (魔数不匹配)")
+            if version > FORMAT_VERSION:
+                raise ProjectFormatError(f"不支持的二进制格式版本 {version} (当前支持 {FORMAT_VERSION})")
+
+            offsets_start = HEADER_STRUCT.size
+            devices_start = offsets_start + (n_strings + 1) * 4
+            connections_start = devices_start + n_devices * DEVICE_FIELDS * 4
+            strings_start = connections_start + n_connections * CONNECTION_FIELDS * 4
+            view_start = strings_start + string_bytes
+            view_bytes = 0
+            if flags & FLAG_VIEW:
+                if len(buffer) < view_start + 4:
+                    raise ProjectFormatError("文件长度与文件头不一致 (文件可能被截断或损坏)")
+                view_bytes = _read_u32(buffer, view_start, 1)[0]
+                view_start += 4
+            if len(buffer) != view_start + view_bytes:
+                raise ProjectFormatError("文件长度与文件头不一致 (文件可能被截断或损坏)")
+
+            offsets = _read_u32(buffer, offsets_start, n_strings + 1)
+            string_data = buffer[strings_start:strings_start + string_bytes]
+            try:
+                strings = [string_data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(n_strings)]
+            except UnicodeDecodeError as e:
+                raise ProjectFormatError(f"字符串表损坏: {e}")
+
+            device_fields = _read_u32(buffer, devices_start, n_devices * DEVICE_FIELDS)
+            connection_fields = _read_u32(buffer, connections_start, n_connections * CONNECTION_FIELDS)
+
+            view = None
+            if flags & FLAG_VIEW:
+                try:
+                    view = json.loads(buffer[view_start:view_start + view_bytes].decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                    raise ProjectFormatError(f"视图数据损坏: {e}")
+
+    try:
+        devices_data = [
+            {'id': dev_id, 'name': strings[name], 'type': strings[dev_type],
+             'mpo_ports': mpo, 'lc_ports': lc, 'sfp_ports': sfp}
+            for dev_id, name, dev_type, mpo, lc, sfp in zip(*(iter(device_fields),) * DEVICE_FIELDS)
+        ]
+        device_ids = [data['id'] for data in devices_data]
+        connection_records = [
+            (device_ids[row1], strings[port1], device_ids[row2], strings[port2], strings[conn_type])
+            for row1, port1, row2, port2, conn_type in zip(*(iter(connection_fields),) * CONNECTION_FIELDS)
+        ]
+    except IndexError:
+        raise ProjectFormatError("记录引用了不存在的字符串或设备")
+    return devices_data, connection_records, view
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+core/search_index.py
+
+定义用于设备/连接过滤的子串搜索索引。
+索引订阅 NetworkManager 的变更事件增量维护，过滤查询只处理匹配的条目，与设备/连接总数无关。
+"""
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from .events import (
+    ChangeEvent, DEVICE_ADDED, DEVICE_REMOVED, DEVICE_UPDATED, CONNECTION_ADDED, CONNECTION_REMOVED, BULK_RESET
+)
+
+if TYPE_CHECKING:
+    from .network_manager import NetworkManager, ConnectionType
+
+NGRAM = 3 # 索引的最长 n-gram；更短的查询直接命中 1/2-gram 的倒排表
+
+
+class SubstringIndex:
+    """
+    对字符串值建立 n-gram 倒排索引，每个键关联若干个值 (不区分大小写)。
+
+    倒排表以不同的值为单位 (设备名、端口名等取值数量远少于连接数)，
+    查询先用 n-gram 交集得到候选值，再逐个确认子串关系，最后合并这些值关联的键。
+    """
+
+    def __init__(self):
+        """初始化空索引。"""
+        self._keys_by_value: Dict[str, Set[Hashable]] = {}          # 值 -> 关联的键
+        self._values_by_key: Dict[Hashable, Tuple[str, ...]] = {}   # 键 -> 关联的值
+        self._values_by_gram: Dict[str, Set[str]] = defaultdict(set) # n-gram -> 包含它的值
+
+    @staticmethod
+    def _grams(value: str) -> Set[str]:
+        """返回值中所有长度为 1..NGRAM 的子串。"""
+        return {value[i:i + n] for n in range(1, NGRAM + 1) for i in range(len(value) - n + 1)}
+
+    def set(self, key: Hashable, values: Iterable[str]):
+        """
+        设置键关联的值 (替换之前的值)。
+
+        Args:
+            key (Hashable): 键 (例如设备 ID)。
+            values (Iterable[str]): 可被搜索到的字符串。
+        """
+        self.discard(key)
+        normalized = tuple({value.lower() for value in values if value})
+        self._values_by_key[key] = normalized
+        for value in normalized:
+            keys = self._keys_by_value.get(value)
+            if keys is None:
+                keys = self._keys_by_value[value] = set()
+                for gram in self._grams(value):
+                    self._values_by_gram[gram].add(value)
+            keys.add(key)
+
+    def discard(self, key: Hashable):
+        """移除键及其关联的值 (键不存在时忽略)。"""
+        for value in self._values_by_key.pop(key, ()):
+            keys = self._keys_by_value[value]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_value[value]
+                for gram in self._grams(value):
+                    values = self._values_by_gram[gram]
+                    values.discard(value)
+                    if not values:
+                        del self._values_by_gram[gram]
+
+    def clear(self):
+        """清空索引。"""
+        self._keys_by_value.clear()
+        self._values_by_key.clear()
+        self._values_by_gram.clear()
+
+    def matching_values(self, text: str) -> List[str]:
+        """返回包含 text (小写) 作为子串的所有值。"""
+        if len(text) <= NGRAM:
+            return list(self._values_by_gram.get(text, ()))
+        postings = []
+        for i in range(len(text) - NGRAM + 1):
+            values = self._values_by_gram.get(text[i:i + NGRAM])
+            if not values:
+                return []
+            postings.append(values)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return [value for value in candidates if text in value]
+
+    def query(self, text: str) -> Set[Hashable]:
+        """
+        返回任一关联值包含 text 的键 (不区分大小写)。
+
+        Args:
+            text (str): 查询文本，不能为空。
+
+        Returns:
+            Set[Hashable]: 匹配的键。
+        """
+        matched: Set[Hashable] = set()
+        for value in self.matching_values(text.lower()):
+            matched.update(self._keys_by_value[value])
+        return matched
+
+
+class NetworkSearchIndex:
+    """
+    设备与连接的搜索索引，订阅 NetworkManager 的变更事件增量更新。
+
+    设备按名称和类型检索；连接按两端设备名称和端口名称检索。连接的键为 id(连接元组)
+    (元组由管理器持有，移除时同步从索引中删除)，设备重命名只需更新设备名称索引。
+    注意：索引需要在使用它过滤的模型之前订阅，确保模型插入行时索引已包含新条目。
+    """
+
+    def __init__(self, network_manager: 'NetworkManager'):
+        """
+        初始化并订阅管理器的变更事件。
+
+        Args:
+            network_manager ('NetworkManager'): 网络管理器实例。
+        """
+        self.network_manager = network_manager
+        self.version = 0                                             # 索引内容每次变化时递增
+        self._device_names = SubstringIndex()                        # 设备 ID -> 名称
+        self._device_types = SubstringIndex()                        # 设备 ID -> 类型
+        self._connection_ports = SubstringIndex()                    # id(连接) -> 两端端口名
+        self._connections_by_device: Dict[int, Set[int]] = defaultdict(set) # 设备 ID -> id(连接)
+        self._cache: Dict[Tuple[str, str], Set] = {}                 # (类别, 查询文本) -> 结果，索引变化时清空
+        self.rebuild()
+        network_manager.subscribe(self._on_network_changed)
+
+    def rebuild(self):
+        """根据管理器当前的设备和连接重建索引。"""
+        self._device_names.clear(); self._device_types.clear(); self._connection_ports.clear()
+        self._connections_by_device.clear()
+        for device in self.network_manager.get_all_devices():
+            self._add_device(device)
+        for connection in self.network_manager.get_all_connections():
+            self._add_connection(connection)
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._cache.clear()
+
+    def _add_device(self, device):
+        self._device_names.set(device.id, (device.name,))
+        self._device_types.set(device.id, (device.type,))
+
+    def _add_connection(self, connection: 'ConnectionType'):
+        key = id(connection)
+        self._connection_ports.set(key, (connection[1], connection[3]))
+        self._connections_by_device[connection[0].id].add(key)
+        self._connections_by_device[connection[2].id].add(key)
+
+    def _remove_connection(self, connection: 'ConnectionType'):
+        key = id(connection)
+        self._connection_ports.discard(key)
+        for device_id in (connection[0].id, connection[2].id):
+            keys = self._connections_by_device.get(device_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys: del self._connections_by_device[device_id]
+
+    def _on_network_changed(self, event: ChangeEvent):
+        """根据变更事件增量更新索引。"""
+        if event.kind in (DEVICE_ADDED, DEVICE_UPDATED):
+            self._add_device(event.device)
+        elif event.kind == DEVICE_REMOVED:
+            self._device_names.discard(event.device.id)
+            self._device_types.discard(event.device.id)
+            self._connections_by_device.pop(event.device.id, None)
+        elif event.kind == CONNECTION_ADDED:
+            self._add_connection(event.connection)
+        elif event.kind == CONNECTION_REMOVED:
+            self._remove_connection(event.connection)
+        elif event.kind == BULK_RESET:
+            self.rebuild()
+            return
+        self._changed()
+
+    # --- 查询 ---
+
+    def match_devices(self, text: str) -> Optional[Set[int]]:
+        """
+        查询名称或类型包含 text 的设备。
+
+        Args:
+            text (str): 查询文本 (不区分大小写)。
+
+        Returns:
+            Optional[Set[int]]: 匹配的设备 ID；text 为空时返回 None (表示不过滤)。
+        """
+        text = text.strip().lower()
+        if not text:
+            return None
+        result = self._cache.get(('device', text))
+        if result is None:
+            result = self._cache[('device', text)] = self._device_names.query(text) | self._device_types.query(text)
+        return result
+
+    def match_connections(self, text: str) -> Optional[Set[int]]:
+        """
+        查询任一端设备名称或端口名称包含 text 的连接。
+
+        Args:
+            text (str): 查询文本 (不区分大小写)。
+
+        Returns:
+            Optional[Set[int]]: 匹配连接的 id(连接元组)；text 为空时返回 None (表示不过滤)。
+        """
+        text = text.strip().lower()
+        if not text:
+            return None
+        result = self._cache.get(('connection', text))
+        if result is None:
+            result = self._connection_ports.query(text)
+            for device_id in self._device_names.query(text):
+                result |= self._connections_by_device.get(device_id, set())
+            self._cache[('connection', text)] = result
+        return result
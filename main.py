@@ -6,12 +6,19 @@ MediorNet TDM 连接计算器的主入口点。
 负责初始化应用程序、加载样式、创建并显示主窗口。
 """
 
+import time
+_STARTUP_BEGIN = time.perf_counter() # 尽早记录启动时间，用于启动耗时报告
+
 import sys
 import os
 
 # 导入 PySide6 组件
 from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
+
+from utils.startup_timer import StartupTimer
+startup_timer = StartupTimer(_STARTUP_BEGIN)
+startup_timer.mark("导入 Qt")
 
 # 导入重构后的主窗口类 (假设它在 ui 包中)
 # 注意：需要确保 ui 目录在 Python 的搜索路径中，或者使用相对导入
@@ -31,6 +38,7 @@ except ImportError as e1:
     except ImportError as e2:
          print(f"无法导入 MainWindow: {e2}. 请确保 main_window.py 文件存在且路径正确。")
          sys.exit(1) # 无法继续，退出
+startup_timer.mark("导入主窗口模块")
 
 # --- 辅助函数 resource_path (暂时保留在这里，最终移到 utils) ---
 def resource_path(relative_path):
@@ -71,6 +79,7 @@ if __name__ == "__main__":
 
     # 创建 QApplication 实例
     app = QApplication(sys.argv)
+    startup_timer.mark("创建 QApplication")
 
     # 加载并应用 QSS 样式 (假设 APP_STYLE 在 MainWindow 中定义或导入)
     try:
@@ -86,10 +95,18 @@ if __name__ == "__main__":
     try:
         window = MainWindow()
         print("MainWindow 实例已创建。")
+        startup_timer.mark("创建主窗口")
 
         # 显示主窗口
         window.show()
         print("主窗口已显示。")
+        startup_timer.mark("显示主窗口")
+
+        # 事件循环处理完首批事件 (首次绘制) 后窗口即可交互，此时输出启动耗时报告
+        def _report_startup():
+            startup_timer.mark("进入事件循环")
+            print(startup_timer.report())
+        QTimer.singleShot(0, _report_startup)
 
         # 启动应用程序事件循环
         sys.exit(app.exec())
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_cli.py
+
+命令行 batch 子命令的测试: 目录中的各种项目文件格式 (JSON、gzip / xz 压缩的 JSON、二进制 .tdmc) 都会被处理。
+
+运行: python -m unittest discover -s tests -t .
+"""
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import unittest
+
+from core.cli import EXIT_OK, expand_project_paths, main
+from core.device import DEV_UHD
+from core.network_manager import NetworkManager
+
+# 项目文件名 -> 输出文件名 (不含扩展名)
+PROJECT_FILES = {'plain.json': 'plain', 'gzipped.json.gz': 'gzipped', 'compressed.json.xz': 'compressed', 'binary.tdmc': 'binary'}
+
+
+class BatchDirectoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project_dir = os.path.join(self._tmp.name, 'projects')
+        self.output_dir = os.path.join(self._tmp.name, 'out')
+        os.makedirs(self.project_dir)
+        manager = NetworkManager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(3):
+                manager.add_device(f"UHD-{i}", DEV_UHD, 1, 2, 0)
+            for name in PROJECT_FILES:
+                self.assertTrue(manager.save_project(os.path.join(self.project_dir, name)))
+        with open(os.path.join(self.project_dir, 'notes.txt'), 'w', encoding='utf-8') as f:
+            f.write("不是项目文件")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_directory_includes_compressed_projects(self):
+        found = sorted(os.path.basename(path) for path in expand_project_paths([self.project_dir]))
+        self.assertEqual(found, sorted(PROJECT_FILES))
+
+    def test_batch_over_directory(self):
+        summary = os.path.join(self._tmp.name, 'summary.csv')
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = main(['batch', self.project_dir, '--output-dir', self.output_dir, '--formats', 'csv',
+                         '--summary', summary, '-j', '1', '--seed', '1', '-q'])
+        self.assertEqual(code, EXIT_OK)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), sorted(stem + '.csv' for stem in PROJECT_FILES.values()))
+        with open(summary, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), len(PROJECT_FILES))
+        self.assertEqual({row['设备'] for row in rows}, {'3'})
+        self.assertEqual({row['错误'] for row in rows}, {''})
+        self.assertEqual(len({row['连接'] for row in rows}), 1) # 同一项目的各种格式得到相同的结果
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_journal.py
+
+项目日志的恢复测试: 正常记录后崩溃、压缩被中断 (快照写入失败 / 快照写入后未删除 .journal.compacting) 后崩溃。
+"崩溃" 通过在 close() 之前直接从磁盘上的文件恢复来模拟。
+
+运行: python -m unittest discover -s tests -t .
+"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from core.device import DEV_UHD, DEV_MN
+from core.journal import OP_BATCH, OP_BULK, OP_RESET, ProjectJournal, ProjectState, journal_paths, read_recovery_state, recover_project
+from core.network_manager import NetworkManager
+
+COMPACT_NEVER = 3600.0 # 测试中不让后台线程自动压缩，由测试显式调用 compact()
+
+
+def _state(manager: NetworkManager):
+    """用于比较的完整状态: 项目数据、设备 ID 计数器和端口占用。"""
+    return (manager.to_project_dict(), manager.device_id_counter,
+            {dev.id: dict(dev.port_connections) for dev in manager.devices})
+
+
+class JournalRecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project_path = os.path.join(self._tmp.name, 'project.json')
+        self.paths = journal_paths(self.project_path)
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+        self.manager = NetworkManager()
+        for i in range(4):
+            self.manager.add_device(f"UHD-{i}", DEV_UHD, 2, 4, 0)
+        self.manager.add_device("MN", DEV_MN, 0, 0, 8)
+        self.journal = self._new_journal()
+        self.journal.start()
+
+    def _new_journal(self) -> ProjectJournal:
+        return ProjectJournal(self.manager, self.project_path, compact_interval=COMPACT_NEVER, compact_threshold=10 ** 9)
+
+    def tearDown(self):
+        self.journal.close(discard=True)
+        self._quiet.__exit__(None, None, None)
+        self._tmp.cleanup()
+
+    def _edit_before(self):
+        """压缩前的修改: 单条事件和批量修改 (BULK_RESET 差异) 都有。"""
+        self.manager.add_device("X", DEV_UHD, 1, 1, 0)
+        self.manager.add_connection(1, 'LC1', 2, 'LC1')
+        self.manager.update_device(2, new_name="UHD-1 (改名)")
+        self.manager.apply_connections(self.manager.calculate_mesh())
+
+    def _edit_after(self):
+        """压缩后追加到新日志的修改。"""
+        self.manager.remove_device(3)
+        self.manager.add_device("Y", DEV_MN, 0, 0, 4)
+        self.manager.remove_connection(1, 'LC1', 2, 'LC1')
+
+    def _assert_recovers(self, expected_replayed=None):
+        recovered = NetworkManager()
+        replayed = recover_project(recovered, self.project_path)
+        self.assertEqual(_state(recovered), _state(self.manager))
+        if expected_replayed is not None:
+            self.assertEqual(replayed, expected_replayed)
+
+    def test_recover_without_compaction(self):
+        self._edit_before()
+        self._edit_after()
+        self._assert_recovers()
+
+    def test_recover_after_failed_snapshot_write(self):
+        self._edit_before()
+
+        def crash(path, *args):
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write('{"devices": [') # 写到一半的临时文件不能影响已有快照
+            raise OSError("模拟写入快照时崩溃")
+
+        with mock.patch('core.journal._write_snapshot', side_effect=crash):
+            with self.assertRaises(OSError):
+                self.journal.compact()
+        self.assertTrue(os.path.exists(self.paths.compacting))
+        self.assertEqual(read_recovery_state(self.project_path)[1], self.journal.pending_records)
+
+        self._edit_after()
+        self._assert_recovers(expected_replayed=self.journal.pending_records)
+
+    def test_retry_after_failed_compaction(self):
+        self._edit_before()
+        with mock.patch('core.journal._write_snapshot', side_effect=OSError("模拟磁盘已满")):
+            with self.assertRaises(OSError):
+                self.journal.compact()
+        self._edit_after()
+        self.journal.compact() # 不再轮换日志，快照包含 .compacting 和新日志中的全部记录
+        self.assertFalse(os.path.exists(self.paths.compacting))
+        self._assert_recovers(expected_replayed=0)
+
+    def test_recover_with_stale_compacting_file(self):
+        self._edit_before()
+        stale = self.paths.journal + '.copy'
+        shutil.copyfile(self.paths.journal, stale)
+        self.journal.compact()
+        # 快照已写入、删除 .compacting 之前崩溃: 其中的记录都已包含在快照中，不能再次应用
+        os.replace(stale, self.paths.compacting)
+
+        self._edit_after()
+        self._assert_recovers(expected_replayed=self.journal.pending_records)
+
+    def test_restart_from_saved_snapshot_keeps_later_edits(self):
+        # 后台保存期间的修改: 保存的是修改前的快照，重新开始的日志必须保留这些修改
+        self._edit_before()
+        saved = self.manager.snapshot()
+        self._edit_after()
+        self.journal.close(discard=True)
+        self.journal = self._new_journal()
+        self.journal.start(saved)
+        self.assertEqual(self.journal.pending_records, 1)
+        self._assert_recovers(expected_replayed=1)
+
+        self.journal.close()
+        self.assertTrue(os.path.exists(self.paths.snapshot))
+        self._assert_recovers(expected_replayed=0)
+
+    def test_restart_from_saved_snapshot_without_edits(self):
+        saved = self.manager.snapshot()
+        self.journal.close(discard=True)
+        self.journal = self._new_journal()
+        self.journal.start(saved)
+        self.assertEqual(self.journal.pending_records, 0)
+        self.journal.close()
+        self.assertFalse(os.path.exists(self.paths.snapshot))
+
+    def test_write_failure_discards_stale_recovery_data(self):
+        self._edit_before()
+        self.journal.compact() # 快照中已有失败前的修改
+
+        class _FullDisk(io.StringIO):
+            def write(self, text):
+                raise OSError("模拟磁盘已满")
+
+        self.journal._file.close()
+        self.journal._file = _FullDisk()
+        self._edit_after()
+        self.assertTrue(self.journal.failed)
+        self.assertIsNone(self.journal._thread) # 压缩线程已停止
+        self.assertFalse(any(os.path.exists(path) for path in self.paths))
+
+        self.manager.add_device("Z", DEV_UHD, 1, 1, 0) # 失败后的修改不再记录
+        self.journal.close()
+        self.assertFalse(any(os.path.exists(path) for path in self.paths))
+
+    def _last_record_op(self) -> str:
+        with open(self.paths.journal, 'r', encoding='utf-8') as f:
+            return json.loads(f.read().splitlines()[-1])['op']
+
+    def test_batch_updates_are_journaled_without_full_diff(self):
+        # 批量修改只记录期间的逐条修改，不比较完整状态
+        with mock.patch.object(ProjectState, 'diff', side_effect=AssertionError("批量修改不应比较完整状态")):
+            self.manager.apply_connections(self.manager.calculate_mesh())
+            self.assertEqual(self._last_record_op(), OP_BATCH)
+            with self.manager.batch_update():
+                self.manager.add_device("X", DEV_UHD, 1, 1, 0)
+                self.manager.remove_connection(*self._first_connection_ports())
+                self.manager.update_device(2, new_name="UHD-1 (改名)")
+                self.manager.remove_device(3)
+            self.assertEqual(self._last_record_op(), OP_BATCH)
+            self.manager.clear_connections()
+            self.assertEqual(self._last_record_op(), OP_BATCH)
+            dev1, dev2 = self.manager.devices[:2]
+            self.manager.add_connections_bulk([(dev1, 'LC1', dev2, 'LC1', 'LC-LC (100G)')])
+            self.assertEqual(self._last_record_op(), OP_BATCH)
+        self._assert_recovers()
+
+    def _first_connection_ports(self):
+        dev1, port1, dev2, port2, _ = self.manager.connections[0]
+        return dev1.id, port1, dev2.id, port2
+
+    def test_load_records_is_journaled_as_state_diff(self):
+        # 加载无法逐条表示，仍然比较完整状态
+        other = NetworkManager()
+        other.add_device("Other", DEV_MN, 0, 0, 2)
+        devices_data = [dev.to_dict() for dev in other.devices]
+        self.manager.load_records(devices_data, [])
+        self.assertIn(self._last_record_op(), (OP_BULK, OP_RESET))
+        self._assert_recovers()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_project_io.py
+
+二进制项目文件 (.tdmc) 的往返测试: 版本 2 (含视图数据 / 不含视图数据) 以及旧的版本 1 文件。
+
+运行: python -m unittest discover -s tests -t .
+"""
+import contextlib
+import io
+import os
+import struct
+import tempfile
+import unittest
+
+from core.device import DEV_UHD, DEV_MN
+from core.network_manager import NetworkManager
+from core.project_io import (
+    FLAG_VIEW, FORMAT_VERSION, HEADER_STRUCT, MAGIC, ProjectFormatError,
+    is_binary_project, read_binary_project, write_binary_project,
+)
+
+VIEW = {
+    'layout': 'kamada-kawai',
+    'node_positions': {'1': [0.0, 1.5], '2': [-2.25, 0.5], '3': [3.0, -1.0]},
+    'viewport': [-4.0, 4.0, -3.0, 3.0],
+}
+
+
+def _build_manager() -> NetworkManager:
+    """构造一个包含几种设备和连接 (含非 ASCII 名称) 的小项目。"""
+    manager = NetworkManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager.add_device("UHD-1", DEV_UHD, 2, 4, 0)
+        manager.add_device("机柜 B / UHD", DEV_UHD, 1, 2, 0)
+        manager.add_device("MN", DEV_MN, 0, 0, 8)
+        manager.add_connection(1, 'LC1', 2, 'LC1')
+        manager.add_connection(1, 'MPO1-Ch1', 2, 'MPO1-Ch1')
+        manager.add_connection(1, 'MPO1-Ch2', 3, 'SFP8')
+    assert len(manager.connections) == 3, "测试项目的连接创建失败"
+    return manager
+
+
+def _connection_keys(connections):
+    """连接对象列表 -> (设备1 ID, 端口1, 设备2 ID, 端口2, 类型) 列表。"""
+    return [(dev1.id, port1, dev2.id, port2, conn_type) for dev1, port1, dev2, port2, conn_type in connections]
+
+
+class BinaryProjectRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'project.tdmc')
+        self.manager = _build_manager()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, view=None):
+        write_binary_project(self.path, self.manager.devices, self.manager.connections, view)
+
+    def _assert_records_match(self, devices_data, connection_records):
+        self.assertEqual(devices_data, [dev.to_dict() for dev in self.manager.devices])
+        self.assertEqual(connection_records, _connection_keys(self.manager.connections))
+
+    def test_v2_with_view(self):
+        self._write(VIEW)
+        with open(self.path, 'rb') as f:
+            header = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+        self.assertEqual(header[:3], (MAGIC, FORMAT_VERSION, FLAG_VIEW))
+        devices_data, connection_records, view = read_binary_project(self.path)
+        self._assert_records_match(devices_data, connection_records)
+        self.assertEqual(view, VIEW)
+
+    def test_v2_without_view(self):
+        self._write()
+        devices_data, connection_records, view = read_binary_project(self.path)
+        self._assert_records_match(devices_data, connection_records)
+        self.assertIsNone(view)
+
+    def test_v1_file_still_loads(self):
+        # 版本 1 的布局与不含视图数据的版本 2 相同，只是文件头中的版本号为 1
+        self._write()
+        with open(self.path, 'r+b') as f:
+            f.seek(4)
+            f.write(struct.pack('<HH', 1, 0))
+        devices_data, connection_records, view = read_binary_project(self.path)
+        self._assert_records_match(devices_data, connection_records)
+        self.assertIsNone(view)
+
+    def test_manager_save_and_load(self):
+        self.manager.view_state = VIEW
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(self.manager.save_project(self.path))
+            self.assertTrue(is_binary_project(self.path))
+            loaded = NetworkManager()
+            self.assertTrue(loaded.load_project(self.path))
+        self.assertEqual(loaded.to_project_dict(), self.manager.to_project_dict())
+        self.assertEqual(loaded.view_state, VIEW)
+        self.assertEqual({dev.id: dev.port_connections for dev in loaded.devices},
+                         {dev.id: dev.port_connections for dev in self.manager.devices})
+
+    def test_truncated_view_is_rejected(self):
+        self._write(VIEW)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        with self.assertRaises(ProjectFormatError):
+            read_binary_project(self.path)
+
+    def test_newer_version_is_rejected(self):
+        self._write()
+        with open(self.path, 'r+b') as f:
+            f.seek(4)
+            f.write(struct.pack('<H', FORMAT_VERSION + 1))
+        with self.assertRaises(ProjectFormatError):
+            read_binary_project(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
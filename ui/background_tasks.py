@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+ui/background_tasks.py
+
+定义 BackgroundTaskRunner 类，在 QThreadPool 中运行耗时任务 (保存项目、导出文件)，
+并通过信号在 GUI 线程中报告进度、完成和失败。
+
+任务函数在工作线程中执行，只能访问调用方事先准备好的不可变快照
+(NetworkManager.snapshot() 返回的副本、export_utils.copy_figure() 复制的 Figure)，不能访问界面对象。
+任务函数的第一个参数是进度回调 progress(百分比, 说明)，可在工作线程中直接调用。
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+# 进度回调类型: (百分比 0-100, 说明)
+ProgressCallback = Callable[[int, str], None]
+
+
+class _TaskSignals(QObject):
+    """QRunnable 不是 QObject，通过此对象发出信号 (在 GUI 线程中创建，信号以队列方式送达)。"""
+    progress = Signal(int, str)
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class _BackgroundTask(QRunnable):
+    """在线程池中调用 func(progress, *args) 的任务。"""
+
+    def __init__(self, func: Callable[..., Any], args: tuple):
+        super().__init__()
+        self.setAutoDelete(False) # 由 BackgroundTaskRunner 持有，信号送达前不能被删除
+        self.func = func
+        self.args = args
+        self.signals = _TaskSignals()
+
+    def run(self):
+        """在工作线程中执行任务，结果或异常通过信号返回 GUI 线程。"""
+        try:
+            result = self.func(self.signals.progress.emit, *self.args)
+        except Exception as e:
+            print(f"后台任务出错: {e}")
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+class BackgroundTaskRunner(QObject):
+    """
+    后台任务调度器。
+
+    通过 start() 提交任务，任务在线程池中依次 (或并行，取决于线程池大小) 执行。
+    所有信号都在 GUI 线程中发出，槽函数可以直接更新界面。
+    """
+    progress = Signal(str, int, str)     # 任务名称, 百分比, 说明
+    finished = Signal(str, object)       # 任务名称, 任务函数的返回值
+    failed = Signal(str, str)            # 任务名称, 错误信息
+    active_count_changed = Signal(int)   # 正在运行或排队的任务数
+
+    def __init__(self, parent: Optional[QObject] = None, max_threads: Optional[int] = None):
+        """
+        初始化后台任务调度器。
+
+        Args:
+            parent (Optional[QObject]): 父对象。
+            max_threads (Optional[int]): 线程池的最大线程数；为 None 时使用 Qt 的默认值 (CPU 核数)。
+        """
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads:
+            self.pool.setMaxThreadCount(max_threads)
+        self._tasks: Dict[_BackgroundTask, Optional[Callable[[Any], None]]] = {} # 任务 -> 完成回调
+
+    @property
+    def active_count(self) -> int:
+        """正在运行或排队的任务数。"""
+        return len(self._tasks)
+
+    def start(self, name: str, func: Callable[..., Any], *args, on_finished: Optional[Callable[[Any], None]] = None):
+        """
+        提交后台任务。
+
+        Args:
+            name (str): 任务名称，用于进度显示和完成/失败提示。
+            func (Callable[..., Any]): 任务函数，以 func(progress, *args) 的形式在工作线程中调用。
+            *args: 传给任务函数的参数 (应为快照，不能是会被界面修改的对象)。
+            on_finished (Optional[Callable[[Any], None]]): 任务成功后在 GUI 线程中调用，参数为任务函数的返回值。
+        """
+        task = _BackgroundTask(func, args)
+        task.signals.progress.connect(lambda percent, message: self.progress.emit(name, percent, message))
+        task.signals.finished.connect(lambda result: self._on_task_finished(task, name, result))
+        task.signals.failed.connect(lambda error: self._on_task_failed(task, name, error))
+        self._tasks[task] = on_finished
+        self.active_count_changed.emit(len(self._tasks))
+        self.progress.emit(name, 0, f"{name}...")
+        self.pool.start(task)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """等待所有任务结束 (例如关闭窗口前)，返回是否在超时前全部结束。"""
+        return self.pool.waitForDone(msecs)
+
+    def _on_task_finished(self, task: _BackgroundTask, name: str, result: Any):
+        """任务成功: 调用完成回调并发出 finished。"""
+        on_finished = self._tasks.pop(task, None)
+        self.active_count_changed.emit(len(self._tasks))
+        if on_finished:
+            on_finished(result)
+        self.finished.emit(name, result)
+
+    def _on_task_failed(self, task: _BackgroundTask, name: str, error: str):
+        """任务失败: 发出 failed。"""
+        self._tasks.pop(task, None)
+        self.active_count_changed.emit(len(self._tasks))
+        self.failed.emit(name, error)
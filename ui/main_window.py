@@ -14,6 +14,7 @@ import base64
 import io
 import datetime
 import random
+import time
 from collections import defaultdict
 from typing import Optional, List, Dict, Tuple, Set, Any
 
@@ -22,47 +23,64 @@ from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QComboBox, QTextEdit,
     QTabWidget, QFrame, QFileDialog, QMessageBox, QSpacerItem, QSizePolicy,
-    QGridLayout, QListWidgetItem, QAbstractItemView, QTableWidget,
-    QTableWidgetItem, QHeaderView, QListWidget, QSplitter, QCheckBox
+    QGridLayout, QAbstractItemView,
+    QHeaderView, QSplitter, QCheckBox, QProgressBar
 )
-from PySide6.QtCore import Slot, Qt
+from PySide6.QtCore import Slot, Qt, QModelIndex, QTimer, QStandardPaths
 from PySide6.QtGui import QFont, QGuiApplication, QFontDatabase
 
-# Matplotlib imports
-from matplotlib import font_manager
-import matplotlib.pyplot as plt
-# from matplotlib.lines import Line2D # 由 Controller 管理
-
-# NetworkX import
-import networkx as nx
+# Matplotlib/NetworkX 由 topology_canvas 模块导入，该模块在首次显示拓扑图时才加载 (见 _ensure_canvas)
 
 # --- 从项目模块导入 ---
 try:
     from core.network_manager import NetworkManager, ConnectionType
+    from core.events import ChangeEvent, CONNECTION_ADDED, CONNECTION_REMOVED
+    from core.search_index import NetworkSearchIndex
+    from core.journal import ProjectJournal, JournalError, has_recovery_data, recover_project, discard_recovery_data
+    from core.connection_import import read_connection_csv, validate_connection_rows, format_import_issues
     from core.device import (
         Device,
         DEV_UHD, DEV_HORIZON, DEV_MN, UHD_TYPES,
         PORT_MPO, PORT_LC, PORT_SFP, PORT_UNKNOWN,
         get_port_type_from_name
     )
-    from .topology_canvas import MplCanvas
-    from .widgets import NumericTableWidgetItem
+    from .refresh_scheduler import RefreshScheduler
+    from .background_tasks import BackgroundTaskRunner
+    from .models import (
+        DeviceTableModel, DeviceFilterProxyModel, ConnectionListModel, ConnectionFilterProxyModel,
+        DEVICE_ID_ROLE, CONNECTION_ROLE
+    )
     from controllers.topology_controller import TopologyController
     from .ui_main_window import Ui_MainWindow # <--- 导入 UI 定义类
-    from utils.export_utils import export_connections_to_file, export_topology_to_file, export_report_to_html
+    from utils.export_utils import export_connections_to_file, export_connection_bundle, export_topology_to_file, export_report_to_html, RenderCache
     from utils.misc_utils import resource_path
 except ImportError as e:
     print(f"导入错误 (main_window.py): {e} - 请确保所有模块已正确创建。")
     # Fallbacks
     NetworkManager = object; Device = object; ConnectionType = tuple
     DEV_UHD, DEV_HORIZON, DEV_MN, UHD_TYPES = '', '', '', []; PORT_MPO, PORT_LC, PORT_SFP, PORT_UNKNOWN = '', '', '', ''
-    get_port_type_from_name = lambda x: ''; MplCanvas = QWidget; NumericTableWidgetItem = QTableWidgetItem
+    get_port_type_from_name = lambda x: ''; RefreshScheduler = object; BackgroundTaskRunner = object
+    ChangeEvent = object; CONNECTION_ADDED, CONNECTION_REMOVED = 'connection_added', 'connection_removed'; NetworkSearchIndex = object
+    ProjectJournal = None; JournalError = Exception; has_recovery_data = lambda *args: False; recover_project = lambda *args: 0; discard_recovery_data = lambda *args: None
+    read_connection_csv = lambda *args: []; validate_connection_rows = None; format_import_issues = lambda *args: ''
+    DeviceTableModel = object; DeviceFilterProxyModel = object; ConnectionListModel = object; ConnectionFilterProxyModel = object
+    DEVICE_ID_ROLE = Qt.ItemDataRole.UserRole; CONNECTION_ROLE = Qt.ItemDataRole.UserRole
     TopologyController = object; Ui_MainWindow = object
-    export_connections_to_file = lambda *args, **kwargs: None; export_topology_to_file = lambda *args, **kwargs: None; export_report_to_html = lambda *args, **kwargs: None
+    export_connections_to_file = lambda *args, **kwargs: None; export_topology_to_file = lambda *args, **kwargs: None; export_report_to_html = lambda *args, **kwargs: None; RenderCache = lambda: None
+    export_connection_bundle = lambda *args, **kwargs: None
     resource_path = lambda x: x
 
 # --- UI 常量 ---
 COL_NAME = 0; COL_TYPE = 1; COL_MPO = 2; COL_LC = 3; COL_SFP = 4; COL_CONN = 5
+FILTER_DEBOUNCE_MS = 150 # 过滤输入停止这么久后才执行查询
+BINARY_PROJECT_FILTER = "TDM 二进制项目 (*.tdmc)"
+GZIP_PROJECT_FILTER = "gzip 压缩 JSON (*.json.gz)"
+XZ_PROJECT_FILTER = "xz 压缩 JSON (*.json.xz)"
+PROJECT_EXTENSION_BY_FILTER = {BINARY_PROJECT_FILTER: ".tdmc", GZIP_PROJECT_FILTER: ".json.gz", XZ_PROJECT_FILTER: ".json.xz"} # 保存时按所选格式补全扩展名
+SAVE_PROJECT_FILTERS = f"JSON 文件 (*.json);;{GZIP_PROJECT_FILTER};;{XZ_PROJECT_FILTER};;{BINARY_PROJECT_FILTER};;所有文件 (*)"
+TASK_MESSAGE_TIMEOUT_MS = 5000 # 后台任务完成后状态栏提示的显示时间
+UNTITLED_JOURNAL_NAME = "untitled.json" # 未保存的新项目在用户数据目录中的日志基准文件名
+LOAD_PROJECT_FILTERS = f"项目文件 (*.json *.json.gz *.json.xz *.tdmc);;JSON 文件 (*.json *.json.gz *.json.xz);;{BINARY_PROJECT_FILTER};;所有文件 (*)"
 
 # --- QSS 样式定义 ---
 APP_STYLE = """
@@ -76,10 +94,10 @@ QPushButton { border: 1px solid #bbbbbb; padding: 5px 10px; border-radius: 4px;
 QPushButton:hover { border: 1px solid #999999; }
 QPushButton:pressed { border: 1px solid #777777; }
 QPushButton:disabled { border: 1px solid #dddddd; }
-QLineEdit, QComboBox, QTextEdit, QListWidget, QTableWidget { border: 1px solid #cccccc; border-radius: 3px; padding: 3px; }
+QLineEdit, QComboBox, QTextEdit, QListView, QTableView { border: 1px solid #cccccc; border-radius: 3px; padding: 3px; }
 QComboBox::drop-down { border: none; background: transparent; width: 15px; padding-right: 5px; }
 QComboBox::down-arrow { width: 12px; height: 12px; }
-QTableWidget { gridline-color: #e0e0e0; }
+QTableView { gridline-color: #e0e0e0; }
 QHeaderView::section { padding: 4px; border: 1px solid #cccccc; border-left: none; font-weight: bold; }
 QHeaderView::section:first { border-left: 1px solid #cccccc; }
 QTabWidget::pane { border: 1px solid #cccccc; border-top: none; }
@@ -91,6 +109,12 @@ QSplitter::handle:vertical { height: 3px; }
 QSplitter::handle:hover { background-color: #d0d0d0; }
 """
 
+def _save_project_task(progress, snapshot: NetworkManager, filepath: str) -> str:
+    """后台保存任务: 将 NetworkManager.snapshot() 的副本写入项目文件，返回文件路径。"""
+    progress(10, f"正在写入 {len(snapshot.devices)} 个设备和 {len(snapshot.connections)} 条连接...")
+    if not snapshot.save_project(filepath): raise OSError(f"无法保存项目配置文件: {filepath}")
+    return filepath
+
 # --- 主窗口类 ---
 class MainWindow(QMainWindow):
     """应用程序的主窗口，包含所有 UI 元素和交互逻辑。"""
@@ -104,6 +128,8 @@ class MainWindow(QMainWindow):
 
         # --- UI 状态变量 ---
         self.suppress_confirmations: bool = False
+        self._pending_view_limits: Optional[Tuple[float, float, float, float]] = None # 项目文件中的视口，画布创建后应用
+        self.project_journal: Optional[ProjectJournal] = None # 自动保存日志 (见 core/journal.py)，窗口显示后启动
 
         # --- 字体加载 ---
         self.chinese_font = self._setup_fonts() # 需要先加载字体，setupUi 会用到
@@ -113,24 +139,56 @@ class MainWindow(QMainWindow):
         # 创建中心部件
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
-        # 创建 MplCanvas 实例 (setupUi 需要 MainWindow 有此属性)
-        self.mpl_canvas = MplCanvas(central_widget)
+        # MplCanvas 在首次需要拓扑图时创建 (见 _ensure_canvas)，setupUi 先放置占位控件
+        self.mpl_canvas = None
+        # 搜索索引 (须在模型之前订阅管理器事件，模型插入行时索引已包含新条目)
+        self.search_index = NetworkSearchIndex(self.network_manager)
+        # 设备表格模型 (setupUi 中的 QTableView 使用代理模型)
+        self.device_table_model = DeviceTableModel(self.network_manager, self)
+        self.device_proxy_model = DeviceFilterProxyModel(self.search_index, self)
+        self.device_proxy_model.setSourceModel(self.device_table_model)
+        # 连接列表模型 ("连接列表"和"手动编辑"两个视图共享)
+        self.connection_model = ConnectionListModel(self.network_manager, self)
+        self.connection_proxy_model = ConnectionFilterProxyModel(self.search_index, self)
+        self.connection_proxy_model.setSourceModel(self.connection_model)
         # 调用 setupUi 来构建界面 (它会将控件添加到 self 上)
         self.ui.setupUi(self)
 
         # --- 控制器 ---
         self.topology_controller = TopologyController(self, self.network_manager, self.mpl_canvas)
 
+        # --- 按帧合并的刷新调度 (按注册顺序刷新，完整重绘拓扑图已包含视口重绘) ---
+        self.refresh_scheduler = RefreshScheduler(self)
+        self.refresh_scheduler.register('topology', self._update_connection_views, covers=('viewport',)) # 'viewport' 在创建画布时注册
+        self.refresh_scheduler.register('device_combos', self._update_device_combos)
+        self.refresh_scheduler.register('port_options', self._update_manual_port_options)
+        self.refresh_scheduler.register('port_totals', self._update_port_totals_display)
+        self.network_manager.subscribe(self._on_network_changed)
+
+        # --- 后台任务 (保存、导出在线程池中针对快照执行，进度显示在状态栏) ---
+        self.task_runner = BackgroundTaskRunner(self)
+        self.task_progress_bar = QProgressBar(); self.task_progress_bar.setRange(0, 100); self.task_progress_bar.setMaximumWidth(200); self.task_progress_bar.setVisible(False)
+        self.statusBar().addPermanentWidget(self.task_progress_bar)
+        self.task_runner.progress.connect(self._on_task_progress)
+        self.task_runner.active_count_changed.connect(lambda count: self.task_progress_bar.setVisible(count > 0))
+        self.task_runner.finished.connect(lambda name, result: self.statusBar().showMessage(f"{name}完成: {result}", TASK_MESSAGE_TIMEOUT_MS))
+        self.task_runner.failed.connect(self._on_task_failed)
+        self.render_cache = RenderCache() # 导出的拓扑图渲染结果，方案和视图未变时重复导出直接复用
+
+        # --- 过滤输入防抖 (连续输入时只在停顿后查询一次) ---
+        self.device_filter_timer = QTimer(self); self.device_filter_timer.setSingleShot(True); self.device_filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.connection_filter_timer = QTimer(self); self.connection_filter_timer.setSingleShot(True); self.connection_filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+
         # --- 连接信号 ---
         self._connect_ui_signals()
         self._connect_controller_signals()
-        self._connect_canvas_signals()
 
         # --- 初始化 UI 状态 ---
         self.update_port_entries()
-        self._update_port_totals_display()
+        self._update_port_totals_display(); self._update_connection_summary()
         self._update_connection_views()
         self._update_device_combos()
+        QTimer.singleShot(0, lambda: self._start_journal(None)) # 启动后再检查上次未保存的修改，不延迟窗口显示
 
     def _setup_fonts(self) -> QFont:
         """加载并设置字体，返回 QFont 对象。"""
@@ -144,14 +202,12 @@ class MainWindow(QMainWindow):
                     families = QFontDatabase.applicationFontFamilies(font_id)
                     if families:
                         family = families[0]; print(f"成功加载并设置字体: {family} (路径: {font_path})")
-                        font_manager.fontManager.addfont(font_path); plt.rcParams['font.sans-serif'] = [family] + plt.rcParams.get('font.sans-serif', []); plt.rcParams['axes.unicode_minus'] = False
-                        return QFont(family, 10)
+                        return QFont(family, 10) # Matplotlib 字体由 MplCanvas 在创建时设置
                     else: print(f"警告: 无法从字体文件获取 family name {font_path}")
                 else: print(f"警告: 添加字体失败 {font_path}")
             else: print(f"警告: 未在路径 {font_path} 找到字体文件。将使用默认字体。")
         except ImportError: print("警告: 无法导入 QFontDatabase。将使用默认字体。")
         except Exception as e: print(f"加载或设置字体时出错: {e}")
-        plt.rcParams['font.sans-serif'] = ['sans-serif']; plt.rcParams['axes.unicode_minus'] = False
         return default_font
 
     # !! 删除 _setup_ui 方法 !!
@@ -161,28 +217,38 @@ class MainWindow(QMainWindow):
         # !! 修改: 访问 self.xxx 而不是 self.ui.xxx !!
         self.device_type_combo.currentIndexChanged.connect(self.update_port_entries)
         self.add_button.clicked.connect(self.add_device)
-        self.device_filter_entry.textChanged.connect(self.filter_device_table)
-        self.device_tablewidget.itemDoubleClicked.connect(self.show_device_details_from_table)
-        self.device_tablewidget.itemChanged.connect(self.on_device_item_changed)
+        self.device_filter_entry.textChanged.connect(lambda *_: self.device_filter_timer.start())
+        self.device_filter_timer.timeout.connect(lambda: self.filter_device_table(self.device_filter_entry.text()))
+        self.device_tableview.doubleClicked.connect(self.show_device_details_from_table)
+        # 排队连接：编辑处理中可能弹出确认框，需在委托提交数据之后执行
+        self.device_table_model.edit_requested.connect(self.on_device_edit_requested, Qt.ConnectionType.QueuedConnection)
+        # 连接总数标签跟随连接模型的行变化更新
+        self.connection_model.rowsInserted.connect(self._update_connection_summary)
+        self.connection_model.rowsRemoved.connect(self._update_connection_summary)
+        self.connection_model.modelReset.connect(self._update_connection_summary)
         self.remove_button.clicked.connect(self.remove_device)
         self.clear_button.clicked.connect(self.clear_all_devices)
         self.save_button.clicked.connect(self.save_config)
         self.load_button.clicked.connect(self.load_config)
         self.export_list_button.clicked.connect(self.export_connections)
+        self.export_all_button.clicked.connect(self.export_all_formats)
+        self.import_connections_button.clicked.connect(self.import_connections)
         self.export_topo_button.clicked.connect(self.export_topology)
         self.export_report_button.clicked.connect(self.export_html_report)
         self.suppress_confirm_checkbox.stateChanged.connect(self._toggle_suppress_confirmations)
         self.layout_combo.currentIndexChanged.connect(self.on_layout_change)
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
         self.calculate_button.clicked.connect(self.calculate_and_display)
         self.fill_mesh_button.clicked.connect(self.fill_remaining_mesh)
         self.fill_ring_button.clicked.connect(self.fill_remaining_ring)
-        self.edit_dev1_combo.currentIndexChanged.connect(self._update_manual_port_options)
-        self.edit_port1_combo.currentIndexChanged.connect(self._update_manual_port_options)
-        self.edit_dev2_combo.currentIndexChanged.connect(self._update_manual_port_options)
-        self.edit_port2_combo.currentIndexChanged.connect(self._update_manual_port_options)
+        self.edit_dev1_combo.currentIndexChanged.connect(lambda *_: self.refresh_scheduler.mark_dirty('port_options'))
+        self.edit_port1_combo.currentIndexChanged.connect(lambda *_: self.refresh_scheduler.mark_dirty('port_options'))
+        self.edit_dev2_combo.currentIndexChanged.connect(lambda *_: self.refresh_scheduler.mark_dirty('port_options'))
+        self.edit_port2_combo.currentIndexChanged.connect(lambda *_: self.refresh_scheduler.mark_dirty('port_options'))
         self.add_manual_button.clicked.connect(self.add_manual_connection)
         self.conn_filter_type_combo.currentIndexChanged.connect(self.filter_connection_list)
-        self.conn_filter_device_entry.textChanged.connect(self.filter_connection_list)
+        self.conn_filter_device_entry.textChanged.connect(lambda *_: self.connection_filter_timer.start())
+        self.connection_filter_timer.timeout.connect(self.filter_connection_list)
         self.remove_manual_button.clicked.connect(self.remove_manual_connection)
         print("成功连接 UI 控件信号。")
 
@@ -194,7 +260,7 @@ class MainWindow(QMainWindow):
                  print("错误: TopologyController 实例无效，无法连接信号。")
                  try: from controllers.topology_controller import TopologyController as ActualController; assert isinstance(self.topology_controller, ActualController)
                  except (ImportError, AssertionError): raise TypeError("self.topology_controller 不是有效的 TopologyController 实例。")
-            self.topology_controller.view_needs_update.connect(self._update_connection_views)
+            self.topology_controller.view_needs_update.connect(lambda: self.refresh_scheduler.mark_dirty('topology'))
             self.topology_controller.request_device_details.connect(self._display_device_details_popup)
             self.topology_controller.request_ui_update.connect(self._full_ui_update_after_action)
             self.topology_controller.connection_attempt_failed.connect(self._show_connection_failure_message)
@@ -203,16 +269,43 @@ class MainWindow(QMainWindow):
         except AttributeError as e: print(f"严重错误: 连接 Controller 信号时发生属性错误: {e}"); QMessageBox.critical(self, "初始化错误", f"连接控制器信号失败: {e}\n请检查控制台输出。")
         except Exception as e: print(f"连接 Controller 信号时出错: {e}"); QMessageBox.critical(self, "初始化错误", f"连接控制器信号时发生未知错误: {e}")
 
+    def _ensure_canvas(self) -> bool:
+        """
+        首次需要拓扑图时导入 Matplotlib/NetworkX 并创建画布，替换拓扑图标签页中的占位控件。
+
+        Returns:
+            bool: 画布是否可用。
+        """
+        if self.mpl_canvas is not None: return True
+        start = time.perf_counter()
+        try: from .topology_canvas import MplCanvas
+        except ImportError as e: print(f"导入错误 (topology_canvas): {e}"); self.topology_placeholder.setText("拓扑图画布加载失败"); return False
+        self.mpl_canvas = MplCanvas(self.topology_tab)
+        self.topology_layout.replaceWidget(self.topology_placeholder, self.mpl_canvas); self.topology_placeholder.deleteLater(); self.topology_placeholder = None
+        self.topology_controller.set_canvas(self.mpl_canvas)
+        if self._pending_view_limits and self.topology_controller.node_positions is not None: self.mpl_canvas.view_limits = self._pending_view_limits # 加载的项目保存了视口
+        self._pending_view_limits = None
+        self.mpl_canvas.set_refresh_scheduler(self.refresh_scheduler) # 注册 'viewport'
+        self.topology_controller.selection_changed.connect(self.mpl_canvas.update_selection)
+        self._connect_canvas_signals()
+        print(f"拓扑图画布已创建 (导入及初始化耗时 {(time.perf_counter() - start) * 1000:.0f} ms)")
+        return True
+
+    def _draw_topology_now(self) -> bool:
+        """确保画布已创建并立即完成待执行的拓扑图刷新 (导出图像前调用)。"""
+        if not self._ensure_canvas(): return False
+        self.refresh_scheduler.mark_dirty('topology'); self.refresh_scheduler.flush()
+        return True
+
     def _connect_canvas_signals(self):
         """连接 MplCanvas 的信号到 TopologyController 的槽函数。"""
-        # (此方法内容不变)
         print("-" * 20); print(f"DEBUG: Connecting mpl signals..."); print(f"DEBUG: self.mpl_canvas type: {type(self.mpl_canvas)}"); print(f"DEBUG: self.topology_controller type: {type(self.topology_controller)}")
         try:
-            press_slot = getattr(self.topology_controller, 'on_canvas_press', None); motion_slot = getattr(self.topology_controller, 'on_canvas_motion', None); release_slot = getattr(self.topology_controller, 'on_canvas_release', None)
+            press_slot = getattr(self.topology_controller, 'on_canvas_press', None); motion_slot = getattr(self.topology_controller, 'on_canvas_motion', None); release_slot = getattr(self.topology_controller, 'on_canvas_release', None); scroll_slot = getattr(self.topology_controller, 'on_canvas_scroll', None)
             print(f"DEBUG: press_slot: {press_slot}"); print(f"DEBUG: motion_slot: {motion_slot}"); print(f"DEBUG: release_slot: {release_slot}")
-            if not all([press_slot, motion_slot, release_slot]): raise AttributeError("一个或多个 TopologyController 槽函数未找到！")
-            cid_press = self.mpl_canvas.mpl_connect('button_press_event', press_slot); cid_motion = self.mpl_canvas.mpl_connect('motion_notify_event', motion_slot); cid_release = self.mpl_canvas.mpl_connect('button_release_event', release_slot)
-            print(f"DEBUG: mpl_connect calls executed. CIDs: {cid_press}, {cid_motion}, {cid_release}")
+            if not all([press_slot, motion_slot, release_slot, scroll_slot]): raise AttributeError("一个或多个 TopologyController 槽函数未找到！")
+            cid_press = self.mpl_canvas.mpl_connect('button_press_event', press_slot); cid_motion = self.mpl_canvas.mpl_connect('motion_notify_event', motion_slot); cid_release = self.mpl_canvas.mpl_connect('button_release_event', release_slot); cid_scroll = self.mpl_canvas.mpl_connect('scroll_event', scroll_slot)
+            print(f"DEBUG: mpl_connect calls executed. CIDs: {cid_press}, {cid_motion}, {cid_release}, {cid_scroll}")
             def _debug_mpl_event(event): print(f"DEBUG (MainWindow): Matplotlib event received: {event.name}, button={event.button}, xdata={event.xdata}, ydata={event.ydata}")
             self._debug_event_cid = self.mpl_canvas.mpl_connect('button_press_event', _debug_mpl_event); print(f"DEBUG (MainWindow): Connected debug handler with ID: {self._debug_event_cid}")
         except Exception as e: print(f"!!! 严重错误: mpl_connect 失败: {e} !!!"); QMessageBox.critical(self, "错误", f"无法连接画布事件处理器: {e}")
@@ -223,12 +316,16 @@ class MainWindow(QMainWindow):
 
     @Slot()
     def _full_ui_update_after_action(self):
-        """响应 Controller 请求，更新多个相关的 UI 部件。"""
+        """响应 Controller 请求，标记多个相关的 UI 部件在下一帧刷新。"""
         print("槽函数: _full_ui_update_after_action 被调用")
-        self._update_connection_views() # 更新图形和列表
-        self._update_device_table_connections() # 更新表格连接数
-        self._update_manual_port_options() # 更新手动编辑端口
-        self._update_port_totals_display() # 更新总数标签
+        self.refresh_scheduler.mark_dirty('topology', 'port_options', 'port_totals')
+
+    def _on_network_changed(self, event: ChangeEvent):
+        """NetworkManager 变更时标记受影响的 UI 部件 (表格和列表模型自行处理行更新)。"""
+        if event.kind in (CONNECTION_ADDED, CONNECTION_REMOVED):
+            self.refresh_scheduler.mark_dirty('topology', 'port_options')
+        else: # 设备变化或批量修改
+            self.refresh_scheduler.mark_dirty('topology', 'device_combos', 'port_options', 'port_totals')
 
     @Slot(str, str)
     def _show_connection_failure_message(self, dev1_name: str, dev2_name: str):
@@ -272,8 +369,7 @@ class MainWindow(QMainWindow):
             else: raise ValueError("无效类型")
             new_device = self.network_manager.add_device(name, dtype, mpo_ports, lc_ports, sfp_ports)
             if new_device:
-                self._add_device_to_table(new_device); self.device_name_entry.clear(); self._update_device_combos()
-                self.clear_results(); self._update_port_totals_display()
+                self.device_name_entry.clear(); self.clear_results()
             else: QMessageBox.critical(self, "错误", f"无法添加设备 '{name}' (可能名称已存在)。")
         except (ValueError, AssertionError): QMessageBox.critical(self, "输入错误", "端口数量必须是非负整数。")
         except Exception as e: QMessageBox.critical(self, "添加失败", f"添加设备时发生未知错误: {e}")
@@ -282,10 +378,10 @@ class MainWindow(QMainWindow):
     def remove_device(self):
         """处理“移除选中”按钮点击事件。"""
         # !! 修改: 使用 self.xxx !!
-        selected_rows = sorted(list(set(index.row() for index in self.device_tablewidget.selectedIndexes())), reverse=True)
+        selected_rows = self.device_tableview.selectionModel().selectedRows(COL_NAME)
         if not selected_rows: QMessageBox.warning(self, "提示", "请先在表格中选择要移除的设备行。"); return
-        ids_to_remove = {self.device_tablewidget.item(r, COL_NAME).data(Qt.ItemDataRole.UserRole) for r in selected_rows if self.device_tablewidget.item(r, COL_NAME)}
-        names_to_remove = [self.device_tablewidget.item(r, COL_NAME).text() for r in selected_rows if self.device_tablewidget.item(r, COL_NAME)]
+        ids_to_remove = {index.data(DEVICE_ID_ROLE) for index in selected_rows}
+        names_to_remove = [index.data() for index in selected_rows]
         if not ids_to_remove: return
         user_confirmed = True
         if not self.suppress_confirmations:
@@ -294,8 +390,7 @@ class MainWindow(QMainWindow):
         if user_confirmed:
             removed_count = sum(1 for dev_id in ids_to_remove if self.network_manager.remove_device(dev_id))
             if removed_count > 0:
-                for row_index in selected_rows: self.device_tablewidget.removeRow(row_index)
-                self._update_device_combos(); self.topology_controller.reset_layout_state(); self._update_port_totals_display()
+                self.topology_controller.reset_layout_state()
                 print(f"成功移除了 {removed_count} 个设备及其连接。")
             else: print("没有设备被移除。")
         else: print("用户取消移除设备。")
@@ -310,8 +405,7 @@ class MainWindow(QMainWindow):
             user_confirmed = (reply == QMessageBox.StandardButton.Yes)
         if user_confirmed:
             self.network_manager.clear_all_devices_and_connections()
-            self.device_tablewidget.setRowCount(0) # !! 修改: 使用 self.xxx !!
-            self._update_device_combos(); self.topology_controller.reset_layout_state(); self._update_port_totals_display()
+            self.topology_controller.reset_layout_state()
             self._set_fill_buttons_enabled(False); print("所有设备和连接已清空。")
         else: print("用户取消清空所有设备。")
 
@@ -320,13 +414,9 @@ class MainWindow(QMainWindow):
         """清除计算结果和连接，重置设备端口状态和画布状态。"""
         self.network_manager.clear_connections()
         self.topology_controller.reset_layout_state()
-        # !! 修改: 使用 self.xxx !!
-        self.connections_textedit.clear(); self.connections_textedit.append("无连接。")
-        self.manual_connection_list.clear()
         # 清空画布由 Controller 的 reset_layout_state 触发的 view_needs_update 信号处理
-        self.export_list_button.setEnabled(False); self.export_topo_button.setEnabled(False); self.export_report_button.setEnabled(False)
+        self.export_list_button.setEnabled(False); self.export_all_button.setEnabled(False); self.export_topo_button.setEnabled(False); self.export_report_button.setEnabled(False)
         self.remove_manual_button.setEnabled(False); self._set_fill_buttons_enabled(False)
-        self._update_device_table_connections(); self._update_port_totals_display(); self._update_manual_port_options()
         print("计算结果和连接已清除。")
 
     @Slot()
@@ -344,19 +434,15 @@ class MainWindow(QMainWindow):
         added_count = 0
         if calculated_connections_data:
             print(f"计算得到 {len(calculated_connections_data)} 条连接，正在添加到管理器...")
-            for conn_tuple_data in calculated_connections_data:
-                dev1, port1, dev2, port2, _ = conn_tuple_data
-                if self.network_manager.add_connection(dev1.id, port1, dev2.id, port2): added_count += 1
-                else: print(f"警告: 将计算出的连接 {dev1.name}[{port1}]<->{dev2.name}[{port2}] 添加到管理器时失败。")
+            added_count = len(self.network_manager.apply_connections(calculated_connections_data))
             print(f"成功添加了 {added_count} 条计算出的连接到管理器。")
         else: print("计算未产生任何连接。")
         self.topology_controller.reset_layout_state()
-        self._update_device_table_connections(); self._update_device_combos(); self._update_manual_port_options()
         has_connections = bool(self.network_manager.get_all_connections())
         can_fill = has_connections or any(bool(dev.get_all_available_ports()) for dev in devices)
         self._set_fill_buttons_enabled(can_fill)
         # !! 修改: 使用 self.xxx !!
-        self.export_list_button.setEnabled(has_connections); self.export_topo_button.setEnabled(bool(devices)); self.export_report_button.setEnabled(has_connections and bool(devices)); self.remove_manual_button.setEnabled(has_connections)
+        self.export_list_button.setEnabled(has_connections); self.export_all_button.setEnabled(has_connections); self.export_topo_button.setEnabled(bool(devices)); self.export_report_button.setEnabled(has_connections and bool(devices)); self.remove_manual_button.setEnabled(has_connections)
 
     @Slot()
     def fill_remaining_mesh(self):
@@ -366,7 +452,6 @@ class MainWindow(QMainWindow):
         new_connections = self.network_manager.fill_connections_mesh()
         if new_connections:
             self.topology_controller.reset_layout_state()
-            self._update_device_table_connections(); self._update_manual_port_options(); self._update_port_totals_display()
             QMessageBox.information(self, "填充完成", f"成功添加了 {len(new_connections)} 条新 Mesh 连接。")
         else: QMessageBox.information(self, "填充完成", "没有找到更多可以建立的 Mesh 连接。")
         self._set_fill_buttons_enabled(False)
@@ -379,7 +464,6 @@ class MainWindow(QMainWindow):
         new_connections = self.network_manager.fill_connections_ring()
         if new_connections:
             self.topology_controller.reset_layout_state()
-            self._update_device_table_connections(); self._update_manual_port_options(); self._update_port_totals_display()
             QMessageBox.information(self, "填充完成", f"成功添加了 {len(new_connections)} 条新环形连接段。")
         else: QMessageBox.information(self, "填充完成", "没有找到更多可以建立的环形连接段。")
         self._set_fill_buttons_enabled(False)
@@ -388,10 +472,21 @@ class MainWindow(QMainWindow):
     def save_config(self):
         """处理“保存配置”按钮点击事件。"""
         if not self.network_manager.get_all_devices(): QMessageBox.warning(self, "提示", "设备列表为空，无需保存。"); return
-        filepath, _ = QFileDialog.getSaveFileName(self, "保存项目配置", "", "JSON 文件 (*.json);;所有文件 (*)")
+        filepath, selected_filter = QFileDialog.getSaveFileName(self, "保存项目配置", "", SAVE_PROJECT_FILTERS)
         if not filepath: return
-        if self.network_manager.save_project(filepath): QMessageBox.information(self, "成功", f"项目配置已保存到:\n{filepath}")
-        else: QMessageBox.critical(self, "保存失败", f"无法保存项目配置文件。")
+        required_extension = PROJECT_EXTENSION_BY_FILTER.get(selected_filter)
+        if required_extension and not filepath.lower().endswith(required_extension): filepath = os.path.splitext(filepath)[0] + required_extension if filepath.lower().endswith(".json") else filepath + required_extension
+        self.network_manager.view_state = self._collect_view_state() # 节点位置、布局算法和视口随项目保存
+        snapshot = self.network_manager.snapshot()
+        self.task_runner.start("保存项目", _save_project_task, snapshot, filepath, on_finished=lambda path: self._on_project_saved(path, snapshot))
+
+    def _on_project_saved(self, filepath: str, saved: NetworkManager):
+        """
+        后台保存完成: 已保存的修改不再需要日志，重新开始记录。
+        保存期间又有修改时 (版本号与快照不同)，新日志从已保存的状态开始并记录这些修改，它们仍可恢复。
+        """
+        unchanged = self.network_manager.version == saved.version
+        self._stop_journal(discard=True); self._start_journal(filepath, offer_recovery=False, saved=None if unchanged else saved)
 
     @Slot()
     def load_config(self):
@@ -402,41 +497,147 @@ class MainWindow(QMainWindow):
                 reply = QMessageBox.question(self, "确认加载", "加载配置将覆盖当前所有设备和连接，确定吗？", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
                 user_confirmed_load = (reply == QMessageBox.StandardButton.Yes)
         if not user_confirmed_load: print("用户取消加载配置。"); return
-        filepath, _ = QFileDialog.getOpenFileName(self, "加载项目配置", "", "JSON 文件 (*.json);;所有文件 (*)")
+        filepath, _ = QFileDialog.getOpenFileName(self, "加载项目配置", "", LOAD_PROJECT_FILTERS)
         if not filepath: return
+        self._stop_journal(discard=True) # 用户已确认覆盖当前修改，加载过程不写入日志
         if self.network_manager.load_project(filepath):
-            self.device_tablewidget.setRowCount(0) # !! 修改: 使用 self.xxx !!
-            for dev in self.network_manager.get_all_devices(): self._add_device_to_table(dev)
-            self._update_device_combos(); self.topology_controller.reset_layout_state(); self._update_port_totals_display()
+            self._start_journal(filepath)
+            self.topology_controller.reset_layout_state(); self._apply_view_state(self.network_manager.view_state)
             has_connections = bool(self.network_manager.get_all_connections())
             can_fill = has_connections or any(bool(dev.get_all_available_ports()) for dev in self.network_manager.get_all_devices())
             self._set_fill_buttons_enabled(can_fill); QMessageBox.information(self, "成功", f"项目配置已从以下文件加载:\n{filepath}")
         else:
-            self.device_tablewidget.setRowCount(0); self._update_device_combos() # !! 修改: 使用 self.xxx !!
-            self.topology_controller.reset_layout_state(); self._update_port_totals_display(); self._set_fill_buttons_enabled(False)
+            self._start_journal(None); self.topology_controller.reset_layout_state(); self._set_fill_buttons_enabled(False)
             QMessageBox.critical(self, "加载失败", f"无法加载项目配置文件:\n{filepath}")
 
+    @Slot()
+    def import_connections(self):
+        """处理“导入连接 (CSV)”按钮: 一次校验整个文件并列出全部错误，确认后在一次批量修改中添加有效连接。"""
+        if not self.network_manager.get_all_devices(): QMessageBox.warning(self, "提示", "请先添加设备，CSV 中的设备按名称匹配。"); return
+        filepath, _ = QFileDialog.getOpenFileName(self, "导入连接列表", "", "CSV 文件 (*.csv);;所有文件 (*)")
+        if not filepath: return
+        try: result = validate_connection_rows(self.network_manager, read_connection_csv(filepath))
+        except (OSError, ValueError) as e: QMessageBox.critical(self, "导入失败", f"无法读取连接列表:\n{filepath}\n{e}"); return
+        valid_count = len(result.connections)
+        if result.issues:
+            summary = f"共 {result.rows} 行，{valid_count} 行有效，{len(result.issues)} 行有错误:\n\n{format_import_issues(result.issues)}"
+            if not valid_count: QMessageBox.warning(self, "导入失败", summary); return
+            reply = QMessageBox.question(self, "导入连接", f"{summary}\n\n是否导入其余 {valid_count} 条有效连接？", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes: print("用户取消导入连接。"); return
+        elif not valid_count: QMessageBox.information(self, "提示", "文件中没有连接。"); return
+        added = self.network_manager.add_connections_bulk(result.connections)
+        if added: self.topology_controller.reset_layout_state(); self._set_fill_buttons_enabled(True)
+        self.statusBar().showMessage(f"已从 {os.path.basename(filepath)} 导入 {len(added)} 条连接", TASK_MESSAGE_TIMEOUT_MS)
+
+    def _collect_view_state(self) -> Dict[str, Any]:
+        """收集随项目保存的视图状态: 布局算法、节点位置 (包括手动拖动的位置) 和视口 (None 表示完整视图)。"""
+        view: Dict[str, Any] = {'layout': self.layout_combo.currentText().lower()}
+        positions = self.topology_controller.get_node_positions()
+        if positions: view['node_positions'] = {str(node_id): [float(x), float(y)] for node_id, (x, y) in positions.items()}
+        limits = self.mpl_canvas.view_limits if self.mpl_canvas is not None else self._pending_view_limits
+        if limits: view['viewport'] = [float(value) for value in limits]
+        return view
+
+    def _apply_view_state(self, view: Optional[Dict[str, Any]]):
+        """
+        恢复项目文件中保存的布局算法、节点位置和视口。
+        节点位置与当前设备完全对应时直接使用，首次绘制拓扑图时不再计算布局；否则按所选算法重新计算。
+        """
+        self._pending_view_limits = None
+        if not view: return
+        layout = str(view.get('layout', '')).lower()
+        index = next((i for i in range(self.layout_combo.count()) if self.layout_combo.itemText(i).lower() == layout), -1)
+        if index >= 0: self.layout_combo.blockSignals(True); self.layout_combo.setCurrentIndex(index); self.layout_combo.blockSignals(False) # 不触发 on_layout_change 的布局重置
+        try: positions = {int(node_id): (float(xy[0]), float(xy[1])) for node_id, xy in view.get('node_positions', {}).items()}
+        except (TypeError, ValueError, IndexError, AttributeError): positions = {}; print("警告: 项目文件中的节点位置无效，将重新计算布局。")
+        if not positions or set(positions) != {dev.id for dev in self.network_manager.get_all_devices()}: return
+        self.topology_controller.node_positions = positions; setattr(self, '_last_layout_used', self.layout_combo.currentText().lower())
+        viewport = view.get('viewport')
+        try: limits = tuple(float(value) for value in viewport) if viewport else None
+        except (TypeError, ValueError): limits = None
+        if limits and len(limits) == 4:
+            if self.mpl_canvas is not None: self.mpl_canvas.view_limits = limits
+            else: self._pending_view_limits = limits
+        self.refresh_scheduler.mark_dirty('topology')
+
+    def _journal_base_path(self, project_path: Optional[str]) -> str:
+        """返回自动保存日志的基准路径：已保存的项目放在项目文件旁，未保存的新项目放在用户数据目录中。"""
+        if project_path: return project_path
+        return os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation), UNTITLED_JOURNAL_NAME)
+
+    def _start_journal(self, project_path: Optional[str], offer_recovery: bool = True, saved: Optional[NetworkManager] = None):
+        """
+        为当前项目启动自动保存日志。日志基准路径旁留有上次未保存的修改时，先询问是否恢复。
+
+        Args:
+            project_path (Optional[str]): 当前项目文件路径；未保存的新项目为 None。
+            offer_recovery (bool): 是否检查并询问恢复 (刚保存项目时为 False)。
+            saved (Optional[NetworkManager]): 已写入项目文件的状态；给定时日志从该状态开始 (见 ProjectJournal.start())。
+        """
+        if ProjectJournal is None: return
+        self._stop_journal()
+        base_path = self._journal_base_path(project_path)
+        if offer_recovery and has_recovery_data(base_path):
+            reply = QMessageBox.question(self, "恢复未保存的修改", f"检测到上次未保存的修改 (自动保存于 {os.path.dirname(base_path)})，是否恢复？", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes)
+            if reply == QMessageBox.StandardButton.Yes:
+                try:
+                    recover_project(self.network_manager, base_path); self.topology_controller.reset_layout_state()
+                    self._set_fill_buttons_enabled(any(bool(dev.get_all_available_ports()) for dev in self.network_manager.get_all_devices()))
+                except (JournalError, OSError) as e: QMessageBox.warning(self, "恢复失败", f"无法恢复未保存的修改:\n{e}")
+            else: discard_recovery_data(base_path)
+        journal = ProjectJournal(self.network_manager, base_path)
+        try: journal.start(saved); self.project_journal = journal
+        except OSError as e: print(f"警告: 无法启动自动保存日志 - {e}")
+
+    def _stop_journal(self, discard: bool = False):
+        """停止自动保存日志；discard=True 时删除日志和快照 (修改已保存或被用户放弃)。"""
+        if self.project_journal: self.project_journal.close(discard=discard); self.project_journal = None
+
+    @Slot(str, int, str)
+    def _on_task_progress(self, name: str, percent: int, message: str):
+        """在状态栏显示后台任务进度。"""
+        self.task_progress_bar.setValue(percent); self.statusBar().showMessage(f"{name}: {message}")
+
+    @Slot(str, str)
+    def _on_task_failed(self, name: str, error: str):
+        """后台任务失败时提示。"""
+        self.statusBar().showMessage(f"{name}失败", TASK_MESSAGE_TIMEOUT_MS); QMessageBox.critical(self, f"{name}失败", f"{name}时发生错误:\n{error}")
+
+    def closeEvent(self, event):
+        """关闭窗口时等待后台任务结束并停止日志 (未保存的修改压缩进快照，下次打开时可以恢复)。"""
+        self.task_runner.wait_for_done(); self._stop_journal()
+        super().closeEvent(event)
+
     @Slot()
     def export_connections(self):
         """处理“导出列表”按钮点击事件。"""
         connections = self.network_manager.get_all_connections()
         if not connections: QMessageBox.warning(self, "提示", "没有连接结果可导出。"); return
-        export_connections_to_file(self, connections)
+        export_connections_to_file(self, self.network_manager.snapshot().connections, self.task_runner)
+
+    @Slot()
+    def export_all_formats(self):
+        """处理“导出全部格式”按钮点击事件 (一次遍历写出 CSV、TXT、JSON Lines、GraphML 和配线表)。"""
+        if not self.network_manager.get_all_connections(): QMessageBox.warning(self, "提示", "没有连接结果可导出。"); return
+        snapshot = self.network_manager.snapshot()
+        export_connection_bundle(self, snapshot.devices, snapshot.connections, self.task_runner)
 
     @Slot()
     def export_topology(self):
         """处理“导出拓扑图”按钮点击事件。"""
+        if not self._draw_topology_now(): QMessageBox.warning(self, "提示", "拓扑图画布不可用。"); return
         figure_to_export = self.mpl_canvas.fig # 从 MplCanvas 获取 fig 对象
         if not figure_to_export or not self.network_manager.get_all_devices(): QMessageBox.warning(self, "提示", "没有拓扑图可导出。"); return
-        export_topology_to_file(self, figure_to_export)
+        export_topology_to_file(self, figure_to_export, self.task_runner, self.render_cache, self.mpl_canvas.render_key())
 
     @Slot()
     def export_html_report(self):
         """处理“导出报告 (HTML)”按钮点击事件。"""
-        devices = self.network_manager.get_all_devices(); connections = self.network_manager.get_all_connections()
+        devices = self.network_manager.get_all_devices()
+        if not self._draw_topology_now(): QMessageBox.warning(self, "无法导出", "拓扑图画布不可用。"); return
         figure_to_export = self.mpl_canvas.fig # 从 MplCanvas 获取 fig 对象
         if not devices or not figure_to_export: QMessageBox.warning(self, "无法导出", "请先添加设备并生成拓扑图。"); return
-        export_report_to_html(self, figure_to_export, connections)
+        export_report_to_html(self, figure_to_export, self.network_manager.snapshot().connections, self.task_runner, self.render_cache, self.mpl_canvas.render_key())
 
     @Slot()
     def add_manual_connection(self):
@@ -449,33 +650,26 @@ class MainWindow(QMainWindow):
         added_connection = self.network_manager.add_connection(dev1_id, port1_text, dev2_id, port2_text)
         if added_connection:
             self.topology_controller.reset_layout_state()
-            self._update_device_table_connections(); self._update_manual_port_options(); self._update_port_totals_display()
             self._set_fill_buttons_enabled(True); print(f"成功添加手动连接: {added_connection[0].name}[{port1_text}] <-> {added_connection[2].name}[{port2_text}]")
         else:
             QMessageBox.warning(self, "添加失败", "无法添加手动连接，请检查端口兼容性、可用性或查看控制台输出。")
-            self._update_manual_port_options()
+            self.refresh_scheduler.mark_dirty('port_options')
 
     @Slot()
     def remove_manual_connection(self):
         """处理手动编辑标签页中的“移除选中连接”按钮。"""
         # !! 修改: 使用 self.xxx !!
-        selected_items = self.manual_connection_list.selectedItems()
-        if not selected_items: QMessageBox.warning(self, "提示", "请在下方列表中选择要移除的连接。"); return
-        successfully_removed_items = []
+        selected_connections = [index.data(CONNECTION_ROLE) for index in self.manual_connection_listview.selectionModel().selectedIndexes()]
+        if not selected_connections: QMessageBox.warning(self, "提示", "请在下方列表中选择要移除的连接。"); return
         removed_count = 0
-        for item in selected_items:
-            conn_data = item.data(Qt.ItemDataRole.UserRole)
+        for conn_data in selected_connections:
             if conn_data:
                 dev1, port1, dev2, port2, _ = conn_data
                 if self.network_manager.remove_connection(dev1.id, port1, dev2.id, port2):
-                    removed_count += 1; successfully_removed_items.append(item)
+                    removed_count += 1
                 else: print(f"警告: 尝试从管理器移除连接时失败: {dev1.name}[{port1}] <-> {dev2.name}[{port2}]")
         if removed_count > 0:
-            rows_to_remove = sorted([self.manual_connection_list.row(item) for item in successfully_removed_items], reverse=True)
-            for row in rows_to_remove:
-                if row != -1: taken_item = self.manual_connection_list.takeItem(row)
             self.topology_controller.reset_layout_state()
-            self._update_device_table_connections(); self._update_manual_port_options(); self._update_port_totals_display()
             print(f"成功移除了 {removed_count} 条连接。")
             has_connections = bool(self.network_manager.get_all_connections())
             can_fill = has_connections or any(bool(dev.get_all_available_ports()) for dev in self.network_manager.get_all_devices())
@@ -488,66 +682,54 @@ class MainWindow(QMainWindow):
         self.suppress_confirmations = (state == Qt.CheckState.Checked.value)
         print(f"跳过确认弹窗: {'已启用' if self.suppress_confirmations else '已禁用'}")
 
-    @Slot(QTableWidgetItem)
-    def on_device_item_changed(self, item: QTableWidgetItem):
-        """处理设备表格中项目被编辑后的事件。"""
-        # !! 修改: 使用 self.xxx !!
-        if not item: return
-        row = item.row(); col = item.column(); name_item = self.device_tablewidget.item(row, COL_NAME)
-        if not name_item: return
-        dev_id = name_item.data(Qt.ItemDataRole.UserRole)
-        if dev_id is None: return
-        self.device_tablewidget.blockSignals(True)
-        success = False
-        try:
-            if col == COL_NAME:
-                new_name = item.text().strip()
-                if self.network_manager.update_device(dev_id, new_name=new_name):
-                     success = True; self._update_device_combos(); self._update_connection_views()
-                else:
-                     device = self.network_manager.get_device_by_id(dev_id);
-                     if device: item.setText(device.name)
-                     QMessageBox.warning(self, "重命名失败", f"无法将设备重命名为 '{new_name}' (可能名称冲突或为空)。")
-            elif col in [COL_MPO, COL_LC, COL_SFP]:
-                port_attr_map = {COL_MPO: 'mpo', COL_LC: 'lc', COL_SFP: 'sfp'}; port_name_map = {COL_MPO: 'MPO', COL_LC: 'LC', COL_SFP: 'SFP+'}
-                attr_suffix = port_attr_map.get(col); port_type_name = port_name_map.get(col)
-                device = self.network_manager.get_device_by_id(dev_id);
-                if not device: raise ValueError("找不到设备")
-                is_uhd_horizon = device.type in UHD_TYPES; is_micron = device.type == DEV_MN
-                can_edit_this_port = (attr_suffix in ['mpo', 'lc'] and is_uhd_horizon) or (attr_suffix == 'sfp' and is_micron)
-                if not can_edit_this_port:
-                     old_count = getattr(device, f"{attr_suffix}_total", 0); print(f"不允许修改设备类型 '{device.type}' 的 '{port_type_name}' 端口数量。"); item.setText(str(old_count))
-                else:
-                    old_count = getattr(device, f"{attr_suffix}_total", 0)
-                    try:
-                        new_count = int(item.text().strip()); assert new_count >= 0
-                        if new_count != old_count:
-                            user_confirmed = True
-                            if not self.suppress_confirmations:
-                                reply = QMessageBox.question(self, "确认修改端口数量", f"修改设备 '{device.name}' 的 {port_type_name} 端口数量将清除所有现有连接。\n是否继续？", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
-                                user_confirmed = (reply == QMessageBox.StandardButton.Yes)
-                            if user_confirmed:
-                                update_kwargs = {f"new_{attr_suffix}": new_count}
-                                if self.network_manager.update_device(dev_id, **update_kwargs):
-                                    success = True; self.clear_results(); self._update_port_totals_display(); self._update_manual_port_options()
-                                else: item.setText(str(old_count)); QMessageBox.warning(self, "更新失败", f"更新 {port_type_name} 端口数量失败。")
-                            else: print("用户取消修改端口数量。"); item.setText(str(old_count))
-                        else: success = True
-                    except (ValueError, AssertionError): QMessageBox.warning(self, "输入错误", f"{port_type_name} 端口数量必须是非负整数。"); item.setText(str(old_count))
-        finally: self.device_tablewidget.blockSignals(False) # !! 修改: 使用 self.xxx !!
-
-    @Slot(QTableWidgetItem)
-    def show_device_details_from_table(self, item: QTableWidgetItem):
+    @Slot(int, int, str)
+    def on_device_edit_requested(self, dev_id: int, col: int, text: str):
+        """处理设备表格中的编辑请求 (由 DeviceTableModel 发出)。被拒绝的编辑不修改管理器，视图保持原值。"""
+        device = self.network_manager.get_device_by_id(dev_id)
+        if not device: return
+        if col == COL_NAME:
+            new_name = text.strip()
+            if new_name == device.name: return
+            if not self.network_manager.update_device(dev_id, new_name=new_name):
+                 QMessageBox.warning(self, "重命名失败", f"无法将设备重命名为 '{new_name}' (可能名称冲突或为空)。")
+        elif col in [COL_MPO, COL_LC, COL_SFP]:
+            port_attr_map = {COL_MPO: 'mpo', COL_LC: 'lc', COL_SFP: 'sfp'}; port_name_map = {COL_MPO: 'MPO', COL_LC: 'LC', COL_SFP: 'SFP+'}
+            attr_suffix = port_attr_map.get(col); port_type_name = port_name_map.get(col)
+            is_uhd_horizon = device.type in UHD_TYPES; is_micron = device.type == DEV_MN
+            can_edit_this_port = (attr_suffix in ['mpo', 'lc'] and is_uhd_horizon) or (attr_suffix == 'sfp' and is_micron)
+            if not can_edit_this_port:
+                 print(f"不允许修改设备类型 '{device.type}' 的 '{port_type_name}' 端口数量。"); return
+            old_count = getattr(device, f"{attr_suffix}_total", 0)
+            try:
+                new_count = int(text.strip()); assert new_count >= 0
+            except (ValueError, AssertionError): QMessageBox.warning(self, "输入错误", f"{port_type_name} 端口数量必须是非负整数。"); return
+            if new_count == old_count: return
+            user_confirmed = True
+            if not self.suppress_confirmations:
+                reply = QMessageBox.question(self, "确认修改端口数量", f"修改设备 '{device.name}' 的 {port_type_name} 端口数量将清除所有现有连接。\n是否继续？", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+                user_confirmed = (reply == QMessageBox.StandardButton.Yes)
+            if user_confirmed:
+                update_kwargs = {f"new_{attr_suffix}": new_count}
+                if self.network_manager.update_device(dev_id, **update_kwargs):
+                    self.clear_results()
+                else: QMessageBox.warning(self, "更新失败", f"更新 {port_type_name} 端口数量失败。")
+            else: print("用户取消修改端口数量。")
+
+    @Slot(QModelIndex)
+    def show_device_details_from_table(self, index: QModelIndex):
         """处理设备表格双击事件，显示设备详情。"""
-        # !! 修改: 使用 self.xxx !!
-        if not item: return
-        row = item.row(); name_item = self.device_tablewidget.item(row, COL_NAME)
-        if not name_item: return
-        dev_id = name_item.data(Qt.ItemDataRole.UserRole)
+        if not index.isValid(): return
+        dev_id = index.data(DEVICE_ID_ROLE)
         device = self.network_manager.get_device_by_id(dev_id)
         if not device: QMessageBox.critical(self, "错误", "无法找到所选设备的详细信息。"); return
         self._display_device_details_popup(device)
 
+    @Slot(int)
+    def on_tab_changed(self, index: int):
+        """切换到拓扑图标签页时才创建画布并绘制。"""
+        if self.tab_widget.widget(index) is self.topology_tab and self.mpl_canvas is None:
+            if self._ensure_canvas(): self.refresh_scheduler.mark_dirty('topology')
+
     @Slot()
     def on_layout_change(self):
         """处理布局下拉框选择变化事件。"""
@@ -557,57 +739,17 @@ class MainWindow(QMainWindow):
 
     @Slot(str)
     def filter_device_table(self, text: str):
-        """根据输入过滤设备表格。"""
-        # !! 修改: 使用 self.xxx !!
-        filter_text = text.lower()
-        for row in range(self.device_tablewidget.rowCount()):
-            match = False; name_item = self.device_tablewidget.item(row, COL_NAME); type_item = self.device_tablewidget.item(row, COL_TYPE)
-            if name_item and filter_text in name_item.text().lower(): match = True
-            if not match and type_item and filter_text in type_item.text().lower(): match = True
-            self.device_tablewidget.setRowHidden(row, not match)
+        """根据输入过滤设备表格 (由防抖定时器触发，匹配集合来自搜索索引)。"""
+        self.device_proxy_model.set_filter_text(text)
 
     @Slot()
     def filter_connection_list(self):
-        """根据下拉框和输入框过滤手动编辑中的连接列表。"""
-        # !! 修改: 使用 self.xxx !!
-        selected_type = self.conn_filter_type_combo.currentText(); filter_device_text = self.conn_filter_device_entry.text().strip().lower()
-        type_filter_active = selected_type != "所有类型"
-        for i in range(self.manual_connection_list.count()):
-            item = self.manual_connection_list.item(i); conn_data = item.data(Qt.ItemDataRole.UserRole)
-            if not conn_data or not isinstance(conn_data, tuple) or len(conn_data) != 5: item.setHidden(False); continue
-            dev1, _, dev2, _, conn_type = conn_data; item_conn_type = conn_type
-            dev1_name_lower = dev1.name.lower(); dev2_name_lower = dev2.name.lower()
-            type_match = (not type_filter_active) or (item_conn_type == selected_type)
-            device_match = (not filter_device_text) or (filter_device_text in dev1_name_lower or filter_device_text in dev2_name_lower)
-            item.setHidden(not (type_match and device_match))
+        """根据下拉框和输入框过滤手动编辑中的连接列表 (按设备名称或端口名称，匹配集合来自搜索索引)。"""
+        selected_type = self.conn_filter_type_combo.currentText()
+        self.connection_proxy_model.set_filters(None if selected_type == "所有类型" else selected_type, self.conn_filter_device_entry.text())
 
     # --- UI 更新辅助方法 ---
 
-    def _add_device_to_table(self, device: Device):
-        """将设备对象添加到 UI 表格中。"""
-        # !! 修改: 使用 self.xxx !!
-        row_position = self.device_tablewidget.rowCount(); self.device_tablewidget.insertRow(row_position)
-        editable_flags = Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable; non_editable_flags = Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
-        name_item = QTableWidgetItem(device.name); name_item.setData(Qt.ItemDataRole.UserRole, device.id); name_item.setFlags(editable_flags)
-        type_item = QTableWidgetItem(device.type); type_item.setFlags(non_editable_flags)
-        mpo_item = NumericTableWidgetItem(str(device.mpo_total)); mpo_item.setData(Qt.ItemDataRole.UserRole + 1, device.mpo_total); mpo_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter); mpo_item.setFlags(editable_flags if device.type in UHD_TYPES else non_editable_flags)
-        lc_item = NumericTableWidgetItem(str(device.lc_total)); lc_item.setData(Qt.ItemDataRole.UserRole + 1, device.lc_total); lc_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter); lc_item.setFlags(editable_flags if device.type in UHD_TYPES else non_editable_flags)
-        sfp_item = NumericTableWidgetItem(str(device.sfp_total)); sfp_item.setData(Qt.ItemDataRole.UserRole + 1, device.sfp_total); sfp_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter); sfp_item.setFlags(editable_flags if device.type == DEV_MN else non_editable_flags)
-        conn_val = float(f"{device.connections:.2f}"); conn_item = NumericTableWidgetItem(f"{conn_val:.2f}"); conn_item.setData(Qt.ItemDataRole.UserRole + 1, conn_val); conn_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter); conn_item.setFlags(non_editable_flags)
-        self.device_tablewidget.setItem(row_position, COL_NAME, name_item); self.device_tablewidget.setItem(row_position, COL_TYPE, type_item); self.device_tablewidget.setItem(row_position, COL_MPO, mpo_item); self.device_tablewidget.setItem(row_position, COL_LC, lc_item); self.device_tablewidget.setItem(row_position, COL_SFP, sfp_item); self.device_tablewidget.setItem(row_position, COL_CONN, conn_item)
-
-    def _update_device_table_connections(self):
-        """更新设备表格中的“连接数”列。"""
-        # !! 修改: 使用 self.xxx !!
-        for row in range(self.device_tablewidget.rowCount()):
-            name_item = self.device_tablewidget.item(row, COL_NAME)
-            if name_item:
-                dev_id = name_item.data(Qt.ItemDataRole.UserRole); device = self.network_manager.get_device_by_id(dev_id)
-                if device:
-                    conn_val = float(f"{device.connections:.2f}"); conn_item = self.device_tablewidget.item(row, COL_CONN)
-                    if conn_item: conn_item.setText(f"{conn_val:.2f}"); conn_item.setData(Qt.ItemDataRole.UserRole + 1, conn_val)
-                    else: conn_item = NumericTableWidgetItem(f"{conn_val:.2f}"); conn_item.setData(Qt.ItemDataRole.UserRole + 1, conn_val); conn_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter); conn_item.setFlags(Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled); self.device_tablewidget.setItem(row, COL_CONN, conn_item)
-
     def _update_device_combos(self):
         """更新手动编辑区域的设备下拉框选项。"""
         # !! 修改: 使用 self.xxx !!
@@ -622,7 +764,7 @@ class MainWindow(QMainWindow):
             if dev.id == current_dev2_id: idx2_to_select = i + 1
         self.edit_dev1_combo.setCurrentIndex(idx1_to_select); self.edit_dev2_combo.setCurrentIndex(idx2_to_select)
         self.edit_dev1_combo.blockSignals(False); self.edit_dev2_combo.blockSignals(False)
-        self._update_manual_port_options()
+        self.refresh_scheduler.mark_dirty('port_options')
 
     def _populate_edit_port_combos(self, device_combo_to_populate: QComboBox, port_combo_to_populate: QComboBox, other_device_combo: QComboBox, other_port_combo: QComboBox):
         """动态填充指定的端口下拉列表，并根据另一侧的选择进行过滤。"""
@@ -632,14 +774,9 @@ class MainWindow(QMainWindow):
         if dev_id is not None:
             device = self.network_manager.get_device_by_id(dev_id)
             if device:
-                available_ports = self.network_manager.get_available_ports(dev_id); ports_to_add = []
-                other_dev_id = other_device_combo.currentData(); other_port_name = other_port_combo.currentText()
-                if other_dev_id is not None and other_port_name != "选择端口...":
-                    compatible_types_here = self.network_manager.get_compatible_port_types(other_dev_id, other_port_name)
-                    for port in available_ports:
-                        port_type_here = get_port_type_from_name(port);
-                        if port_type_here in compatible_types_here: ports_to_add.append(port)
-                else: ports_to_add = available_ports
+                other_dev_id = other_device_combo.currentData(); other_port_name = other_port_combo.currentText(); compatible_types_here = None
+                if other_dev_id is not None and other_port_name != "选择端口...": compatible_types_here = self.network_manager.get_compatible_port_types(other_dev_id, other_port_name)
+                ports_to_add = self.network_manager.get_available_ports(dev_id, compatible_types_here) # 按类型缓存，开销与结果数量成正比
                 if ports_to_add:
                     port_combo_to_populate.addItems(ports_to_add); index_to_select = port_combo_to_populate.findText(current_port_selection); port_combo_to_populate.setCurrentIndex(index_to_select if index_to_select != -1 else 0); port_combo_to_populate.setEnabled(True)
                 else: port_combo_to_populate.addItem("无兼容/可用端口"); port_combo_to_populate.setCurrentIndex(1)
@@ -657,37 +794,38 @@ class MainWindow(QMainWindow):
         # !! 修改: 使用 self.xxx !!
         totals = self.network_manager.calculate_port_totals(); self.port_totals_label.setText(f"总计: {PORT_MPO}: {totals['mpo']}, {PORT_LC}: {totals['lc']}, {PORT_SFP}+: {totals['sfp']}")
 
+    @Slot()
+    def _update_connection_summary(self):
+        """连接列表模型行数变化时，更新连接总数标签和移除按钮状态。"""
+        count = self.connection_model.rowCount()
+        self.connections_summary_label.setText(f"<b>连接列表:</b> 共 {count} 条" if count else "无连接。")
+        self.remove_manual_button.setEnabled(count > 0)
+
     def _update_connection_views(self):
-        """更新连接列表文本框、手动编辑列表和拓扑图。"""
+        """更新连接列表、手动编辑列表和拓扑图。"""
         print("DEBUG: _update_connection_views called")
-        # !! 修改: 使用 self.xxx !!
-        # 1. 更新连接列表文本框 (QTextEdit)
-        self.connections_textedit.clear(); connections = self.network_manager.get_all_connections()
-        if connections:
-            self.connections_textedit.append("<b>连接列表:</b><hr>")
-            for i, conn in enumerate(connections): dev1, port1, dev2, port2, conn_type = conn; self.connections_textedit.append(f"{i+1}. {dev1.name} [{port1}] &lt;-&gt; {dev2.name} [{port2}] ({conn_type})")
-        else: self.connections_textedit.append("无连接。")
-        # 2. 更新手动编辑中的连接列表 (QListWidget)
-        self.manual_connection_list.clear()
-        if connections:
-            for i, conn in enumerate(connections): dev1, port1, dev2, port2, conn_type = conn; item_text = f"{i+1}. {dev1.name} [{port1}] <-> {dev2.name} [{port2}] ({conn_type})"; item = QListWidgetItem(item_text); item.setData(Qt.ItemDataRole.UserRole, conn); self.manual_connection_list.addItem(item)
-        self.remove_manual_button.setEnabled(bool(connections)); self.filter_connection_list()
-        # 3. 更新拓扑图
+        # 1. 连接列表模型通过管理器的变更事件自行更新 (两个列表视图共享，只处理变化的行)
+        connections = self.network_manager.get_all_connections()
+        if self.mpl_canvas is None: # 画布尚未创建 (拓扑图从未显示)：只更新按钮状态，导出时再绘制
+            has_devices = bool(self.network_manager.get_all_devices())
+            self.export_list_button.setEnabled(bool(connections)); self.export_all_button.setEnabled(bool(connections)); self.export_topo_button.setEnabled(has_devices); self.export_report_button.setEnabled(bool(connections) and has_devices)
+            return
+        # 2. 更新拓扑图
         selected_layout = self.layout_combo.currentText().lower()
-        devices_for_plot = self.network_manager.get_all_devices(); connections_for_plot = self.network_manager.get_all_connections(); port_totals = self.network_manager.calculate_port_totals()
+        devices_for_plot = self.network_manager.get_all_devices(); port_totals = self.network_manager.calculate_port_totals()
         current_node_positions = self.topology_controller.get_node_positions(); current_selected_node_id = self.topology_controller.get_selected_node_id()
-        print(f"DEBUG: Plotting with positions: {current_node_positions}"); print(f"DEBUG: Plotting with selected node: {current_selected_node_id}")
+        print(f"DEBUG: Plotting with positions: {len(current_node_positions) if current_node_positions else None} nodes"); print(f"DEBUG: Plotting with selected node: {current_selected_node_id}")
         # !! 修改: 不再需要 MainWindow 持有 fig 引用 !!
-        figure, calculated_pos = self.mpl_canvas.plot_topology(devices_for_plot, connections_for_plot, layout_algorithm=selected_layout, fixed_pos=current_node_positions, selected_node_id=current_selected_node_id, port_totals_dict=port_totals)
+        figure, calculated_pos = self.mpl_canvas.plot_topology(self.network_manager.get_graph(), self.network_manager.version, layout_algorithm=selected_layout, fixed_pos=current_node_positions, selected_node_id=current_selected_node_id, port_totals_dict=port_totals)
         # if figure: self.fig = figure # 移除
         if calculated_pos is not None and self.topology_controller.dragged_node_id is None:
             if self.topology_controller.node_positions is None or selected_layout != getattr(self, '_last_layout_used', None):
                 print(f"DEBUG: Updating controller positions due to new layout '{selected_layout}'")
                 self.topology_controller.node_positions = calculated_pos
                 setattr(self, '_last_layout_used', selected_layout)
-        # 4. 更新导出按钮状态
+        # 3. 更新导出按钮状态
         has_connections = bool(connections); has_devices = bool(devices_for_plot); has_figure = figure is not None and has_devices
-        self.export_list_button.setEnabled(has_connections); self.export_topo_button.setEnabled(has_figure); self.export_report_button.setEnabled(has_connections and has_figure)
+        self.export_list_button.setEnabled(has_connections); self.export_all_button.setEnabled(has_connections); self.export_topo_button.setEnabled(has_figure); self.export_report_button.setEnabled(has_connections and has_figure)
 
     @Slot(object)
     def _display_device_details_popup(self, dev: Device):
@@ -712,21 +850,3 @@ class MainWindow(QMainWindow):
                 for port in sorted(mpo_conns_grouped[base_port].keys(), key=lambda x: int(x.split('-Ch')[-1])): details += f"      {port} -> {mpo_conns_grouped[base_port][port]}\n"
         QMessageBox.information(self, f"设备详情 - {dev.name}", details)
 
-    def _get_matplotlib_font_prop(self):
-         """获取用于 Matplotlib 的 FontProperties 对象"""
-         # (此方法逻辑不变)
-         try:
-             if hasattr(self, 'chinese_font') and self.chinese_font.family():
-                 if self.chinese_font.family() in [f.name for f in font_manager.fontManager.ttflist]: return font_manager.FontProperties(family=self.chinese_font.family())
-                 else:
-                      db = QFontDatabase(); families = db.families()
-                      try:
-                           font_index = families.index(self.chinese_font.family()); font_paths = db.applicationFontFiles(font_index)
-                           if font_paths:
-                                font_manager.fontManager.addfont(font_paths[0])
-                                if self.chinese_font.family() in [f.name for f in font_manager.fontManager.ttflist]: return font_manager.FontProperties(family=self.chinese_font.family())
-                      except ValueError: print(f"警告: 字体家族 '{self.chinese_font.family()}' 未在 QFontDatabase 中找到。")
-                      print(f"警告: Qt 字体 '{self.chinese_font.family()}' 未在 Matplotlib 字体列表中找到。")
-         except Exception as e: print(f"获取 Matplotlib 字体属性时出错: {e}")
-         return font_manager.FontProperties(family='sans-serif')
-
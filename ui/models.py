@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+ui/models.py
+
+定义供 Qt 视图使用的数据模型 (Model/View)。
+模型直接读取 NetworkManager 中的数据，视图只为可见行请求数据，
+避免为每个设备/连接预先创建控件项。
+模型订阅 NetworkManager 的变更事件，只更新受影响的行。
+"""
+
+from typing import Dict, List, Optional, Tuple, Any, TYPE_CHECKING
+
+from PySide6.QtCore import (
+    Qt, Signal, QObject, QModelIndex, QAbstractTableModel, QAbstractListModel, QSortFilterProxyModel
+)
+
+try:
+    from core.device import DEV_MN, UHD_TYPES, PORT_MPO, PORT_LC, PORT_SFP
+    from core.events import (
+        ChangeEvent, DEVICE_ADDED, DEVICE_REMOVED, DEVICE_UPDATED, CONNECTION_ADDED, CONNECTION_REMOVED, BULK_RESET
+    )
+except ImportError as e:
+    print(f"导入错误 (models.py): {e}")
+    DEV_MN, UHD_TYPES = 'MicroN', []
+    PORT_MPO, PORT_LC, PORT_SFP = 'MPO', 'LC', 'SFP'
+    ChangeEvent = Any
+    DEVICE_ADDED, DEVICE_REMOVED, DEVICE_UPDATED = 'device_added', 'device_removed', 'device_updated'
+    CONNECTION_ADDED, CONNECTION_REMOVED, BULK_RESET = 'connection_added', 'connection_removed', 'bulk_reset'
+
+if TYPE_CHECKING:
+    from core.network_manager import NetworkManager, ConnectionType
+    from core.search_index import NetworkSearchIndex
+    from core.device import Device
+
+# 设备表格列
+COL_NAME = 0; COL_TYPE = 1; COL_MPO = 2; COL_LC = 3; COL_SFP = 4; COL_CONN = 5
+DEVICE_HEADERS = ["名称", "类型", PORT_MPO, PORT_LC, f"{PORT_SFP}+", "连接数(估)"]
+
+# 自定义数据角色
+DEVICE_ID_ROLE = Qt.ItemDataRole.UserRole      # 设备 ID
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1       # 排序键 (数字列为数值，文本列为小写文本)
+CONNECTION_ROLE = Qt.ItemDataRole.UserRole     # 连接元组 (ConnectionListModel)
+
+# 行快照: (名称, 类型, MPO, LC, SFP+, 连接数)
+RowSnapshot = Tuple[str, str, int, int, int, float]
+
+
+class DeviceTableModel(QAbstractTableModel):
+    """
+    设备表格模型，直接读取 NetworkManager 的设备数据。
+
+    模型订阅管理器的变更事件：设备增删对应行的插入/移除，连接增删只更新两端设备所在行，
+    BULK_RESET 时由 refresh() 整体比较，只对实际变化的行发出 dataChanged。
+    编辑不直接修改管理器，而是通过 edit_requested 信号交给 MainWindow 处理 (需要确认弹窗等)。
+    """
+
+    # (设备 ID, 列, 输入文本)
+    edit_requested = Signal(int, int, str)
+
+    def __init__(self, network_manager: 'NetworkManager', parent: Optional[QObject] = None):
+        """
+        初始化设备表格模型。
+
+        Args:
+            network_manager ('NetworkManager'): 网络管理器实例。
+            parent (Optional[QObject]): 父对象。
+        """
+        super().__init__(parent)
+        self.network_manager = network_manager
+        self._ids: List[int] = []               # 行 -> 设备 ID
+        self._rows: Dict[int, int] = {}         # 设备 ID -> 行，与 self._ids 同步维护
+        self._snapshots: List[RowSnapshot] = [] # 行 -> 上次通知视图时的数据
+        self.refresh()
+        network_manager.subscribe(self._on_network_changed)
+
+    def _on_network_changed(self, event: ChangeEvent):
+        """处理 NetworkManager 的变更事件，只更新受影响的行。"""
+        if event.kind == DEVICE_ADDED:
+            row = min(event.index, len(self._ids))
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._ids.insert(row, event.device.id)
+            self._snapshots.insert(row, self._snapshot(event.device))
+            self._reindex(row)
+            self.endInsertRows()
+        elif event.kind == DEVICE_REMOVED:
+            # 管理器给出设备被移除前所在的行 (与模型的行一致)，不一致时再查索引
+            row = event.index
+            if row is None or not 0 <= row < len(self._ids) or self._ids[row] != event.device.id:
+                row = self._row_of(event.device.id)
+            if row is not None:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._ids[row]
+                del self._snapshots[row]
+                del self._rows[event.device.id]
+                self._reindex(row)
+                self.endRemoveRows()
+        elif event.kind == DEVICE_UPDATED:
+            self._update_row(event.device)
+        elif event.kind in (CONNECTION_ADDED, CONNECTION_REMOVED):
+            # 连接变化只影响两端设备的连接数
+            self._update_row(event.connection[0])
+            self._update_row(event.connection[2])
+        elif event.kind == BULK_RESET:
+            self.refresh()
+
+    def _row_of(self, device_id: int) -> Optional[int]:
+        """返回设备 ID 所在的行 (通过索引 O(1) 查找)，不存在时返回 None。"""
+        return self._rows.get(device_id)
+
+    def _reindex(self, start: int = 0):
+        """更新 ID -> 行索引中从 start 行开始的部分 (插入/移除行之后，其后各行的行号发生变化)。"""
+        if start == 0:
+            self._rows = {dev_id: row for row, dev_id in enumerate(self._ids)}
+            return
+        rows = self._rows
+        for row in range(start, len(self._ids)):
+            rows[self._ids[row]] = row
+
+    def _update_row(self, device: 'Device'):
+        """重新生成单个设备的快照，有变化时发出 dataChanged。"""
+        row = self._row_of(device.id)
+        if row is None:
+            return
+        snapshot = self._snapshot(device)
+        if snapshot != self._snapshots[row]:
+            self._snapshots[row] = snapshot
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    # --- 同步 ---
+
+    @staticmethod
+    def _snapshot(device: 'Device') -> RowSnapshot:
+        """生成设备当前显示数据的快照，用于检测变化。"""
+        return (device.name, device.type, device.mpo_total, device.lc_total, device.sfp_total, round(device.connections, 2))
+
+    def refresh(self):
+        """将模型与 NetworkManager 的当前设备同步，只通知发生变化的行。"""
+        devices = self.network_manager.get_all_devices()
+        new_ids = [dev.id for dev in devices]
+
+        if new_ids != self._ids:
+            old_count = len(self._ids)
+            if new_ids[:old_count] == self._ids:
+                # 仅在末尾追加了设备
+                self.beginInsertRows(QModelIndex(), old_count, len(new_ids) - 1)
+                self._ids = new_ids
+                self._snapshots.extend(self._snapshot(dev) for dev in devices[old_count:])
+                self._reindex(old_count)
+                self.endInsertRows()
+            elif self._is_removal_only(new_ids):
+                self._remove_missing_rows(set(new_ids))
+            else:
+                self.beginResetModel()
+                self._ids = new_ids
+                self._snapshots = [self._snapshot(dev) for dev in devices]
+                self._reindex()
+                self.endResetModel()
+                return
+
+        # 逐行比较快照，连续变化的行合并为一次 dataChanged
+        last_column = self.columnCount() - 1
+        changed_start = None
+        for row, dev in enumerate(devices):
+            snapshot = self._snapshot(dev)
+            if snapshot != self._snapshots[row]:
+                self._snapshots[row] = snapshot
+                if changed_start is None: changed_start = row
+            elif changed_start is not None:
+                self.dataChanged.emit(self.index(changed_start, 0), self.index(row - 1, last_column))
+                changed_start = None
+        if changed_start is not None:
+            self.dataChanged.emit(self.index(changed_start, 0), self.index(len(devices) - 1, last_column))
+
+    def _is_removal_only(self, new_ids: List[int]) -> bool:
+        """判断新的 ID 列表是否只是从旧列表中移除了若干设备 (顺序不变)。"""
+        if len(new_ids) >= len(self._ids):
+            return False
+        remaining = iter(self._ids)
+        return all(any(dev_id == old_id for old_id in remaining) for dev_id in new_ids)
+
+    def _remove_missing_rows(self, keep_ids: set):
+        """移除不在 keep_ids 中的行，连续的行合并为一次移除通知。"""
+        row = len(self._ids) - 1
+        while row >= 0:
+            if self._ids[row] in keep_ids:
+                row -= 1
+                continue
+            end = row
+            while row > 0 and self._ids[row - 1] not in keep_ids:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, end)
+            del self._ids[row:end + 1]
+            del self._snapshots[row:end + 1]
+            self.endRemoveRows()
+            row -= 1
+        self._reindex()
+
+    def device_id_at(self, row: int) -> Optional[int]:
+        """返回指定行的设备 ID。"""
+        return self._ids[row] if 0 <= row < len(self._ids) else None
+
+    # --- QAbstractTableModel 接口 ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(DEVICE_HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return DEVICE_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role == DEVICE_ID_ROLE:
+            return self._ids[row]
+        value = self._snapshots[row][col]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return f"{value:.2f}" if col == COL_CONN else str(value)
+        if role == SORT_ROLE:
+            return value.lower() if col in (COL_NAME, COL_TYPE) else value
+        if role == Qt.ItemDataRole.TextAlignmentRole and col >= COL_MPO:
+            return int(Qt.AlignmentFlag.AlignCenter)
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
+        col = index.column()
+        device_type = self._snapshots[index.row()][COL_TYPE]
+        if col == COL_NAME or \
+           (col in (COL_MPO, COL_LC) and device_type in UHD_TYPES) or \
+           (col == COL_SFP and device_type == DEV_MN):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        """编辑请求转交给 MainWindow；模型数据只在收到管理器的变更事件时更新。"""
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        self.edit_requested.emit(self._ids[index.row()], index.column(), str(value))
+        return False
+
+
+class DeviceFilterProxyModel(QSortFilterProxyModel):
+    """
+    按名称或类型过滤设备，并按 SORT_ROLE 排序 (数字列按数值排序)。
+
+    匹配的设备集合由搜索索引给出，逐行过滤只是一次集合查找。
+    """
+
+    def __init__(self, search_index: 'NetworkSearchIndex', parent: Optional[QObject] = None):
+        """
+        初始化设备过滤代理模型。
+
+        Args:
+            search_index ('NetworkSearchIndex'): 设备/连接搜索索引。
+            parent (Optional[QObject]): 父对象。
+        """
+        super().__init__(parent)
+        self._search_index = search_index
+        self._filter_text = ''
+        self._matches: Optional[set] = None
+        self._matches_version = -1 # _matches 对应的索引版本
+        self.setSortRole(SORT_ROLE)
+
+    def set_filter_text(self, text: str):
+        """设置过滤文本 (不区分大小写的子串匹配)。"""
+        self._filter_text = text
+        self._matches_version = -1
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if self._matches_version != self._search_index.version:
+            self._matches = self._search_index.match_devices(self._filter_text)
+            self._matches_version = self._search_index.version
+        return self._matches is None or self.sourceModel().device_id_at(source_row) in self._matches
+
+
+class ConnectionListModel(QAbstractListModel):
+    """
+    连接列表模型，"连接列表"标签页和"手动编辑"中的连接列表共享同一个实例。
+
+    模型只保存连接元组的引用，显示文本在视图请求可见行时才生成。
+    逐条的连接事件直接按索引插入/移除行；BULK_RESET 时由 sync() 计算插入/移除区间，
+    追加连接的开销与列表长度无关。
+    """
+
+    def __init__(self, network_manager: 'NetworkManager', parent: Optional[QObject] = None):
+        """
+        初始化连接列表模型。
+
+        Args:
+            network_manager ('NetworkManager'): 网络管理器实例。
+            parent (Optional[QObject]): 父对象。
+        """
+        super().__init__(parent)
+        self.network_manager = network_manager
+        self._connections: List['ConnectionType'] = []
+        self.sync()
+        network_manager.subscribe(self._on_network_changed)
+
+    def _on_network_changed(self, event: ChangeEvent):
+        """处理 NetworkManager 的变更事件。"""
+        if event.kind == CONNECTION_ADDED:
+            row = event.index
+            if row != len(self._connections):
+                self.sync(); return # 模型与管理器不同步时退回整体比较
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._connections.insert(row, event.connection)
+            self.endInsertRows()
+        elif event.kind == CONNECTION_REMOVED:
+            row = event.index
+            if not (0 <= row < len(self._connections) and self._connections[row] is event.connection):
+                self.sync(); return # 模型与管理器不同步时退回整体比较
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._connections[row]
+            self.endRemoveRows()
+        elif event.kind == DEVICE_UPDATED:
+            self.refresh_display()
+        elif event.kind == BULK_RESET:
+            self.sync()
+
+    def sync(self):
+        """将模型与 NetworkManager 的连接列表同步，只发出变化区间的行插入/移除通知。"""
+        new = self.network_manager.get_all_connections()
+        old = self._connections
+        n_old, n_new = len(old), len(new)
+
+        # 快速路径：只在末尾追加了连接 (连接元组每次添加都是新对象，按引用比较即可)
+        if n_new >= n_old and (n_old == 0 or (new[0] is old[0] and new[n_old - 1] is old[-1])):
+            if n_new > n_old:
+                self.beginInsertRows(QModelIndex(), n_old, n_new - 1)
+                old.extend(new[n_old:])
+                self.endInsertRows()
+            return
+
+        # 通用路径：公共前缀/后缀之外的部分视为一次移除加一次插入
+        limit = min(n_old, n_new)
+        prefix = 0
+        while prefix < limit and new[prefix] is old[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and new[n_new - 1 - suffix] is old[n_old - 1 - suffix]:
+            suffix += 1
+        if n_old - suffix > prefix:
+            self.beginRemoveRows(QModelIndex(), prefix, n_old - suffix - 1)
+            del old[prefix:n_old - suffix]
+            self.endRemoveRows()
+        if n_new - suffix > prefix:
+            self.beginInsertRows(QModelIndex(), prefix, n_new - suffix - 1)
+            old[prefix:prefix] = new[prefix:n_new - suffix]
+            self.endInsertRows()
+
+    def refresh_display(self):
+        """设备重命名后通知视图重新获取显示文本 (视图只重绘可见行)。"""
+        if self._connections:
+            self.dataChanged.emit(self.index(0), self.index(len(self._connections) - 1), [Qt.ItemDataRole.DisplayRole])
+
+    def connection_at(self, row: int) -> Optional['ConnectionType']:
+        """返回指定行的连接元组。"""
+        return self._connections[row] if 0 <= row < len(self._connections) else None
+
+    # --- QAbstractListModel 接口 ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._connections)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        conn = self._connections[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            dev1, port1, dev2, port2, conn_type = conn
+            return f"{index.row() + 1}. {dev1.name} [{port1}] <-> {dev2.name} [{port2}] ({conn_type})"
+        if role == CONNECTION_ROLE:
+            return conn
+        return None
+
+
+class ConnectionFilterProxyModel(QSortFilterProxyModel):
+    """按连接类型，以及设备名称或端口名称 (通过搜索索引) 过滤连接列表。"""
+
+    def __init__(self, search_index: 'NetworkSearchIndex', parent: Optional[QObject] = None):
+        """
+        初始化连接过滤代理模型。
+
+        Args:
+            search_index ('NetworkSearchIndex'): 设备/连接搜索索引。
+            parent (Optional[QObject]): 父对象。
+        """
+        super().__init__(parent)
+        self._search_index = search_index
+        self._type_filter: Optional[str] = None
+        self._device_filter = ''
+        self._matches: Optional[set] = None
+        self._matches_version = -1 # _matches 对应的索引版本
+
+    def set_filters(self, conn_type: Optional[str], device_text: str):
+        """
+        设置过滤条件。
+
+        Args:
+            conn_type (Optional[str]): 连接类型描述 (例如 "LC-LC (100G)")，None 表示所有类型。
+            device_text (str): 设备名称或端口名称子串 (不区分大小写)，空字符串表示不过滤。
+        """
+        self._type_filter = conn_type
+        self._device_filter = device_text
+        self._matches_version = -1
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if self._matches_version != self._search_index.version:
+            self._matches = self._search_index.match_connections(self._device_filter)
+            self._matches_version = self._search_index.version
+        if self._type_filter is None and self._matches is None:
+            return True
+        conn = self.sourceModel().connection_at(source_row)
+        if self._type_filter is not None and conn[4] != self._type_filter:
+            return False
+        return self._matches is None or id(conn) in self._matches
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+ui/refresh_scheduler.py
+
+定义 RefreshScheduler 类，按帧合并 UI 刷新请求。
+各个 UI 部件 (拓扑图、下拉框、统计标签等) 只标记自己需要刷新，
+调度器在下一帧统一执行一次刷新，同一帧内的重复请求 (快速编辑、拖动时的连续鼠标事件) 会被合并。
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from PySide6.QtCore import QObject, QTimer, Qt
+
+FRAME_INTERVAL_MS = 16 # 两次刷新之间的最小间隔 (约 60 帧/秒)
+
+
+class RefreshScheduler(QObject):
+    """
+    按帧合并刷新请求的调度器。
+
+    部件通过 register() 注册刷新回调，通过 mark_dirty() 标记需要刷新。
+    标记后若当前没有待执行的刷新，则启动单次定时器：距上次刷新已超过一帧时
+    以 0 超时在下一次事件循环中执行，否则等到下一帧。每次刷新按注册顺序执行所有脏部件，
+    每个部件每帧最多刷新一次。
+    """
+
+    def __init__(self, parent: Optional[QObject] = None, frame_interval_ms: int = FRAME_INTERVAL_MS):
+        """
+        初始化刷新调度器。
+
+        Args:
+            parent (Optional[QObject]): 父对象。
+            frame_interval_ms (int): 两次刷新之间的最小间隔 (毫秒)。
+        """
+        super().__init__(parent)
+        self.frame_interval_ms = frame_interval_ms
+        self._order: List[str] = []                       # 部件名称，按注册顺序刷新
+        self._callbacks: Dict[str, Callable[[], None]] = {}
+        self._covers: Dict[str, Set[str]] = {}            # 部件 -> 其刷新已包含的其他部件
+        self._dirty: Set[str] = set()
+        self._flushing = False
+        self._last_flush = 0.0                            # 上次刷新的时间 (time.perf_counter)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self.flush)
+
+    def register(self, name: str, callback: Callable[[], None], covers: Iterable[str] = ()):
+        """
+        注册一个可刷新的部件。
+
+        Args:
+            name (str): 部件名称。
+            callback (Callable[[], None]): 刷新回调。
+            covers (Iterable[str]): 此部件刷新时已一并完成的其他部件 (例如完整重绘包含视口重绘)，
+                同一帧内这些部件不再单独刷新。
+        """
+        if name not in self._callbacks:
+            self._order.append(name)
+        self._callbacks[name] = callback
+        self._covers[name] = set(covers)
+
+    def mark_dirty(self, *names: str):
+        """
+        标记部件需要刷新，并在需要时安排下一帧的刷新。
+
+        刷新过程中被标记的部件，若排在当前部件之后则在本帧内刷新，否则在下一帧刷新。
+
+        Args:
+            *names (str): 部件名称。
+        """
+        for name in names:
+            if name not in self._callbacks:
+                print(f"警告: 刷新调度器中未注册的部件 '{name}'")
+                continue
+            self._dirty.add(name)
+        if self._dirty and not self._flushing and not self._timer.isActive():
+            elapsed_ms = (time.perf_counter() - self._last_flush) * 1000.0
+            self._timer.start(max(0, int(self.frame_interval_ms - elapsed_ms)))
+
+    def is_dirty(self, name: str) -> bool:
+        """返回部件是否有待执行的刷新。"""
+        return name in self._dirty
+
+    def flush(self):
+        """立即执行所有待刷新的部件 (定时器到期时调用，也可在需要同步结果时直接调用)。"""
+        if self._flushing:
+            return
+        self._timer.stop()
+        self._flushing = True
+        self._last_flush = time.perf_counter()
+        try:
+            for name in self._order:
+                if name not in self._dirty:
+                    continue
+                self._dirty.discard(name)
+                try:
+                    self._callbacks[name]()
+                except Exception as e:
+                    print(f"错误: 刷新部件 '{name}' 时出错: {e}")
+                self._dirty -= self._covers[name]
+        finally:
+            self._flushing = False
+        # 刷新过程中标记了已刷新过的部件，留到下一帧
+        if self._dirty:
+            self._timer.start(self.frame_interval_ms)
@@ -4,6 +4,7 @@ ui/topology_canvas.py
 
 定义 MplCanvas 类，一个用于显示 Matplotlib 图形的 Qt Widget。
 负责绘制网络拓扑图。
+此模块导入 Matplotlib/NetworkX，较慢，由 MainWindow 在首次需要拓扑图时才导入。
 """
 import sys
 import os
@@ -13,9 +14,12 @@ from typing import List, Dict, Tuple, Optional, Any
 # Matplotlib imports
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+import matplotlib
 from matplotlib import font_manager
 from matplotlib.lines import Line2D # 导入 Line2D 用于图例
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+import numpy as np
 
 # NetworkX import
 import networkx as nx
@@ -33,6 +37,8 @@ try:
         PORT_MPO, PORT_LC, PORT_SFP # 导入常量
     )
     from utils.misc_utils import resource_path # 导入资源路径函数
+    from utils.layout_utils import fruchterman_reingold_layout # NumPy 力导向布局
+    from utils.font_cache import load_cached_font_family, save_cached_font_family
 except ImportError as e:
      print(f"导入错误 (topology_canvas.py): {e} - 请确保 core 和 utils 包已正确创建。")
      # Fallbacks
@@ -40,6 +46,16 @@ except ImportError as e:
      DEV_UHD, DEV_HORIZON, DEV_MN, UHD_TYPES = '', '', '', []
      PORT_MPO, PORT_LC, PORT_SFP = '', '', ''
      resource_path = lambda x: x
+     fruchterman_reingold_layout = None
+     load_cached_font_family = lambda path: None; save_cached_font_family = lambda path, family: None
+
+# --- 绘图常量 ---
+NODE_SIZE = 3500 # 节点标记面积 (points^2)
+EDGE_LABEL_LIMIT = 40 # 视口内边数不超过此值时绘制全部边标签，否则只绘制选中节点的边标签
+NODE_DETAIL_LIMIT = 60 # 视口内节点数不超过此值时节点标签显示名称和类型，否则只显示名称
+NODE_LABEL_LIMIT = 200 # 视口内节点数超过此值时不绘制节点标签
+MIN_VIEW_FRACTION = 0.001 # 最大放大时视口相对完整视图的尺寸
+MAX_VIEW_FRACTION = 4.0 # 最大缩小时视口相对完整视图的尺寸
 
 
 class MplCanvas(FigureCanvas):
@@ -70,42 +86,88 @@ class MplCanvas(FigureCanvas):
         self.chinese_font_prop = self._get_matplotlib_font_prop()
         self.current_font_family = self.chinese_font_prop.get_name() if self.chinese_font_prop else 'sans-serif'
 
+        # 固定边距代替每次重绘时的 tight_layout (后者需要逐个测量所有文本)
+        self.fig.subplots_adjust(left=0.01, right=0.99, top=0.94, bottom=0.04)
+        # 端口总数文本只创建一次，重绘时更新内容
+        self.totals_text = self.fig.text(0.01, 0.01, '', ha='left', va='bottom', fontsize=7, color='grey')
+
+        # 图例元素只创建一次
+        self.legend_elements = [
+            Line2D([0], [0], marker='o', color='w', label=DEV_UHD, markerfacecolor='skyblue', markersize=10),
+            Line2D([0], [0], marker='o', color='w', label=DEV_HORIZON, markerfacecolor='lightcoral', markersize=10),
+            Line2D([0], [0], marker='o', color='w', label=DEV_MN, markerfacecolor='lightgreen', markersize=10),
+            Line2D([0], [0], color='blue', lw=2, label=f'{PORT_LC}-{PORT_LC} (100G)'),
+            Line2D([0], [0], color='red', lw=2, label=f'{PORT_MPO}-{PORT_MPO} (25G)'),
+            Line2D([0], [0], color='orange', lw=2, label=f'{PORT_MPO}-{PORT_SFP} (10G)'),
+            Line2D([0], [0], color='purple', lw=2, label=f'{PORT_SFP}-{PORT_SFP} (10G)')
+        ]
+        self.legend_prop = copy.copy(self.chinese_font_prop)
+        self.legend_prop.set_size('small')
+
+        # 场景缓存 (节点/边数组) 与视口；view_limits 为 None 时显示完整视图
+        self._scene: Optional[Dict[str, Any]] = None
+        self.view_limits: Optional[Tuple[float, float, float, float]] = None
+        # 按图版本缓存的拓扑数据与布局结果，以及上次绘制时的 (版本, 选中节点, 视口)
+        self._topology: Optional[Dict[str, Any]] = None
+        self._layout_cache: Dict[str, Dict[int, Tuple[float, float]]] = {}
+        self._drawn_state: Optional[Tuple[int, Optional[int], Any]] = None
+        # 可选的刷新调度器：设置后视口/高亮变化合并到下一帧重绘
+        self._refresh_scheduler: Optional[Any] = None
+
+    def set_refresh_scheduler(self, scheduler: Any):
+        """
+        使用刷新调度器合并视口和选中高亮的重绘 (注册为 'viewport' 部件)。
+
+        Args:
+            scheduler (Any): RefreshScheduler 实例。
+        """
+        self._refresh_scheduler = scheduler
+        scheduler.register('viewport', self._redraw_view)
+
+    def _request_redraw(self):
+        """请求按当前视口重绘场景：有调度器时推迟到下一帧并与其他请求合并，否则立即重绘。"""
+        if self._refresh_scheduler is not None:
+            self._refresh_scheduler.mark_dirty('viewport')
+        else:
+            self._redraw_view()
+
+    def _redraw_view(self):
+        """按当前视口和选中状态重绘缓存的场景。"""
+        if self._scene is not None:
+            self._draw_scene()
 
     def _get_matplotlib_font_prop(self) -> Optional[font_manager.FontProperties]:
-         """获取用于 Matplotlib 的 FontProperties 对象"""
+         """
+         获取用于 Matplotlib 的 FontProperties 对象。
+
+         字体文件对应的家族名称缓存在用户缓存目录中 (见 utils.font_cache)，
+         命中缓存时无需解析字体文件，也无需遍历 Matplotlib 的字体列表。
+         """
+         matplotlib.rcParams['axes.unicode_minus'] = False
          try:
              font_relative_path = os.path.join('assets', 'NotoSansCJKsc-Regular.otf')
              font_path = resource_path(font_relative_path)
              if os.path.exists(font_path):
                  font_manager.fontManager.addfont(font_path)
-                 # 检查字体是否真的被 Matplotlib 识别
-                 font_families = [f.name for f in font_manager.fontManager.ttflist]
-                 target_family = 'Noto Sans CJK SC' # 字体文件名可能与 family name 不同
-                 # 查找可能的 family name
-                 prop = font_manager.FontProperties(fname=font_path)
-                 actual_family = prop.get_name()
-
-                 if actual_family in font_families:
-                     print(f"Matplotlib 字体设置成功: {actual_family}")
-                     plt.rcParams['font.sans-serif'] = [actual_family] + plt.rcParams.get('font.sans-serif', [])
-                     plt.rcParams['axes.unicode_minus'] = False
-                     return font_manager.FontProperties(family=actual_family)
-                 else:
-                      print(f"警告: 字体文件 {font_path} 已添加，但在 Matplotlib 中未找到 family '{actual_family}' 或 'Noto Sans CJK SC'。")
-
+                 actual_family = load_cached_font_family(font_path)
+                 if actual_family is None:
+                     # 字体文件名可能与 family name 不同，需解析字体文件获取
+                     actual_family = font_manager.FontProperties(fname=font_path).get_name()
+                     save_cached_font_family(font_path, actual_family)
+                 print(f"Matplotlib 字体设置成功: {actual_family}")
+                 matplotlib.rcParams['font.sans-serif'] = [actual_family] + list(matplotlib.rcParams.get('font.sans-serif', []))
+                 return font_manager.FontProperties(family=actual_family)
          except Exception as e:
               print(f"获取 Matplotlib 字体属性时出错: {e}")
 
-         # 回退
+         # 回退 (保留 rcParams 中原有的 sans-serif 字体列表，其中不能包含 'sans-serif' 自身)
          print("警告: 未能加载或设置中文字体，回退到默认 sans-serif。")
-         plt.rcParams['font.sans-serif'] = ['sans-serif']
-         plt.rcParams['axes.unicode_minus'] = False
-         return font_manager.FontProperties(family='sans-serif')
+         return font_manager.FontProperties(family=['sans-serif'])
 
 
     def plot_topology(self,
-                      devices: List[Device],
-                      connections: List[Tuple[Device, str, Device, str, str]],
+                      graph: nx.Graph,
+                      version: int,
                       layout_algorithm: str = 'spring',
                       fixed_pos: Optional[Dict[int, Tuple[float, float]]] = None,
                       selected_node_id: Optional[int] = None,
@@ -114,10 +176,14 @@ class MplCanvas(FigureCanvas):
         """
         在画布上绘制网络拓扑图。
 
+        直接使用 NetworkManager 维护的聚合图 (节点属性 name/device_type，边属性 label/color)。
+        拓扑数据按 version 缓存：版本号未变时不重新聚合、不重新计算布局；
+        若位置、选中节点和视口也未变，则不重绘。
+
         Args:
-            devices (List[Device]): 要绘制的设备列表。
-            connections (List[Tuple[Device, str, Device, str, str]]): 连接列表。
-            layout_algorithm (str): 使用的布局算法 ('spring', 'circular', etc.)。
+            graph (nx.Graph): NetworkManager.get_graph() 返回的聚合图。
+            version (int): 图对应的版本号 (NetworkManager.version)。
+            layout_algorithm (str): 使用的布局算法 ('spring', 'circular', 'fr-grid', 'fr-grid-grouped', etc.)。
             fixed_pos (Optional[Dict[int, Tuple[float, float]]]): 预设的节点位置。如果提供且节点未变，则使用此布局。
             selected_node_id (Optional[int]): 要高亮显示的节点 ID。
             port_totals_dict (Optional[Dict[str, int]]): 包含端口总数的字典，用于显示。
@@ -126,221 +192,351 @@ class MplCanvas(FigureCanvas):
             Tuple[Optional[Figure], Optional[Dict[int, Tuple[float, float]]]]:
                 (绘制的 Figure 对象, 计算出的节点位置字典)
         """
-        self.axes.cla() # 清除之前的绘图
+        # --- 显示端口总数 ---
+        if port_totals_dict is not None:
+            totals_text = f"端口总计: {PORT_MPO}: {port_totals_dict['mpo']}, {PORT_LC}: {port_totals_dict['lc']}, {PORT_SFP}+: {port_totals_dict['sfp']}"
+            self.totals_text.set_text(totals_text)
+        else:
+            self.totals_text.set_text('')
 
-        if not devices:
+        if graph.number_of_nodes() == 0:
+            self.axes.cla() # 清除之前的绘图
             self.axes.text(0.5, 0.5, '无设备数据', ha='center', va='center', fontproperties=self.chinese_font_prop)
+            self.axes.axis('off')
+            self._scene = None
+            self._drawn_state = None
             self.draw()
             return self.fig, None # 返回 Figure 但无位置信息
 
-        # --- 构建 NetworkX 图 ---
-        G = nx.Graph()
-        node_ids = [dev.id for dev in devices]
+        # --- 拓扑数据 (每个版本只构建一次) ---
+        if self._topology is None or self._topology['version'] != version:
+            self._topology = self._build_topology(graph, version)
+            self._layout_cache = {}
+        topology = self._topology
+        node_ids = topology['node_ids']
+
+        # --- 计算布局 ---
+        pos = None
+        # 只有当节点完全相同时才使用固定布局
+        if fixed_pos and len(fixed_pos) == len(node_ids) and all(node_id in fixed_pos for node_id in node_ids):
+            pos = fixed_pos
+        elif fixed_pos:
+            print("DIAG (Plot): 节点已更改，重新计算布局。")
+        if pos is None:
+            pos = self._layout_cache.get(layout_algorithm)
+        if pos is None:
+            pos = self._compute_layout(graph, layout_algorithm)
+            self._layout_cache[layout_algorithm] = pos
+
+        node_xy = np.array([pos[node_id] for node_id in node_ids], dtype=float)
+
+        # 数据、位置、选中和视口都未变化时跳过重绘
+        drawn_state = (version, selected_node_id, self.view_limits)
+        if self._scene is not None and self._drawn_state == drawn_state and np.array_equal(self._scene['node_xy'], node_xy):
+            return self.fig, dict(pos)
+
+        # --- 构建场景数据 (拓扑部分共享缓存，只更新坐标) ---
+        # 完整视图范围：节点使用大尺寸标记，四周留出 10% 边距防止被裁切
+        x_min, y_min = node_xy.min(axis=0)
+        x_max, y_max = node_xy.max(axis=0)
+        x_pad = 0.1 * ((x_max - x_min) or 1.0)
+        y_pad = 0.1 * ((y_max - y_min) or 1.0)
+
+        self._scene = dict(topology)
+        self._scene['node_xy'] = node_xy
+        self._scene['edge_segments'] = node_xy[topology['edge_ends']].reshape(-1, 2, 2)
+        self._scene['home_limits'] = (x_min - x_pad, x_max + x_pad, y_min - y_pad, y_max + y_pad)
+        self._scene['layout'] = layout_algorithm
+        self._apply_selection(selected_node_id)
+        self._draw_scene()
+
+        return self.fig, dict(pos) # 返回副本，调用方 (拖动) 修改位置不影响布局缓存
+
+    def _build_topology(self, graph: nx.Graph, version: int) -> Dict[str, Any]:
+        """
+        从 NetworkManager 的聚合图构建与坐标无关的场景数据 (节点样式、边样式、标签、邻接索引)。
+
+        Args:
+            graph (nx.Graph): 聚合图。
+            version (int): 图的版本号。
+
+        Returns:
+            Dict[str, Any]: 拓扑场景数据。
+        """
+        node_ids = list(graph.nodes())
+        node_index = {node_id: i for i, node_id in enumerate(node_ids)}
         node_colors = []
-        node_labels = {}
-        node_alphas = []
-        highlight_color = 'yellow'
+        node_names = []
+        node_types = []
+        for node_id, data in graph.nodes(data=True):
+            device_type = data.get('device_type')
+            base_color = 'grey'
+            if device_type == DEV_UHD: base_color = 'skyblue'
+            elif device_type == DEV_HORIZON: base_color = 'lightcoral'
+            elif device_type == DEV_MN: base_color = 'lightgreen'
+            node_colors.append(base_color)
+            node_names.append(data.get('name', str(node_id)))
+            node_types.append(device_type)
+
+        edge_colors = []
+        edge_labels: List[Optional[str]] = []
+        # 邻接索引: 节点下标 -> 关联边的下标列表，用于 O(度) 计算选中高亮
+        incident_edges: Dict[int, List[int]] = {}
+        edge_ends = np.zeros((graph.number_of_edges(), 2), dtype=np.int64)
+        for i, (u, v, data) in enumerate(graph.edges(data=True)):
+            ui, vi = node_index[u], node_index[v]
+            edge_ends[i] = (ui, vi)
+            incident_edges.setdefault(ui, []).append(i)
+            incident_edges.setdefault(vi, []).append(i)
+            edge_colors.append(data.get('color', 'black'))
+            edge_labels.append(data.get('label'))
+
+        return {
+            'version': version,
+            'node_ids': node_ids,
+            'node_index': node_index,
+            'node_base_rgba': to_rgba_array(node_colors),
+            'node_names': node_names,
+            'node_types': node_types,
+            'edge_ends': edge_ends,
+            'incident_edges': incident_edges,
+            'edge_base_rgba': to_rgba_array(edge_colors) if edge_colors else np.zeros((0, 4)),
+            'edge_labels': edge_labels,
+        }
+
+    def _compute_layout(self, graph: nx.Graph, layout_algorithm: str) -> Dict[int, Tuple[float, float]]:
+        """
+        计算节点布局。
+
+        Args:
+            graph (nx.Graph): 聚合图。
+            layout_algorithm (str): 布局算法名称。
+
+        Returns:
+            Dict[int, Tuple[float, float]]: 节点 ID -> 坐标。
+        """
+        try:
+            if layout_algorithm == 'circular':
+                return nx.circular_layout(graph)
+            elif layout_algorithm == 'kamada-kawai':
+                return nx.kamada_kawai_layout(graph)
+            elif layout_algorithm == 'random':
+                return nx.random_layout(graph, seed=42) # 使用种子保证随机布局可复现
+            elif layout_algorithm in ('fr-grid', 'fr-grid-grouped') and fruchterman_reingold_layout is not None:
+                # NumPy 网格近似 Fruchterman-Reingold，适用于大规模拓扑
+                groups = dict(graph.nodes(data='device_type')) if layout_algorithm == 'fr-grid-grouped' else None
+                return fruchterman_reingold_layout(list(graph.nodes()), list(graph.edges()), groups=groups)
+            elif layout_algorithm == 'shell':
+                # 按设备类型分层
+                shells_by_type: Dict[str, List[int]] = {}
+                for node_id, device_type in graph.nodes(data='device_type'):
+                    shells_by_type.setdefault(device_type, []).append(node_id)
+                shells = [shells_by_type[t] for t in sorted(shells_by_type, key=str)]
+                # 如果只有一层或没有设备，shell 布局可能效果不好，回退到 spring
+                if len(shells) < 2:
+                     print("DIAG (Plot): Shell 布局层数不足，使用 Spring 布局。")
+                     return nx.spring_layout(graph, seed=42, k=0.8) # k 值调整节点间距
+                return nx.shell_layout(graph, nlist=shells)
+            else: # 默认为 spring
+                return nx.spring_layout(graph, seed=42, k=0.8)
+        except Exception as e:
+            print(f"警告: 计算布局 '{layout_algorithm}' 时出错: {e}. 使用 spring 布局回退。")
+            return nx.spring_layout(graph, seed=42, k=0.8)
+
+    # --- 选中高亮 ---
+
+    def _apply_selection(self, selected_node_id: Optional[int]):
+        """
+        根据选中节点计算场景中节点和边的样式。
+
+        只访问选中节点的关联边 (邻接索引)，复杂度为 O(度)，外加一次数组填充。
+
+        Args:
+            selected_node_id (Optional[int]): 选中的节点 ID，None 表示无选中。
+        """
+        scene = self._scene
         default_alpha = 0.9
         dimmed_alpha = 0.3
+        default_edge_alpha = 0.7
+        dimmed_edge_alpha = 0.15
+        default_edge_width = 1.5
+        highlight_edge_width = 2.5
+
+        node_rgba = scene['node_base_rgba'].copy()
+        edge_rgba = scene['edge_base_rgba'].copy()
+        edge_widths = np.full(len(edge_rgba), default_edge_width)
+        edge_highlighted = np.zeros(len(edge_rgba), dtype=bool)
+
+        selected_idx = scene['node_index'].get(selected_node_id) if selected_node_id is not None else None
+        if selected_idx is None:
+            # 没有选中节点，所有节点和边都正常显示
+            node_rgba[:, 3] = default_alpha
+            edge_rgba[:, 3] = default_edge_alpha
+        else:
+            incident = scene['incident_edges'].get(selected_idx, [])
+            neighbors = scene['edge_ends'][incident].ravel()
+            node_rgba[:, 3] = dimmed_alpha
+            node_rgba[neighbors, 3] = default_alpha
+            node_rgba[selected_idx] = to_rgba_array(['yellow'])[0]
+            node_rgba[selected_idx, 3] = default_alpha
+            edge_rgba[:, 3] = dimmed_edge_alpha
+            edge_rgba[incident, 3] = default_edge_alpha
+            edge_widths[incident] = highlight_edge_width
+            edge_highlighted[incident] = True
+
+        scene['node_rgba'] = node_rgba
+        scene['edge_rgba'] = edge_rgba
+        scene['edge_widths'] = edge_widths
+        scene['edge_highlighted'] = edge_highlighted
+        scene['dim_labels'] = selected_idx is not None
+        scene['selected_node_id'] = selected_node_id
+
+    def update_selection(self, selected_node_id: Optional[int]):
+        """
+        仅更新选中高亮并重绘 (不重新构建图、布局和标签聚合)。
 
-        # 添加节点并设置标签和基础颜色/透明度
-        for dev in devices:
-            G.add_node(dev.id)
-            node_labels[dev.id] = f"{dev.name}\n({dev.type})"
-            base_color = 'grey'
-            if dev.type == DEV_UHD: base_color = 'skyblue'
-            elif dev.type == DEV_HORIZON: base_color = 'lightcoral'
-            elif dev.type == DEV_MN: base_color = 'lightgreen'
-
-            # 根据是否有选中节点来设置颜色和透明度
-            if selected_node_id is not None:
-                if dev.id == selected_node_id:
-                    node_colors.append(highlight_color)
-                    node_alphas.append(default_alpha)
-                else:
-                    # 检查是否为邻居
-                    is_neighbor = any(
-                        (conn[0].id == selected_node_id and conn[2].id == dev.id) or \
-                        (conn[0].id == dev.id and conn[2].id == selected_node_id)
-                        for conn in connections
-                    )
-                    node_colors.append(base_color)
-                    node_alphas.append(default_alpha if is_neighbor else dimmed_alpha)
-            else:
-                # 没有选中节点，所有节点都正常显示
-                node_colors.append(base_color)
-                node_alphas.append(default_alpha)
-
-        # 添加边并聚合标签
-        edge_labels: Dict[Tuple[int, int], str] = {}
-        edge_counts: Dict[Tuple[int, int], Dict[str, Dict[str, Any]]] = {} # {(u,v): {base_type: {'count': n, 'details': full_desc}}}
-        highlighted_edges: Set[Tuple[int, int]] = set()
-
-        if connections:
-            for conn in connections:
-                dev1, _, dev2, _, conn_type = conn
-                if dev1.id in node_ids and dev2.id in node_ids:
-                    edge_key = tuple(sorted((dev1.id, dev2.id))) # 确保边的键顺序一致
-                    G.add_edge(dev1.id, dev2.id)
-
-                    # 聚合连接类型和数量
-                    if edge_key not in edge_counts:
-                        edge_counts[edge_key] = {}
-                    base_conn_type = conn_type.split(' ')[0] # 例如 "LC-LC"
-                    if base_conn_type not in edge_counts[edge_key]:
-                        edge_counts[edge_key][base_conn_type] = {'count': 0, 'details': conn_type} # 存储第一个遇到的完整描述
-                    edge_counts[edge_key][base_conn_type]['count'] += 1
-
-                    # 如果有选中节点，标记高亮的边
-                    if selected_node_id is not None and (dev1.id == selected_node_id or dev2.id == selected_node_id):
-                        highlighted_edges.add(edge_key)
-
-            # 生成最终的边标签
-            for edge_key, type_groups in edge_counts.items():
-                label_parts = [f"{data['details']} x{data['count']}" for base_type, data in type_groups.items()]
-                edge_labels[edge_key] = "\n".join(label_parts)
+        Args:
+            selected_node_id (Optional[int]): 选中的节点 ID，None 表示取消选中。
+        """
+        if self._scene is None:
+            return
+        self._apply_selection(selected_node_id)
+        self._request_redraw()
 
-        # --- 计算布局 ---
-        pos = None
-        if not G:
-            print("DIAG (Plot): 图为空，不计算布局。")
-            self.axes.text(0.5, 0.5, '无连接数据', ha='center', va='center', fontproperties=self.chinese_font_prop)
-            self.draw()
-            return self.fig, None
-
-        # 检查是否可以使用固定布局
-        if fixed_pos:
-            current_node_ids = set(G.nodes())
-            stored_node_ids = set(fixed_pos.keys())
-            # 只有当节点完全相同时才使用固定布局
-            if current_node_ids == stored_node_ids:
-                pos = fixed_pos
-            else:
-                print("DIAG (Plot): 节点已更改，重新计算布局。")
-                fixed_pos = None # 强制重新计算
-
-        # 如果没有固定布局或节点已变，则计算新布局
-        if pos is None:
-            try:
-                if layout_algorithm == 'circular':
-                    pos = nx.circular_layout(G)
-                elif layout_algorithm == 'kamada-kawai':
-                    pos = nx.kamada_kawai_layout(G)
-                elif layout_algorithm == 'random':
-                    pos = nx.random_layout(G, seed=42) # 使用种子保证随机布局可复现
-                elif layout_algorithm == 'shell':
-                    # 按设备类型分层
-                    shells = []
-                    types_present = sorted(list(set(dev.type for dev in devices)))
-                    for t in types_present:
-                        shells.append([dev.id for dev in devices if dev.type == t])
-                    # 如果只有一层或没有设备，shell 布局可能效果不好，回退到 spring
-                    if len(shells) < 2:
-                         print("DIAG (Plot): Shell 布局层数不足，使用 Spring 布局。")
-                         pos = nx.spring_layout(G, seed=42, k=0.8) # k 值调整节点间距
-                    else:
-                         pos = nx.shell_layout(G, nlist=shells)
-                else: # 默认为 spring
-                    pos = nx.spring_layout(G, seed=42, k=0.8)
-            except Exception as e:
-                print(f"警告: 计算布局 '{layout_algorithm}' 时出错: {e}. 使用 spring 布局回退。")
-                pos = nx.spring_layout(G, seed=42, k=0.8)
-
-        # --- 绘制图形 ---
-        # 绘制节点
-        nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=3500, ax=self.axes, alpha=node_alphas)
+    def render_key(self) -> Optional[Tuple]:
+        """
+        返回描述已绘制内容的键，用于缓存导出的渲染结果 (见 export_utils.RenderCache)。
+        应在完成待执行的重绘之后调用。
+
+        Returns:
+            Optional[Tuple]: (版本号, 节点位置哈希, 布局, 选中节点, 视口, 图尺寸)；画布上没有拓扑场景时为 None。
+        """
+        if self._scene is None or self._drawn_state is None:
+            return None
+        version, selected_node_id, view_limits = self._drawn_state
+        return (version, hash(self._scene['node_xy'].tobytes()), self._scene['layout'],
+                selected_node_id, view_limits, tuple(self.fig.get_size_inches()))
+
+    # --- 视口 (缩放/平移) ---
+
+    def get_view_limits(self) -> Optional[Tuple[float, float, float, float]]:
+        """
+        返回当前视口范围。
+
+        Returns:
+            Optional[Tuple[float, float, float, float]]: (x_min, x_max, y_min, y_max)，无场景时为 None。
+        """
+        if self._scene is None:
+            return None
+        return self.view_limits or self._scene['home_limits']
+
+    def set_view_limits(self, limits: Tuple[float, float, float, float]):
+        """
+        设置视口范围并按新视口重绘 (不重新计算场景数据)。
+
+        Args:
+            limits (Tuple[float, float, float, float]): (x_min, x_max, y_min, y_max)。
+        """
+        if self._scene is None:
+            return
+        self.view_limits = limits
+        self._request_redraw()
+
+    def zoom_at(self, x: float, y: float, scale: float):
+        """
+        以 (x, y) 为中心缩放视口。
+
+        Args:
+            x (float): 缩放中心的 x 数据坐标。
+            y (float): 缩放中心的 y 数据坐标。
+            scale (float): 视口尺寸的缩放系数 (<1 放大，>1 缩小)。
+        """
+        limits = self.get_view_limits()
+        if limits is None:
+            return
+        x0, x1, y0, y1 = limits
+        home = self._scene['home_limits']
+        home_span = max(home[1] - home[0], home[3] - home[2])
+        # 限制缩放范围，避免视口退化或无限缩小
+        span = max(x1 - x0, y1 - y0)
+        scale = min(max(scale, home_span * MIN_VIEW_FRACTION / span), home_span * MAX_VIEW_FRACTION / span)
+        self.set_view_limits((x - (x - x0) * scale, x + (x1 - x) * scale,
+                              y - (y - y0) * scale, y + (y1 - y) * scale))
+
+    def reset_view(self):
+        """恢复为显示全部节点的完整视图。"""
+        self.view_limits = None
+        self._request_redraw()
+
+    def _draw_scene(self):
+        """
+        按当前视口绘制缓存的场景。
+
+        视口外的节点、边和标签不会创建 Artist；标签的详细程度由视口内的节点数量
+        (即缩放级别) 决定：节点较多时只显示名称，过多时隐藏节点标签；
+        边标签在视口内边数不超过 EDGE_LABEL_LIMIT 时全部绘制，否则只绘制选中节点的边。
+        """
+        scene = self._scene
+        self._drawn_state = (scene['version'], scene['selected_node_id'], self.view_limits)
+        self.axes.cla()
+        x0, x1, y0, y1 = self.get_view_limits()
+
+        # 节点标记有一定尺寸，筛选时视口向外扩展 5%
+        x_pad = 0.05 * (x1 - x0)
+        y_pad = 0.05 * (y1 - y0)
+        node_xy = scene['node_xy']
+        node_visible = (node_xy[:, 0] >= x0 - x_pad) & (node_xy[:, 0] <= x1 + x_pad) & \
+                       (node_xy[:, 1] >= y0 - y_pad) & (node_xy[:, 1] <= y1 + y_pad)
+        visible_idx = np.flatnonzero(node_visible)
+
+        # 绘制节点 (单个 PathCollection)
+        if visible_idx.size:
+            self.axes.scatter(node_xy[visible_idx, 0], node_xy[visible_idx, 1], s=NODE_SIZE,
+                              c=scene['node_rgba'][visible_idx], linewidths=0, zorder=2)
         # 绘制节点标签
-        nx.draw_networkx_labels(G, pos, labels=node_labels, font_size=9, ax=self.axes, font_family=self.current_font_family)
-
-        # 绘制边和边标签
-        if connections and G.edges():
-            unique_edges = list(G.edges())
-            edge_colors = []
-            edge_widths = []
-            edge_alphas = []
-            highlight_edge_width = 2.5
-            default_edge_width = 1.5
-            dimmed_edge_alpha = 0.15
-            default_edge_alpha = 0.7
-
-            # 设置边的颜色、宽度和透明度
-            for u, v in unique_edges:
-                edge_key = tuple(sorted((u, v)))
-                is_highlighted = edge_key in highlighted_edges
-                is_selected_node_present = selected_node_id is not None
-
-                # 确定边颜色
-                color_found = 'black' # 默认颜色
-                if edge_key in edge_counts:
-                    # 基于第一个连接类型确定颜色（可能需要更复杂的逻辑如果混合类型）
-                    first_base_type = next(iter(edge_counts[edge_key]))
-                    if 'LC-LC' in first_base_type: color_found = 'blue'
-                    elif 'MPO-MPO' in first_base_type: color_found = 'red'
-                    elif 'MPO-SFP' in first_base_type: color_found = 'orange'
-                    elif 'SFP-SFP' in first_base_type: color_found = 'purple'
-                edge_colors.append(color_found)
-
-                # 确定边宽度
-                edge_widths.append(highlight_edge_width if is_highlighted else default_edge_width)
-
-                # 确定边透明度
-                edge_alphas.append(default_edge_alpha if (not is_selected_node_present or is_highlighted) else dimmed_edge_alpha)
-
-            # 绘制边
-            nx.draw_networkx_edges(G, pos, edgelist=unique_edges, edge_color=edge_colors,
-                                   width=edge_widths, alpha=edge_alphas, ax=self.axes, arrows=False)
-
-            # 绘制边标签 (需要处理高亮时的颜色)
-            edge_label_colors = {}
+        if visible_idx.size <= NODE_LABEL_LIMIT:
+            show_type = visible_idx.size <= NODE_DETAIL_LIMIT
+            names = scene['node_names']; types = scene['node_types']
+            for i in visible_idx:
+                label = f"{names[i]}\n({types[i]})" if show_type else names[i]
+                self.axes.text(node_xy[i, 0], node_xy[i, 1], label, fontsize=9, ha='center', va='center',
+                               family=self.current_font_family, zorder=3, clip_on=True)
+
+        # 绘制边 (只保留包围盒与视口相交的边，合并为一个 LineCollection)
+        segments = scene['edge_segments']
+        if len(segments):
+            seg_x = segments[:, :, 0]; seg_y = segments[:, :, 1]
+            edge_visible = (seg_x.max(axis=1) >= x0) & (seg_x.min(axis=1) <= x1) & \
+                           (seg_y.max(axis=1) >= y0) & (seg_y.min(axis=1) <= y1)
+            visible_edges = np.flatnonzero(edge_visible)
+            if visible_edges.size:
+                self.axes.add_collection(LineCollection(segments[visible_edges], colors=scene['edge_rgba'][visible_edges],
+                                                        linewidths=scene['edge_widths'][visible_edges], zorder=1),
+                                         autolim=False)
+
+            # 绘制边标签 (标签位于边的中点，中点在视口外的不绘制)
+            mid = segments.mean(axis=1)
+            label_visible = edge_visible & (mid[:, 0] >= x0) & (mid[:, 0] <= x1) & (mid[:, 1] >= y0) & (mid[:, 1] <= y1)
+            if np.count_nonzero(label_visible) > EDGE_LABEL_LIMIT:
+                label_visible &= scene['edge_highlighted']
             dimmed_label_color = 'lightgrey'
             default_label_color = 'black'
-            for edge, label in edge_labels.items():
-                 edge_key = tuple(sorted(edge))
-                 is_highlighted = edge_key in highlighted_edges
-                 is_selected_node_present = selected_node_id is not None
-                 # 只有在有节点选中且当前边未高亮时才应用暗淡颜色
-                 color = dimmed_label_color if (is_selected_node_present and not is_highlighted) else default_label_color
-                 edge_label_colors[edge_key] = color # 存储每个标签的颜色
-
-            # 使用 font_color 参数一次性设置所有标签颜色可能不支持字典，需要单独绘制或修改 NetworkX 源码
-            # 暂时先用默认颜色绘制所有标签
-            nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=7, ax=self.axes,
-                                         label_pos=0.5, rotate=False, font_family=self.current_font_family,
-                                         font_color=default_label_color) # TODO: 实现标签颜色区分高亮
-
-        # --- 显示端口总数 ---
-        if port_totals_dict is not None:
-            totals_text = f"端口总计: {PORT_MPO}: {port_totals_dict['mpo']}, {PORT_LC}: {port_totals_dict['lc']}, {PORT_SFP}+: {port_totals_dict['sfp']}"
-            # 在 Figure 坐标系左下角添加文本
-            self.fig.text(0.01, 0.01, totals_text, ha='left', va='bottom', fontsize=7, color='grey', transform=self.fig.transFigure)
-
+            for i in np.flatnonzero(label_visible):
+                text = scene['edge_labels'][i]
+                if not text:
+                    continue
+                # 只有在有节点选中且当前边未高亮时才应用暗淡颜色
+                color = dimmed_label_color if (scene['dim_labels'] and not scene['edge_highlighted'][i]) else default_label_color
+                self.axes.text(mid[i, 0], mid[i, 1], text, fontsize=7, color=color,
+                               ha='center', va='center', family=self.current_font_family, zorder=4, clip_on=True,
+                               bbox=dict(boxstyle='round', ec=(1.0, 1.0, 1.0), fc=(1.0, 1.0, 1.0)))
+
+        self.axes.set_xlim(x0, x1)
+        self.axes.set_ylim(y0, y1)
 
         # --- 设置标题和图例 ---
         self.axes.set_title("网络连接拓扑图", fontproperties=self.chinese_font_prop)
         self.axes.axis('off') # 关闭坐标轴
-
-        # 创建图例元素
-        legend_elements = [
-            Line2D([0], [0], marker='o', color='w', label=DEV_UHD, markerfacecolor='skyblue', markersize=10),
-            Line2D([0], [0], marker='o', color='w', label=DEV_HORIZON, markerfacecolor='lightcoral', markersize=10),
-            Line2D([0], [0], marker='o', color='w', label=DEV_MN, markerfacecolor='lightgreen', markersize=10),
-            Line2D([0], [0], color='blue', lw=2, label=f'{PORT_LC}-{PORT_LC} (100G)'),
-            Line2D([0], [0], color='red', lw=2, label=f'{PORT_MPO}-{PORT_MPO} (25G)'),
-            Line2D([0], [0], color='orange', lw=2, label=f'{PORT_MPO}-{PORT_SFP} (10G)'),
-            Line2D([0], [0], color='purple', lw=2, label=f'{PORT_SFP}-{PORT_SFP} (10G)')
-        ]
-        # 设置图例字体
-        legend_prop_small = copy.copy(self.chinese_font_prop)
-        legend_prop_small.set_size('small')
-        self.axes.legend(handles=legend_elements, loc='best', prop=legend_prop_small)
-
-        # 调整布局防止标签重叠或出界
-        try:
-             self.fig.tight_layout(rect=[0, 0.03, 1, 1]) # rect 留出底部空间给端口总数
-        except ValueError as e:
-             print(f"警告: tight_layout 失败: {e}") # 有时在特定情况下会失败
+        self.axes.legend(handles=self.legend_elements, loc='best', prop=self.legend_prop)
 
         self.draw_idle() # 异步绘制
-
-        return self.fig, pos
-
@@ -9,8 +9,8 @@ ui/ui_main_window.py
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit,
     QComboBox, QTextEdit, QTabWidget, QFrame, QSpacerItem, QSizePolicy,
-    QGridLayout, QListWidgetItem, QAbstractItemView, QTableWidget,
-    QTableWidgetItem, QHeaderView, QListWidget, QSplitter, QCheckBox,
+    QGridLayout, QAbstractItemView, QTableView, QListView,
+    QHeaderView, QSplitter, QCheckBox,
     QMainWindow # 导入 QMainWindow 以便类型提示
 )
 from PySide6.QtCore import Qt
@@ -23,17 +23,11 @@ try:
         DEV_UHD, DEV_HORIZON, DEV_MN,
         PORT_MPO, PORT_LC, PORT_SFP
     )
-    # 导入自定义控件
-    from .widgets import NumericTableWidgetItem
-    # 导入画布类 (虽然不由 setupUi 创建，但可能需要知道类型)
-    from .topology_canvas import MplCanvas
 except ImportError as e:
     print(f"导入错误 (ui_main_window.py): {e}")
     # Fallbacks
     DEV_UHD, DEV_HORIZON, DEV_MN = 'MicroN UHD', 'HorizoN', 'MicroN'
     PORT_MPO, PORT_LC, PORT_SFP = 'MPO', 'LC', 'SFP'
-    NumericTableWidgetItem = QTableWidgetItem
-    MplCanvas = QWidget
 
 # UI 常量
 COL_NAME = 0
@@ -136,23 +130,25 @@ class Ui_MainWindow(object):
         filter_layout.addWidget(MainWindow.device_filter_entry)
         list_group_layout.addLayout(filter_layout)
 
-        MainWindow.device_tablewidget = QTableWidget()
-        MainWindow.device_tablewidget.setFont(chinese_font) # !! 使用局部变量 !!
-        MainWindow.device_tablewidget.setColumnCount(6)
-        MainWindow.device_tablewidget.setHorizontalHeaderLabels(["名称", "类型", PORT_MPO, PORT_LC, f"{PORT_SFP}+", "连接数(估)"])
-        MainWindow.device_tablewidget.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        MainWindow.device_tablewidget.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        MainWindow.device_tablewidget.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.SelectedClicked | QAbstractItemView.EditTrigger.EditKeyPressed)
-        MainWindow.device_tablewidget.setSortingEnabled(True)
-        header = MainWindow.device_tablewidget.horizontalHeader()
+        # 设备表格使用 Model/View：模型 (device_proxy_model) 由 MainWindow 在调用 setupUi 前创建
+        MainWindow.device_tableview = QTableView()
+        MainWindow.device_tableview.setFont(chinese_font) # !! 使用局部变量 !!
+        MainWindow.device_tableview.setModel(MainWindow.device_proxy_model)
+        MainWindow.device_tableview.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        MainWindow.device_tableview.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        MainWindow.device_tableview.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.SelectedClicked | QAbstractItemView.EditTrigger.EditKeyPressed)
+        MainWindow.device_tableview.setSortingEnabled(True)
+        MainWindow.device_tableview.sortByColumn(-1, Qt.SortOrder.AscendingOrder) # 初始保持添加顺序
+        MainWindow.device_tableview.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed) # 固定行高，避免逐行测量
+        header = MainWindow.device_tableview.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         header.setSectionResizeMode(COL_NAME, QHeaderView.ResizeMode.Stretch)
-        MainWindow.device_tablewidget.setColumnWidth(COL_TYPE, 90)
-        MainWindow.device_tablewidget.setColumnWidth(COL_MPO, 50)
-        MainWindow.device_tablewidget.setColumnWidth(COL_LC, 50)
-        MainWindow.device_tablewidget.setColumnWidth(COL_SFP, 50)
-        MainWindow.device_tablewidget.setColumnWidth(COL_CONN, 80)
-        list_group_layout.addWidget(MainWindow.device_tablewidget)
+        MainWindow.device_tableview.setColumnWidth(COL_TYPE, 90)
+        MainWindow.device_tableview.setColumnWidth(COL_MPO, 50)
+        MainWindow.device_tableview.setColumnWidth(COL_LC, 50)
+        MainWindow.device_tableview.setColumnWidth(COL_SFP, 50)
+        MainWindow.device_tableview.setColumnWidth(COL_CONN, 80)
+        list_group_layout.addWidget(MainWindow.device_tableview)
 
         device_op_layout = QHBoxLayout()
         MainWindow.remove_button = QPushButton("移除选中")
@@ -196,7 +192,16 @@ class Ui_MainWindow(object):
         MainWindow.export_report_button = QPushButton("导出报告 (HTML)")
         MainWindow.export_report_button.setFont(chinese_font) # !! 使用局部变量 !!
         MainWindow.export_report_button.setEnabled(False)
-        file_group_layout.addWidget(MainWindow.export_report_button, 3, 0, 1, 2)
+        file_group_layout.addWidget(MainWindow.export_report_button, 3, 0)
+        MainWindow.export_all_button = QPushButton("导出全部格式")
+        MainWindow.export_all_button.setFont(chinese_font) # !! 使用局部变量 !!
+        MainWindow.export_all_button.setToolTip("一次导出 CSV、TXT、JSON Lines、GraphML 和每个设备的配线表")
+        MainWindow.export_all_button.setEnabled(False)
+        file_group_layout.addWidget(MainWindow.export_all_button, 3, 1)
+        MainWindow.import_connections_button = QPushButton("导入连接 (CSV)")
+        MainWindow.import_connections_button.setFont(chinese_font) # !! 使用局部变量 !!
+        MainWindow.import_connections_button.setToolTip("从导出的 CSV 连接列表 (序号, 设备1, 端口1, 设备2, 端口2, 连接类型) 导入连接，设备按名称匹配")
+        file_group_layout.addWidget(MainWindow.import_connections_button, 4, 0, 1, 2)
         left_layout.addWidget(file_group)
 
         # --- 跳过确认弹窗设置 ---
@@ -235,7 +240,7 @@ class Ui_MainWindow(object):
         calculate_control_layout.addWidget(calculate_label2)
         MainWindow.layout_combo = QComboBox()
         MainWindow.layout_combo.setFont(chinese_font) # !! 使用局部变量 !!
-        MainWindow.layout_combo.addItems(["Spring", "Circular", "Kamada-Kawai", "Random", "Shell"])
+        MainWindow.layout_combo.addItems(["Spring", "Circular", "Kamada-Kawai", "Random", "Shell", "FR-Grid", "FR-Grid-Grouped"])
         calculate_control_layout.addWidget(MainWindow.layout_combo)
         MainWindow.calculate_button = QPushButton("计算连接")
         MainWindow.calculate_button.setFont(chinese_font) # !! 使用局部变量 !!
@@ -259,23 +264,26 @@ class Ui_MainWindow(object):
         # --- 连接列表 Tab ---
         MainWindow.connections_tab = QWidget()
         connections_layout = QVBoxLayout(MainWindow.connections_tab)
-        MainWindow.connections_textedit = QTextEdit()
-        MainWindow.connections_textedit.setFont(chinese_font) # !! 使用局部变量 !!
-        MainWindow.connections_textedit.setReadOnly(True)
-        connections_layout.addWidget(MainWindow.connections_textedit)
+        MainWindow.connections_summary_label = QLabel("无连接。")
+        MainWindow.connections_summary_label.setFont(chinese_font) # !! 使用局部变量 !!
+        connections_layout.addWidget(MainWindow.connections_summary_label)
+        # 连接列表使用 Model/View：模型 (connection_model) 由 MainWindow 在调用 setupUi 前创建
+        MainWindow.connections_listview = QListView()
+        MainWindow.connections_listview.setFont(chinese_font) # !! 使用局部变量 !!
+        MainWindow.connections_listview.setModel(MainWindow.connection_model)
+        MainWindow.connections_listview.setUniformItemSizes(True) # 所有行等高，视图无需逐行测量
+        MainWindow.connections_listview.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        connections_layout.addWidget(MainWindow.connections_listview)
         MainWindow.tab_widget.addTab(MainWindow.connections_tab, "连接列表")
 
         # --- 拓扑图 Tab ---
         MainWindow.topology_tab = QWidget()
-        topology_layout = QVBoxLayout(MainWindow.topology_tab)
-        if hasattr(MainWindow, 'mpl_canvas') and MainWindow.mpl_canvas:
-             MainWindow.mpl_canvas.setParent(MainWindow.topology_tab)
-             topology_layout.addWidget(MainWindow.mpl_canvas)
-        else:
-             print("错误: MainWindow 实例缺少 mpl_canvas 属性！")
-             placeholder = QLabel("拓扑图画布加载失败")
-             placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
-             topology_layout.addWidget(placeholder)
+        MainWindow.topology_layout = QVBoxLayout(MainWindow.topology_tab)
+        # 画布 (Matplotlib) 在首次显示此标签页时由 MainWindow._ensure_canvas 创建并替换占位控件
+        MainWindow.topology_placeholder = QLabel("正在加载拓扑图...")
+        MainWindow.topology_placeholder.setFont(chinese_font) # !! 使用局部变量 !!
+        MainWindow.topology_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        MainWindow.topology_layout.addWidget(MainWindow.topology_placeholder)
         MainWindow.tab_widget.addTab(MainWindow.topology_tab, "拓扑图")
 
         # --- 手动编辑 Tab ---
@@ -312,8 +320,8 @@ class Ui_MainWindow(object):
         filter_conn_label2 = QLabel("设备过滤:") # 创建实例
         filter_conn_label2.setFont(chinese_font) # !! 使用局部变量 !!
         filter_conn_layout.addWidget(filter_conn_label2);
-        MainWindow.conn_filter_device_entry = QLineEdit(); MainWindow.conn_filter_device_entry.setFont(chinese_font); MainWindow.conn_filter_device_entry.setPlaceholderText("按设备名称过滤..."); filter_conn_layout.addWidget(MainWindow.conn_filter_device_entry); remove_manual_layout.insertLayout(1, filter_conn_layout); # !! 使用局部变量 !!
-        MainWindow.manual_connection_list = QListWidget(); MainWindow.manual_connection_list.setFont(chinese_font); MainWindow.manual_connection_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection); remove_manual_layout.addWidget(MainWindow.manual_connection_list); # !! 使用局部变量 !!
+        MainWindow.conn_filter_device_entry = QLineEdit(); MainWindow.conn_filter_device_entry.setFont(chinese_font); MainWindow.conn_filter_device_entry.setPlaceholderText("按设备名称或端口过滤..."); filter_conn_layout.addWidget(MainWindow.conn_filter_device_entry); remove_manual_layout.insertLayout(1, filter_conn_layout); # !! 使用局部变量 !!
+        MainWindow.manual_connection_listview = QListView(); MainWindow.manual_connection_listview.setFont(chinese_font); MainWindow.manual_connection_listview.setModel(MainWindow.connection_proxy_model); MainWindow.manual_connection_listview.setUniformItemSizes(True); MainWindow.manual_connection_listview.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers); MainWindow.manual_connection_listview.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection); remove_manual_layout.addWidget(MainWindow.manual_connection_listview); # !! 使用局部变量 !!
         MainWindow.remove_manual_button = QPushButton("移除选中连接"); MainWindow.remove_manual_button.setFont(chinese_font); MainWindow.remove_manual_button.setEnabled(False); remove_manual_layout.addWidget(MainWindow.remove_manual_button, alignment=Qt.AlignmentFlag.AlignCenter); edit_main_layout.addWidget(remove_manual_group) # !! 使用局部变量 !!
         MainWindow.tab_widget.addTab(MainWindow.edit_tab, "手动编辑")
 
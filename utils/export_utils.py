@@ -2,29 +2,35 @@
 """
 utils/export_utils.py
 
-提供导出连接列表、拓扑图和 HTML 报告的功能函数。
+提供导出连接列表 (单一格式或一次写出全部格式)、拓扑图和 HTML 报告的功能函数。
+
+每种导出分为两部分: 在 GUI 线程中选择文件的对话框函数 (export_*)，以及实际写文件的任务函数 (write_* / render_*)。
+传入 BackgroundTaskRunner 时任务函数在后台线程中执行 (参数为连接列表快照和 prepare_render() 准备的渲染函数)，
+界面在导出期间保持可交互；否则同步执行。
+拓扑图的渲染结果保存在 RenderCache 中，方案未变时重复导出不再重新渲染。
 """
 
 import os
-import base64
 import io
-import datetime
-from typing import List, Tuple, TYPE_CHECKING, Optional, Any # 导入 Any
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple, TYPE_CHECKING, Optional, Any # 导入 Any
 
 # 导入必要的 Qt 组件
 from PySide6.QtWidgets import QFileDialog, QMessageBox, QWidget
 
-# 导入 Matplotlib Figure 类型 (仅用于类型提示)
-try:
-    from matplotlib.figure import Figure
-except ImportError:
-    Figure = object # Fallback 类型
+from .export_writers import (write_connections_csv, write_connections_txt, write_html_report, write_connection_exports,
+                             EXPORT_FORMATS, EXPORT_SUFFIXES)
 
 # 类型提示：避免循环导入，仅在类型检查时导入
 if TYPE_CHECKING:
+    # Matplotlib Figure 仅用于类型提示，运行时不导入 (Matplotlib 在首次显示拓扑图时才加载)
+    from matplotlib.figure import Figure
     # 仅在类型检查时导入，避免运行时循环导入
     # 使用字符串形式进行前向引用，Pylance 通常能更好地处理
     from core.device import Device
+    from ui.background_tasks import BackgroundTaskRunner
     ConnectionType = Tuple['Device', str, 'Device', str, str]
 else:
     # 在运行时，定义一个足够使用的占位符类型或直接使用 Any
@@ -34,14 +40,222 @@ else:
     ConnectionType = Tuple[Any, str, Any, str, str]
 
 
+# 进度回调: (百分比 0-100, 说明)
+ProgressCallback = Callable[[int, str], None]
+TOPOLOGY_EXPORT_DPI = 300
+REPORT_IMAGE_DPI = 150 # 报告中的拓扑图使用稍低 DPI 以减小文件大小
+RENDER_CACHE_SIZE = 4 # 渲染缓存保留的结果数 (不同格式/DPI 各占一项)
+
+# HTML 报告的文件过滤器 -> (是否按设备分组, 拓扑图格式)
+HTML_REPORT_FILTERS: Dict[str, Tuple[bool, str]] = {
+    "HTML 文件 (*.html)": (False, 'png'),
+    "HTML 文件 - 按设备分组 (*.html)": (True, 'png'),
+    "HTML 文件 - SVG 矢量拓扑图 (*.html)": (False, 'svg'),
+    "HTML 文件 - SVG 矢量拓扑图，按设备分组 (*.html)": (True, 'svg'),
+}
+IMAGE_MIME_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+def _ignore_progress(percent: int, message: str):
+    """同步执行时使用的空进度回调。"""
+
+
+def copy_figure(figure: 'Figure') -> 'Figure':
+    """
+    复制 Figure (必须在 GUI 线程中调用)，得到与界面画布无关的独立副本，可在后台线程中渲染。
+
+    副本通过 pickle 生成，绑定的是不依赖 Qt 的基础画布，savefig() 时使用 Agg 渲染；
+    之后界面对原 Figure 的重绘和修改不会影响副本。
+    """
+    return pickle.loads(pickle.dumps(figure))
+
+
+class RenderCache:
+    """
+    拓扑图渲染结果缓存 (线程安全，最近最少使用淘汰)。
+
+    键由画布的 render_key() (版本号、节点位置哈希、布局等) 加上图像格式和 DPI 组成，
+    方案未变时重复导出 (拓扑图、HTML 报告) 直接复用上次渲染的图像数据。
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_SIZE):
+        """
+        初始化渲染缓存。
+
+        Args:
+            max_entries (int): 最多保留的渲染结果数。
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, bytes]' = OrderedDict()
+        self._lock = threading.Lock() # 结果由后台任务写入
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """返回缓存的图像数据，未命中时返回 None。"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: Tuple, data: bytes):
+        """保存图像数据，超出容量时淘汰最久未使用的结果。"""
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存。"""
+        with self._lock:
+            self._entries.clear()
+
+
+def prepare_render(figure: 'Figure', image_format: str, dpi: int, cache: Optional[RenderCache] = None,
+                   render_key: Optional[Tuple] = None, detach: bool = False) -> Callable[[], bytes]:
+    """
+    准备拓扑图的渲染 (必须在 GUI 线程中调用)，返回可在任意线程中调用、得到图像数据的函数。
+
+    缓存命中时返回的函数直接给出缓存的数据，不再复制或渲染 Figure；
+    否则返回的函数渲染 Figure (detach 为 True 时先用 copy_figure() 复制) 并将结果存入缓存。
+
+    Args:
+        figure ('Figure'): 要渲染的 Figure。
+        image_format (str): 图像格式 ('png', 'svg', 'pdf' 等 Matplotlib 支持的格式)。
+        dpi (int): 渲染 DPI。
+        cache (Optional[RenderCache]): 渲染缓存；为 None 时不缓存。
+        render_key (Optional[Tuple]): 描述 Figure 内容的键 (MplCanvas.render_key())；为 None 时不缓存。
+        detach (bool): 是否复制 Figure (渲染将在后台线程中进行时为 True)。
+
+    Returns:
+        Callable[[], bytes]: 返回图像数据的函数。
+    """
+    key = None if cache is None or render_key is None else (*render_key, image_format, dpi)
+    data = cache.get(key) if key is not None else None
+    if data is not None:
+        print(f"复用缓存的拓扑图渲染结果 ({image_format}, {dpi} DPI)。")
+        return lambda: data
+    if detach:
+        figure = copy_figure(figure)
+
+    def render() -> bytes:
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format=image_format, dpi=dpi, bbox_inches='tight')
+        rendered = buffer.getvalue()
+        if key is not None:
+            cache.put(key, rendered)
+        return rendered
+    return render
+
+
+def _image_format(filepath: str) -> str:
+    """按文件扩展名确定导出的图像格式，没有扩展名时为 PNG。"""
+    return os.path.splitext(filepath)[1][1:].lower() or 'png'
+
+
+def write_connections_file(progress: ProgressCallback, filepath: str, connections: List['ConnectionType'], as_csv: bool) -> str:
+    """
+    将连接列表写入 TXT 或 CSV 文件 (任务函数，可在后台线程中执行)。
+
+    Args:
+        progress (ProgressCallback): 进度回调。
+        filepath (str): 输出文件路径。
+        connections (List['ConnectionType']): 连接列表快照。
+        as_csv (bool): True 时写入 CSV，否则写入可读文本。
+
+    Returns:
+        str: 输出文件路径。
+    """
+    progress(10, f"正在写入 {len(connections)} 条连接...")
+    with open(filepath, 'w', encoding='utf-8', newline='') as f:
+        if as_csv:
+            write_connections_csv(f, connections)
+        else:
+            write_connections_txt(f, connections)
+    progress(100, "连接列表已写入")
+    print(f"连接列表成功导出到: {filepath}")
+    return filepath
+
+
+def write_connection_bundle_files(progress: ProgressCallback, base_path: str, devices: List['Device'],
+                                  connections: List['ConnectionType']) -> str:
+    """
+    一次遍历连接列表，写出 EXPORT_FORMATS 中的全部格式 (任务函数，可在后台线程中执行)。
+    文件名为 base_path 加各格式的后缀 (EXPORT_SUFFIXES)，配线表写入 base_path + "_patch_sheets" 目录。
+
+    Returns:
+        str: 输出文件的说明 (基础路径和文件数)。
+    """
+    outputs = {fmt: base_path + EXPORT_SUFFIXES[fmt] for fmt in EXPORT_FORMATS}
+    progress(0, f"正在导出 {len(connections)} 条连接 ({len(outputs)} 种格式)...")
+    written = write_connection_exports(outputs, devices, connections,
+                                       progress=lambda percent, message: progress(min(percent, 99), message))
+    progress(100, "全部格式已写入")
+    print(f"连接列表已导出为 {len(written)} 个文件: {base_path}.*")
+    return f"{base_path}.* ({len(written)} 个文件)"
+
+
+def render_topology_file(progress: ProgressCallback, filepath: str, render: Callable[[], bytes]) -> str:
+    """
+    将拓扑图写入图像文件 (任务函数，render 为 prepare_render() 的结果)。
+
+    Returns:
+        str: 输出文件路径。
+    """
+    progress(10, "正在渲染拓扑图...")
+    data = render()
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    progress(100, "拓扑图已写入")
+    print(f"拓扑图成功导出到: {filepath}")
+    return filepath
+
+
+def write_html_report_file(progress: ProgressCallback, filepath: str, render: Callable[[], bytes], connections: List['ConnectionType'],
+                           group_by_device: bool = False, image_format: str = 'png') -> str:
+    """
+    渲染拓扑图并以流的方式写入 HTML 报告 (任务函数，render 为 prepare_render() 的结果)。
+    拓扑图在另一个线程中渲染，同时写入连接表格 (见 export_writers.write_html_report)。
+
+    Returns:
+        str: 输出文件路径。
+    """
+    progress(0, f"正在生成报告 ({len(connections)} 条连接)...")
+    with open(filepath, 'w', encoding='utf-8') as f:
+        write_html_report(f, connections, render_image=lambda image: image.write(render()),
+                          image_mime=IMAGE_MIME_TYPES[image_format], group_by_device=group_by_device,
+                          progress=lambda percent, message: progress(min(percent, 99), message))
+    progress(100, "HTML 报告已写入")
+    print(f"HTML 报告成功导出到: {filepath}")
+    return filepath
+
+
+def _run_export(parent_window: 'QWidget', runner: Optional['BackgroundTaskRunner'], name: str,
+                success_message: str, func: Callable[..., str], *args):
+    """
+    执行导出任务: 提供 runner 时提交到后台 (完成/失败由 runner 的信号通知)，否则同步执行并弹出结果提示。
+    """
+    if runner is not None:
+        runner.start(name, func, *args)
+        return
+    try:
+        filepath = func(_ignore_progress, *args)
+        QMessageBox.information(parent_window, "成功", f"{success_message}:\n{filepath}")
+    except Exception as e:
+        QMessageBox.critical(parent_window, "导出失败", f"{name}失败:\n{e}")
+        print(f"{name}错误: {e}")
+
+
 # 注意：将类型提示改为字符串形式 'QWidget', 'Optional[Figure]', 'List[ConnectionType]'
-def export_connections_to_file(parent_window: 'QWidget', connections: List['ConnectionType']):
+def export_connections_to_file(parent_window: 'QWidget', connections: List['ConnectionType'],
+                               runner: Optional['BackgroundTaskRunner'] = None):
     """
     将连接列表导出为 TXT 或 CSV 文件。
 
     Args:
         parent_window ('QWidget'): 父窗口，用于 QFileDialog 和 QMessageBox。
-        connections (List['ConnectionType']): 要导出的连接列表。
+        connections (List['ConnectionType']): 要导出的连接列表 (后台导出时应为快照)。
+        runner (Optional['BackgroundTaskRunner']): 后台任务调度器；为 None 时同步导出。
     """
     if not connections:
         QMessageBox.warning(parent_window, "提示", "没有连接结果可导出。")
@@ -58,47 +272,55 @@ def export_connections_to_file(parent_window: 'QWidget', connections: List['Conn
         print("用户取消导出连接列表。")
         return
 
-    try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            is_csv = "csv" in selected_filter.lower()
-            if is_csv:
-                # 写入 CSV 头部
-                f.write("序号,设备1,端口1,设备2,端口2,连接类型\n")
-            else:
-                 # 写入 TXT 头部 (可选)
-                 f.write("MediorNet 连接列表\n")
-                 f.write("=" * 30 + "\n")
-
-            # 写入连接数据
-            for i, conn in enumerate(connections):
-                # 从元组中解包设备对象和端口信息
-                # 注意：conn[0] 和 conn[2] 是 Device 对象 (或运行时为 Any)
-                dev1, port1, dev2, port2, conn_type = conn
-                # 安全地访问 name 属性，以防运行时类型为 Any
-                dev1_name = getattr(dev1, 'name', 'Unknown Device')
-                dev2_name = getattr(dev2, 'name', 'Unknown Device')
-                if is_csv:
-                    # CSV 格式，使用逗号分隔
-                    f.write(f"{i+1},{dev1_name},{port1},{dev2_name},{port2},{conn_type}\n")
-                else:
-                    # TXT 格式
-                    f.write(f"{i+1}. {dev1_name} [{port1}] <-> {dev2_name} [{port2}] ({conn_type})\n")
-
-        QMessageBox.information(parent_window, "成功", f"连接列表已导出到:\n{filepath}")
-        print(f"连接列表成功导出到: {filepath}")
+    _run_export(parent_window, runner, "导出连接列表", "连接列表已导出到",
+                write_connections_file, filepath, connections, "csv" in selected_filter.lower())
 
-    except Exception as e:
-        QMessageBox.critical(parent_window, "导出失败", f"无法导出连接列表:\n{e}")
-        print(f"导出连接列表错误: {e}")
+
+def export_connection_bundle(parent_window: 'QWidget', devices: List['Device'], connections: List['ConnectionType'],
+                             runner: Optional['BackgroundTaskRunner'] = None):
+    """
+    将连接列表一次导出为全部格式: CSV、TXT、JSON Lines、GraphML 和每个设备的配线表 CSV。
+
+    Args:
+        parent_window ('QWidget'): 父窗口。
+        devices (List['Device']): 设备列表 (后台导出时应为快照)。
+        connections (List['ConnectionType']): 连接列表 (后台导出时应为快照)。
+        runner (Optional['BackgroundTaskRunner']): 后台任务调度器；为 None 时同步导出。
+    """
+    if not connections:
+        QMessageBox.warning(parent_window, "提示", "没有连接结果可导出。")
+        return
+
+    filepath, _ = QFileDialog.getSaveFileName(
+        parent_window,
+        "导出全部格式 (输入基础文件名)",
+        "",
+        "所有文件 (*)"
+    )
+
+    if not filepath:
+        print("用户取消导出全部格式。")
+        return
+
+    base_path, extension = os.path.splitext(filepath)
+    if extension.lower() not in EXPORT_SUFFIXES.values(): # 保留 "job.v2" 之类的名称，只去掉导出格式本身的扩展名
+        base_path = filepath
+    _run_export(parent_window, runner, "导出全部格式", "连接列表已导出", write_connection_bundle_files,
+                base_path, devices, connections)
 
 
-def export_topology_to_file(parent_window: 'QWidget', figure: Optional['Figure']):
+def export_topology_to_file(parent_window: 'QWidget', figure: Optional['Figure'],
+                            runner: Optional['BackgroundTaskRunner'] = None,
+                            cache: Optional[RenderCache] = None, render_key: Optional[Tuple] = None):
     """
     将 Matplotlib 绘制的拓扑图导出为图像文件 (PNG, PDF, SVG)。
 
     Args:
         parent_window ('QWidget'): 父窗口。
-        figure (Optional['Figure']): Matplotlib 的 Figure 对象。
+        figure (Optional['Figure']): Matplotlib 的 Figure 对象 (后台导出时会先复制)。
+        runner (Optional['BackgroundTaskRunner']): 后台任务调度器；为 None 时同步导出。
+        cache (Optional[RenderCache]): 渲染缓存，方案未变时复用上次的渲染结果。
+        render_key (Optional[Tuple]): 描述 Figure 内容的键 (MplCanvas.render_key())。
     """
     if not figure:
         QMessageBox.warning(parent_window, "提示", "没有拓扑图可导出。")
@@ -115,165 +337,44 @@ def export_topology_to_file(parent_window: 'QWidget', figure: Optional['Figure']
         print("用户取消导出拓扑图。")
         return
 
-    try:
-        # 使用 Figure 对象保存图像
-        figure.savefig(filepath, dpi=300, bbox_inches='tight')
-        QMessageBox.information(parent_window, "成功", f"拓扑图已导出到:\n{filepath}")
-        print(f"拓扑图成功导出到: {filepath}")
-
-    except Exception as e:
-        QMessageBox.critical(parent_window, "导出失败", f"无法导出拓扑图:\n{e}")
-        print(f"导出拓扑图错误: {e}")
+    render = prepare_render(figure, _image_format(filepath), TOPOLOGY_EXPORT_DPI, cache, render_key, detach=runner is not None)
+    _run_export(parent_window, runner, "导出拓扑图", "拓扑图已导出到", render_topology_file, filepath, render)
 
 
-def export_report_to_html(parent_window: 'QWidget', figure: Optional['Figure'], connections: List['ConnectionType']):
+def export_report_to_html(parent_window: 'QWidget', figure: Optional['Figure'], connections: List['ConnectionType'],
+                          runner: Optional['BackgroundTaskRunner'] = None,
+                          cache: Optional[RenderCache] = None, render_key: Optional[Tuple] = None):
     """
     导出包含拓扑图和连接列表的 HTML 报告。
 
     Args:
         parent_window ('QWidget'): 父窗口。
-        figure (Optional['Figure']): Matplotlib 的 Figure 对象。
-        connections (List['ConnectionType']): 连接列表。
+        figure (Optional['Figure']): Matplotlib 的 Figure 对象 (后台导出时会先复制)。
+        connections (List['ConnectionType']): 连接列表 (后台导出时应为快照)。
+        runner (Optional['BackgroundTaskRunner']): 后台任务调度器；为 None 时同步导出。
+        cache (Optional[RenderCache]): 渲染缓存，方案未变时复用上次的渲染结果。
+        render_key (Optional[Tuple]): 描述 Figure 内容的键 (MplCanvas.render_key())。
+
+    连接较多时报告中的连接列表会分页。在文件对话框中可选择按设备分组列出连接，
+    以及以 SVG 矢量图 (线条图更小、缩放清晰) 代替 PNG 嵌入拓扑图 (见 HTML_REPORT_FILTERS)。
     """
     if not figure:
          QMessageBox.warning(parent_window, "无法导出", "缺少拓扑图数据。")
          return
     # 注意：这里允许没有连接但有图的情况导出（只包含图）
 
-    filepath, _ = QFileDialog.getSaveFileName(
+    filepath, selected_filter = QFileDialog.getSaveFileName(
         parent_window,
         "导出 HTML 报告",
         "",
-        "HTML 文件 (*.html);;所有文件 (*)"
+        ";;".join([*HTML_REPORT_FILTERS, "所有文件 (*)"])
     )
 
     if not filepath:
         print("用户取消导出 HTML 报告。")
         return
 
-    try:
-        # 1. 将拓扑图保存到内存缓冲区并编码为 Base64
-        buffer = io.BytesIO()
-        figure.savefig(buffer, format='png', dpi=150, bbox_inches='tight') # 使用稍低 DPI 以减小文件大小
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        img_data_uri = f"data:image/png;base64,{image_base64}"
-        buffer.close()
-
-        # 2. 构建连接列表的 HTML 表格
-        connections_table_html = """
-        <div class="mt-8">
-          <h2 class="text-lg font-semibold mb-3 text-gray-700">连接列表</h2>
-          <div class="overflow-x-auto bg-white rounded-lg shadow">
-            <table class="min-w-full leading-normal">
-              <thead>
-                <tr>
-                  <th class="px-5 py-3 border-b-2 border-gray-200 bg-gray-100 text-left text-xs font-semibold text-gray-600 uppercase tracking-wider">序号</th>
-                  <th class="px-5 py-3 border-b-2 border-gray-200 bg-gray-100 text-left text-xs font-semibold text-gray-600 uppercase tracking-wider">设备 1</th>
-                  <th class="px-5 py-3 border-b-2 border-gray-200 bg-gray-100 text-left text-xs font-semibold text-gray-600 uppercase tracking-wider">端口 1</th>
-                  <th class="px-5 py-3 border-b-2 border-gray-200 bg-gray-100 text-left text-xs font-semibold text-gray-600 uppercase tracking-wider">设备 2</th>
-                  <th class="px-5 py-3 border-b-2 border-gray-200 bg-gray-100 text-left text-xs font-semibold text-gray-600 uppercase tracking-wider">端口 2</th>
-                  <th class="px-5 py-3 border-b-2 border-gray-200 bg-gray-100 text-left text-xs font-semibold text-gray-600 uppercase tracking-wider">类型</th>
-                </tr>
-              </thead>
-              <tbody>
-        """
-        if connections:
-            for i, conn in enumerate(connections):
-                dev1, port1, dev2, port2, conn_type = conn
-                # 安全地访问 name 和 type 属性
-                dev1_name = getattr(dev1, 'name', 'N/A')
-                dev1_type = getattr(dev1, 'type', 'N/A')
-                dev2_name = getattr(dev2, 'name', 'N/A')
-                dev2_type = getattr(dev2, 'type', 'N/A')
-                # 添加斑马纹背景
-                bg_class = "bg-white" if i % 2 == 0 else "bg-gray-50"
-                connections_table_html += f"""
-                        <tr class="{bg_class}">
-                          <td class="px-5 py-4 border-b border-gray-200 text-sm">{i+1}</td>
-                          <td class="px-5 py-4 border-b border-gray-200 text-sm">{dev1_name} ({dev1_type})</td>
-                          <td class="px-5 py-4 border-b border-gray-200 text-sm">{port1}</td>
-                          <td class="px-5 py-4 border-b border-gray-200 text-sm">{dev2_name} ({dev2_type})</td>
-                          <td class="px-5 py-4 border-b border-gray-200 text-sm">{port2}</td>
-                          <td class="px-5 py-4 border-b border-gray-200 text-sm">{conn_type}</td>
-                        </tr>
-                """
-        else:
-            connections_table_html += """
-                        <tr>
-                          <td colspan="6" class="px-5 py-5 border-b border-gray-200 bg-white text-center text-sm text-gray-500">无连接</td>
-                        </tr>
-            """
-        connections_table_html += """
-              </tbody>
-            </table>
-          </div>
-        </div>
-        """
-
-        # 3. 构建完整的 HTML 内容
-        # !! Fix: Escape curly braces in the HTML comment !!
-        html_content = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MediorNet 连接报告</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <style>
-        /* 基础字体和打印样式优化 */
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";
-        }}
-        @media print {{
-            body {{
-                -webkit-print-color-adjust: exact; /* Chrome, Safari */
-                print-color-adjust: exact; /* Firefox */
-            }}
-            /* 确保背景色和边框在打印时可见 */
-            .bg-gray-100 {{ background-color: #f7fafc !important; }}
-            .bg-gray-50 {{ background-color: #f9fafb !important; }}
-            .border-b-2 {{ border-bottom-width: 2px !important; }}
-            .border-gray-200 {{ border-color: #edf2f7 !important; }}
-            .shadow, .shadow-xl, .shadow-inner {{ box-shadow: none !important; }}
-            /* 可以考虑移除页面边距以更好地利用纸张 */
-            .container {{ margin: 0 !important; padding: 10px !important; max-width: 100% !important; }}
-            h1, h2 {{ margin-bottom: 1rem !important; }}
-            table {{ width: 100% !important; }}
-            img {{ max-width: 90% !important; display: block; margin-left: auto; margin-right: auto; }} /* 居中并缩小图像以防溢出 */
-        }}
-    </style>
-</head>
-<body class="bg-gray-100">
-    <div class="container mx-auto p-6 md:p-10 bg-white rounded-lg shadow-xl my-10 max-w-6xl">
-        <h1 class="text-2xl font-bold text-center mb-8 text-gray-700">MediorNet TDM 连接报告</h1>
-
-        <div class="mb-8">
-            <h2 class="text-lg font-semibold mb-3 text-gray-600">网络连接拓扑图</h2>
-            <div class="flex justify-center p-4 border border-gray-200 rounded-lg bg-gray-50 shadow-inner">
-                <img src="{img_data_uri}" alt="网络拓扑图" style="max-width: 100%; height: auto;" class="rounded">
-            </div>
-        </div>
-
-        {connections_table_html}
-
-        <div class="text-center text-xs text-gray-400 mt-10 pt-4 border-t border-gray-200">
-            报告生成时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        </div>
-    </div>
-</body>
-</html>
-        """ # 确保 f-string 的结束 """ 在正确的位置
-
-        # 4. 写入文件
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-        QMessageBox.information(parent_window, "导出成功", f"HTML 报告已成功导出到:\n{filepath}")
-        print(f"HTML 报告成功导出到: {filepath}")
-
-    except Exception as e:
-        QMessageBox.critical(parent_window, "导出失败", f"导出 HTML 报告时发生错误:\n{e}")
-        print(f"导出 HTML 报告错误: {e}")
-
+    group_by_device, image_format = HTML_REPORT_FILTERS.get(selected_filter, (False, 'png'))
+    render = prepare_render(figure, image_format, REPORT_IMAGE_DPI, cache, render_key, detach=runner is not None)
+    _run_export(parent_window, runner, "导出 HTML 报告", "HTML 报告已成功导出到", write_html_report_file,
+                filepath, render, connections, group_by_device, image_format)
@@ -0,0 +1,564 @@
+# -*- coding: utf-8 -*-
+"""
+utils/export_writers.py
+
+将连接列表和项目摘要写入文本流 (CSV、TXT、JSON Lines、GraphML、文本报告和 HTML 报告)，
+以及一次遍历连接列表同时写出多种格式的导出管线 (write_connection_exports)。
+本模块不依赖 Qt 或 Matplotlib，图形界面的导出对话框和命令行工具共用这些写入函数。
+"""
+
+import base64
+import contextlib
+import csv
+import datetime
+import html
+import json
+import os
+import re
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.device import Device
+    ConnectionType = Tuple['Device', str, 'Device', str, str]
+else:
+    ConnectionType = Tuple[Any, str, Any, str, str]
+
+CSV_HEADER = ["序号", "设备1", "端口1", "设备2", "端口2", "连接类型"]
+
+
+EXPORT_FORMATS = ('csv', 'txt', 'jsonl', 'graphml', 'patch') # write_connection_exports 支持的格式
+EXPORT_SUFFIXES = {'csv': '.csv', 'txt': '.txt', 'jsonl': '.jsonl', 'graphml': '.graphml',
+                   'patch': '_patch_sheets'} # 'patch' 为目录，每个设备一个配线表 CSV
+EXPORT_BATCH_ROWS = 2000           # 导出管线每批分发给各输出端的连接数
+EXPORT_BUFFER_SIZE = 1 << 20       # 导出文件的写缓冲区大小 (字节)
+PATCH_SHEET_HEADER = ["序号", "本端设备", "本端端口", "对端设备", "对端端口", "连接类型"]
+
+
+class ConnectionSink(ABC):
+    """
+    连接列表导出管线的输出端。
+
+    管线按顺序将连接分批交给 write_batch()，全部写完后调用 close()。
+    每种格式各自负责表头、行格式和结尾，互不影响，因此一次遍历可以同时写出多种格式。
+    """
+
+    @abstractmethod
+    def write_batch(self, first_index: int, batch: List['ConnectionType']):
+        """
+        写入一批连接 (子类必须实现，否则创建输出端时即报错)。
+
+        Args:
+            first_index (int): 这批连接中第一条的序号 (从 1 开始)。
+            batch (List['ConnectionType']): 连接。
+        """
+
+    def close(self):
+        """写入结尾 (不关闭流，流由调用方管理)。"""
+
+
+class CsvConnectionSink(ConnectionSink):
+    """CSV 连接列表 (CSV_HEADER 各列)。"""
+
+    def __init__(self, stream: IO[str]):
+        self._writer = csv.writer(stream, lineterminator="\n")
+        self._writer.writerow(CSV_HEADER)
+
+    def write_batch(self, first_index: int, batch: List['ConnectionType']):
+        self._writer.writerows([i, getattr(dev1, 'name', 'Unknown Device'), port1,
+                                getattr(dev2, 'name', 'Unknown Device'), port2, conn_type]
+                               for i, (dev1, port1, dev2, port2, conn_type) in enumerate(batch, first_index))
+
+
+class TxtConnectionSink(ConnectionSink):
+    """可读文本格式的连接列表。"""
+
+    def __init__(self, stream: IO[str]):
+        self._stream = stream
+        stream.write("MediorNet 连接列表\n")
+        stream.write("=" * 30 + "\n")
+
+    def write_batch(self, first_index: int, batch: List['ConnectionType']):
+        self._stream.writelines(f"{i}. {getattr(dev1, 'name', 'Unknown Device')} [{port1}] <-> "
+                                f"{getattr(dev2, 'name', 'Unknown Device')} [{port2}] ({conn_type})\n"
+                                for i, (dev1, port1, dev2, port2, conn_type) in enumerate(batch, first_index))
+
+
+class JsonLinesConnectionSink(ConnectionSink):
+    """JSON Lines 格式：每行一个连接对象，包含两端设备的 ID，便于其他工具按 ID 关联。"""
+
+    def __init__(self, stream: IO[str]):
+        self._stream = stream
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode # json.dumps 带参数时每次调用都会新建编码器
+
+    def write_batch(self, first_index: int, batch: List['ConnectionType']):
+        self._stream.writelines(self._encode({'index': i,
+                                            'dev1_id': getattr(dev1, 'id', None), 'dev1': getattr(dev1, 'name', None), 'port1': port1,
+                                            'dev2_id': getattr(dev2, 'id', None), 'dev2': getattr(dev2, 'name', None), 'port2': port2,
+                                            'type': conn_type}) + "\n"
+                                for i, (dev1, port1, dev2, port2, conn_type) in enumerate(batch, first_index))
+
+
+class GraphMLConnectionSink(ConnectionSink):
+    """
+    GraphML 格式：设备为节点 (属性 name、type)，每条连接为一条边 (属性 port1、port2、type)，
+    两台设备之间的多条连接保留为多重边。可直接导入 yEd、Gephi、NetworkX 等工具。
+    """
+
+    def __init__(self, stream: IO[str], devices: List['Device']):
+        self._stream = stream
+        stream.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                     '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                     '  <key id="name" for="node" attr.name="name" attr.type="string"/>\n'
+                     '  <key id="type" for="node" attr.name="type" attr.type="string"/>\n'
+                     '  <key id="port1" for="edge" attr.name="port1" attr.type="string"/>\n'
+                     '  <key id="port2" for="edge" attr.name="port2" attr.type="string"/>\n'
+                     '  <key id="conn_type" for="edge" attr.name="type" attr.type="string"/>\n'
+                     '  <graph id="topology" edgedefault="undirected">\n')
+        stream.writelines(f'    <node id="d{dev.id}"><data key="name">{html.escape(dev.name)}</data>'
+                          f'<data key="type">{html.escape(dev.type)}</data></node>\n' for dev in devices)
+
+    def write_batch(self, first_index: int, batch: List['ConnectionType']):
+        self._stream.writelines(f'    <edge id="e{i}" source="d{dev1.id}" target="d{dev2.id}">'
+                                f'<data key="port1">{html.escape(port1)}</data><data key="port2">{html.escape(port2)}</data>'
+                                f'<data key="conn_type">{html.escape(conn_type)}</data></edge>\n'
+                                for i, (dev1, port1, dev2, port2, conn_type) in enumerate(batch, first_index))
+
+    def close(self):
+        self._stream.write('  </graph>\n</graphml>\n')
+
+
+class PatchSheetSink(ConnectionSink):
+    """
+    每个设备一个配线表 CSV (PATCH_SHEET_HEADER 各列)，列出该设备的全部连接，每条连接在两端设备的表中各出现一次。
+
+    分批写入时只记录每个设备的连接 (引用原连接，不生成字符串)，close() 时逐个设备写出文件，
+    避免同时打开大量文件。
+    """
+
+    def __init__(self, directory: str, devices: List['Device']):
+        self.directory = directory
+        self._rows: Dict[int, List[Tuple[int, 'ConnectionType']]] = {dev.id: [] for dev in devices}
+        self._devices = {dev.id: dev for dev in devices}
+        self.files: List[str] = []
+
+    def write_batch(self, first_index: int, batch: List['ConnectionType']):
+        for i, conn in enumerate(batch, first_index):
+            for dev in (conn[0], conn[2]):
+                if dev.id not in self._rows:
+                    self._devices[dev.id] = dev
+                    self._rows[dev.id] = []
+                self._rows[dev.id].append((i, conn))
+
+    def close(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for dev_id, rows in self._rows.items():
+            dev = self._devices[dev_id]
+            filepath = os.path.join(self.directory, f"{_safe_filename(dev.name)}_{dev_id}.csv")
+            with open(filepath, 'w', encoding='utf-8', newline='') as f: # 配线表较小，使用默认缓冲区
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(PATCH_SHEET_HEADER)
+                writer.writerows([i, dev.name, port1, dev2.name, port2, conn_type] if dev1.id == dev_id
+                                 else [i, dev.name, port2, dev1.name, port1, conn_type]
+                                 for i, (dev1, port1, dev2, port2, conn_type) in rows)
+            self.files.append(filepath)
+
+
+def _safe_filename(name: str) -> str:
+    """将设备名称转换为可用作文件名的字符串。"""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', name).strip('._') or 'device'
+
+
+def run_export_pipeline(connections: List['ConnectionType'], sinks: List[ConnectionSink],
+                        progress: Optional[Callable[[int, str], None]] = None):
+    """
+    遍历一次连接列表，将每批连接依次交给所有输出端，最后调用各输出端的 close()。
+
+    Args:
+        connections (List['ConnectionType']): 连接列表。
+        sinks (List[ConnectionSink]): 输出端。
+        progress (Optional[Callable[[int, str], None]]): 进度回调 (百分比, 说明)。
+    """
+    total = len(connections)
+    for start in range(0, total, EXPORT_BATCH_ROWS):
+        batch = connections[start:start + EXPORT_BATCH_ROWS]
+        for sink in sinks:
+            sink.write_batch(start + 1, batch)
+        if progress:
+            done = start + len(batch)
+            progress(done * 100 // total, f"已导出 {done}/{total} 条连接")
+    for sink in sinks:
+        sink.close()
+
+
+def write_connection_exports(outputs: Dict[str, str], devices: List['Device'], connections: List['ConnectionType'],
+                             progress: Optional[Callable[[int, str], None]] = None) -> List[str]:
+    """
+    一次遍历连接列表，同时写出多种格式的文件 (文件使用 EXPORT_BUFFER_SIZE 的写缓冲区)。
+
+    Args:
+        outputs (Dict[str, str]): 格式 (EXPORT_FORMATS 之一) -> 输出路径；'patch' 的路径为目录。
+        devices (List['Device']): 设备列表 (GraphML 节点和配线表使用，没有连接的设备也会列出)。
+        connections (List['ConnectionType']): 连接列表。
+        progress (Optional[Callable[[int, str], None]]): 进度回调 (百分比, 说明)。
+
+    Returns:
+        List[str]: 写出的文件路径 (配线表目录展开为其中的各个文件)。
+
+    Raises:
+        ValueError: 格式不受支持。
+        OSError: 文件无法写入。
+    """
+    unknown = [fmt for fmt in outputs if fmt not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"不支持的导出格式: {', '.join(unknown)}")
+    written: List[str] = []
+    with contextlib.ExitStack() as stack:
+        sinks: List[ConnectionSink] = []
+        patch_sink = None
+        for fmt, path in outputs.items():
+            if fmt == 'patch':
+                patch_sink = PatchSheetSink(path, devices)
+                sinks.append(patch_sink)
+                continue
+            stream = stack.enter_context(open(path, 'w', encoding='utf-8', newline='', buffering=EXPORT_BUFFER_SIZE))
+            if fmt == 'csv':
+                sinks.append(CsvConnectionSink(stream))
+            elif fmt == 'txt':
+                sinks.append(TxtConnectionSink(stream))
+            elif fmt == 'jsonl':
+                sinks.append(JsonLinesConnectionSink(stream))
+            else:
+                sinks.append(GraphMLConnectionSink(stream, devices))
+            written.append(path)
+        run_export_pipeline(connections, sinks, progress)
+    if patch_sink is not None:
+        written.extend(patch_sink.files)
+    return written
+
+
+def write_connections_csv(stream: IO[str], connections: List['ConnectionType']):
+    """
+    以 CSV 格式写入连接列表。
+
+    Args:
+        stream (IO[str]): 以文本模式打开的输出流 (打开文件时应指定 newline='')。
+        connections (List['ConnectionType']): 连接列表。
+    """
+    run_export_pipeline(connections, [CsvConnectionSink(stream)])
+
+
+def write_connections_txt(stream: IO[str], connections: List['ConnectionType']):
+    """
+    以可读文本格式写入连接列表。
+
+    Args:
+        stream (IO[str]): 以文本模式打开的输出流。
+        connections (List['ConnectionType']): 连接列表。
+    """
+    run_export_pipeline(connections, [TxtConnectionSink(stream)])
+
+
+def write_connections_jsonl(stream: IO[str], connections: List['ConnectionType']):
+    """
+    以 JSON Lines 格式写入连接列表 (每行一个连接)。
+
+    Args:
+        stream (IO[str]): 以文本模式打开的输出流。
+        connections (List['ConnectionType']): 连接列表。
+    """
+    run_export_pipeline(connections, [JsonLinesConnectionSink(stream)])
+
+
+def write_connections_graphml(stream: IO[str], devices: List['Device'], connections: List['ConnectionType']):
+    """
+    以 GraphML 格式写入设备和连接。
+
+    Args:
+        stream (IO[str]): 以文本模式打开的输出流。
+        devices (List['Device']): 设备列表。
+        connections (List['ConnectionType']): 连接列表。
+    """
+    run_export_pipeline(connections, [GraphMLConnectionSink(stream, devices)])
+
+
+def write_text_report(stream: IO[str], devices: List['Device'], connections: List['ConnectionType'],
+                      port_totals: Dict[str, int]):
+    """
+    写入文本格式的项目报告：端口总数、每个设备的端口占用情况和完整连接列表。
+
+    Args:
+        stream (IO[str]): 以文本模式打开的输出流。
+        devices (List['Device']): 设备列表。
+        connections (List['ConnectionType']): 连接列表。
+        port_totals (Dict[str, int]): 各类端口总数 (NetworkManager.calculate_port_totals() 的结果)。
+    """
+    stream.write("MediorNet TDM 连接报告\n")
+    stream.write(f"生成时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    stream.write("=" * 30 + "\n\n")
+    stream.write(f"设备数: {len(devices)}, 连接数: {len(connections)}\n")
+    stream.write(f"端口总计: MPO: {port_totals.get('mpo', 0)}, LC: {port_totals.get('lc', 0)}, "
+                 f"SFP+: {port_totals.get('sfp', 0)}\n\n")
+
+    stream.write("设备端口占用\n")
+    stream.write("-" * 30 + "\n")
+    for dev in devices:
+        total_ports = len(dev.get_all_possible_ports())
+        free_ports = len(dev.get_all_available_ports())
+        stream.write(f"{dev.name} ({dev.type}): 已用 {total_ports - free_ports}/{total_ports} 个端口\n")
+    stream.write("\n")
+
+    write_connections_txt(stream, connections)
+
+
+REPORT_PAGE_SIZE = 1000            # HTML 报告分页时每页的连接数
+REPORT_CHUNK_ROWS = 500            # HTML 报告每次写入流的表格行数
+REPORT_IMAGE_CHUNK = 3 * 16384     # 拓扑图 Base64 分块编码的字节数 (3 的倍数，各块的编码结果可以直接拼接)
+
+_REPORT_HEAD = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>MediorNet 连接报告</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <style>
+        /* 基础字体和打印样式优化 */
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";
+        }
+        @media print {
+            body {
+                -webkit-print-color-adjust: exact; /* Chrome, Safari */
+                print-color-adjust: exact; /* Firefox */
+            }
+            /* 确保背景色和边框在打印时可见 */
+            .bg-gray-100 { background-color: #f7fafc !important; }
+            .bg-gray-50 { background-color: #f9fafb !important; }
+            .border-b-2 { border-bottom-width: 2px !important; }
+            .border-gray-200 { border-color: #edf2f7 !important; }
+            .shadow, .shadow-xl, .shadow-inner { box-shadow: none !important; }
+            /* 可以考虑移除页面边距以更好地利用纸张 */
+            .container { margin: 0 !important; padding: 10px !important; max-width: 100% !important; }
+            h1, h2 { margin-bottom: 1rem !important; }
+            table { width: 100% !important; }
+            img { max-width: 90% !important; display: block; margin-left: auto; margin-right: auto; } /* 居中并缩小图像以防溢出 */
+            .report-nav { display: none; }
+            .report-page + .report-page { break-before: page; } /* 分页或分组的表格各自从新的一页开始打印 */
+        }
+    </style>
+</head>
+<body class="bg-gray-100">
+    <div class="container mx-auto p-6 md:p-10 bg-white rounded-lg shadow-xl my-10 max-w-6xl">
+        <h1 class="text-2xl font-bold text-center mb-8 text-gray-700">MediorNet TDM 连接报告</h1>
+"""
+
+_REPORT_IMAGE_HEAD = """
+        <div class="mb-8">
+            <h2 class="text-lg font-semibold mb-3 text-gray-600">网络连接拓扑图</h2>
+            <div class="flex justify-center p-4 border border-gray-200 rounded-lg bg-gray-50 shadow-inner">
+                <img src="data:{mime};base64,"""
+
+_REPORT_IMAGE_TAIL = """" alt="网络拓扑图" style="max-width: 100%; height: auto;" class="rounded">
+            </div>
+        </div>
+"""
+
+_REPORT_TH = '<th class="px-5 py-3 border-b-2 border-gray-200 bg-gray-100 text-left text-xs font-semibold text-gray-600 uppercase tracking-wider">{}</th>'
+_REPORT_TD = '<td class="px-5 py-4 border-b border-gray-200 text-sm">{}</td>'
+_REPORT_COLUMNS = ("序号", "设备 1", "端口 1", "设备 2", "端口 2", "类型")
+_REPORT_DEVICE_COLUMNS = ("序号", "本端端口", "对端设备", "对端端口", "类型")
+
+
+def _device_label(dev: Any) -> str:
+    """报告中显示的设备名称 (已转义)，格式为 "名称 (类型)"。"""
+    return html.escape(f"{getattr(dev, 'name', 'N/A')} ({getattr(dev, 'type', 'N/A')})")
+
+
+def _write_table_start(stream: IO[str], anchor: str, title: str, columns: Tuple[str, ...]):
+    """写入一个表格区块的开头 (标题和表头)。"""
+    header = "".join(_REPORT_TH.format(column) for column in columns)
+    stream.write(f"""
+    <div id="{anchor}" class="report-page mt-8">
+      <h2 class="text-lg font-semibold mb-3 text-gray-700">{title}</h2>
+      <div class="overflow-x-auto bg-white rounded-lg shadow">
+        <table class="min-w-full leading-normal">
+          <thead>
+            <tr>{header}</tr>
+          </thead>
+          <tbody>
+""")
+
+
+def _write_table_end(stream: IO[str]):
+    """写入表格区块的结尾。"""
+    stream.write("""          </tbody>
+        </table>
+      </div>
+    </div>
+""")
+
+
+def _write_table_rows(stream: IO[str], rows: List[Tuple[str, ...]], first_index: int):
+    """
+    写入一批表格行 (单元格内容应已转义)，整批拼接后一次写入流。
+
+    Args:
+        stream (IO[str]): 输出流。
+        rows (List[Tuple[str, ...]]): 行数据，不含序号列。
+        first_index (int): 第一行的序号 (从 1 开始，同时决定斑马纹)。
+    """
+    parts = []
+    for i, row in enumerate(rows, first_index):
+        bg_class = "bg-white" if i % 2 == 1 else "bg-gray-50" # 斑马纹背景
+        cells = "".join(_REPORT_TD.format(cell) for cell in (i, *row))
+        parts.append(f'            <tr class="{bg_class}">{cells}</tr>\n')
+    stream.write("".join(parts))
+
+
+def _write_nav(stream: IO[str], links: List[Tuple[str, str]]):
+    """写入分页或分组的导航链接 (打印时隐藏)。"""
+    items = " ".join(f'<a class="text-blue-600 hover:underline mr-3" href="#{anchor}">{label}</a>'
+                     for anchor, label in links)
+    stream.write(f'    <div class="report-nav mt-8 text-sm leading-7">{items}</div>\n')
+
+
+def write_report_tables(stream: IO[str], connections: List['ConnectionType'],
+                        group_by_device: bool = False, page_size: Optional[int] = REPORT_PAGE_SIZE,
+                        progress: Optional[Callable[[int, str], None]] = None):
+    """
+    写入 HTML 报告的连接表格部分，每 REPORT_CHUNK_ROWS 行写入一次，不在内存中拼接整张表。
+
+    Args:
+        stream (IO[str]): 输出流。
+        connections (List['ConnectionType']): 连接列表。
+        group_by_device (bool): 为 True 时按设备分组，每个设备一张表，列出该设备的全部连接
+            (每条连接在两端设备的表中各出现一次)。
+        page_size (Optional[int]): 不分组时每页的连接数，连接数超过此值时拆分为多张表并生成页码导航；
+            为 None 或 0 时不分页。
+        progress (Optional[Callable[[int, str], None]]): 进度回调 (百分比, 说明)。
+    """
+    if not connections:
+        _write_table_start(stream, "connections", "连接列表", _REPORT_COLUMNS)
+        stream.write('            <tr><td colspan="6" class="px-5 py-5 border-b border-gray-200 bg-white '
+                     'text-center text-sm text-gray-500">无连接</td></tr>\n')
+        _write_table_end(stream)
+        return
+
+    total = len(connections) * 2 if group_by_device else len(connections)
+    written = 0
+
+    def report_progress(count: int):
+        nonlocal written
+        written += count
+        if progress:
+            progress(written * 100 // total, f"已写入 {written}/{total} 行")
+
+    if group_by_device:
+        # 设备按首次出现的顺序排列，每个设备只记录连接的下标，不复制连接数据
+        groups: Dict[int, Tuple[Any, List[int]]] = {}
+        for index, (dev1, _, dev2, _, _) in enumerate(connections):
+            for dev in (dev1, dev2):
+                groups.setdefault(id(dev), (dev, []))[1].append(index)
+        _write_nav(stream, [(f"device-{n}", _device_label(dev)) for n, (dev, _) in enumerate(groups.values())])
+        for n, (dev, group) in enumerate(groups.values()):
+            _write_table_start(stream, f"device-{n}", f"{_device_label(dev)} — {len(group)} 条连接", _REPORT_DEVICE_COLUMNS)
+            for start in range(0, len(group), REPORT_CHUNK_ROWS):
+                rows = []
+                for index in group[start:start + REPORT_CHUNK_ROWS]:
+                    dev1, port1, dev2, port2, conn_type = connections[index]
+                    if dev1 is not dev: # 本设备是连接的第二端
+                        dev2, port1, port2 = dev1, port2, port1
+                    rows.append((html.escape(port1), _device_label(dev2), html.escape(port2), html.escape(conn_type)))
+                _write_table_rows(stream, rows, start + 1)
+                report_progress(len(rows))
+            _write_table_end(stream)
+        return
+
+    page_size = page_size or len(connections)
+    page_count = (len(connections) + page_size - 1) // page_size
+    if page_count > 1:
+        _write_nav(stream, [(f"page-{page + 1}", f"第 {page + 1} 页") for page in range(page_count)])
+    for page in range(page_count):
+        page_start = page * page_size
+        page_end = min(page_start + page_size, len(connections))
+        if page_count > 1:
+            _write_table_start(stream, f"page-{page + 1}", f"连接列表 (第 {page + 1}/{page_count} 页，"
+                               f"第 {page_start + 1}-{page_end} 条)", _REPORT_COLUMNS)
+        else:
+            _write_table_start(stream, "connections", "连接列表", _REPORT_COLUMNS)
+        for start in range(page_start, page_end, REPORT_CHUNK_ROWS):
+            rows = [(_device_label(dev1), html.escape(port1), _device_label(dev2), html.escape(port2), html.escape(conn_type))
+                    for dev1, port1, dev2, port2, conn_type in connections[start:min(start + REPORT_CHUNK_ROWS, page_end)]]
+            _write_table_rows(stream, rows, start + 1)
+            report_progress(len(rows))
+        _write_table_end(stream)
+
+
+def _write_report_image(stream: IO[str], image: IO[bytes], mime: str):
+    """将二进制图像流以 Base64 data URI 的形式分块写入报告。"""
+    stream.write(_REPORT_IMAGE_HEAD.format(mime=mime))
+    while True:
+        chunk = image.read(REPORT_IMAGE_CHUNK)
+        if not chunk:
+            break
+        stream.write(base64.b64encode(chunk).decode('ascii'))
+    stream.write(_REPORT_IMAGE_TAIL)
+
+
+def _write_report_foot(stream: IO[str]):
+    """写入报告生成时间和文档结尾。"""
+    stream.write(f"""
+        <div class="text-center text-xs text-gray-400 mt-10 pt-4 border-t border-gray-200">
+            报告生成时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+
+def write_html_report(stream: IO[str], connections: List['ConnectionType'],
+                      render_image: Optional[Callable[[IO[bytes]], None]] = None, image_mime: str = 'image/png',
+                      group_by_device: bool = False, page_size: Optional[int] = REPORT_PAGE_SIZE,
+                      progress: Optional[Callable[[int, str], None]] = None):
+    """
+    以流的方式写入包含拓扑图 (可选) 和连接列表的 HTML 报告，内存占用与连接数无关。
+
+    提供 render_image 时，拓扑图在另一个线程中渲染到临时文件，同时连接表格写入另一个临时文件；
+    两者都完成后再依次拷贝到输出流 (拓扑图位于表格之前)。
+
+    Args:
+        stream (IO[str]): 以文本模式 (UTF-8) 打开的输出流。
+        connections (List['ConnectionType']): 连接列表。
+        render_image (Optional[Callable[[IO[bytes]], None]]): 将拓扑图写入二进制流的函数；
+            为 None 时 (例如命令行导出) 报告中不包含拓扑图。
+        image_mime (str): 拓扑图的 MIME 类型。
+        group_by_device (bool): 是否按设备分组列出连接 (见 write_report_tables)。
+        page_size (Optional[int]): 不分组时每页的连接数；为 None 或 0 时不分页。
+        progress (Optional[Callable[[int, str], None]]): 进度回调 (百分比, 说明)。
+
+    Raises:
+        Exception: render_image 抛出的异常会传播给调用方。
+    """
+    if render_image is None:
+        stream.write(_REPORT_HEAD)
+        write_report_tables(stream, connections, group_by_device, page_size, progress)
+        _write_report_foot(stream)
+        return
+
+    with tempfile.TemporaryFile() as image_file, \
+            tempfile.TemporaryFile('w+', encoding='utf-8') as table_file, \
+            ThreadPoolExecutor(max_workers=1) as executor:
+        rendering = executor.submit(render_image, image_file)
+        write_report_tables(table_file, connections, group_by_device, page_size, progress)
+        rendering.result() # 等待渲染完成，并传播渲染中的异常
+        image_file.seek(0)
+        table_file.seek(0)
+        stream.write(_REPORT_HEAD)
+        _write_report_image(stream, image_file, image_mime)
+        shutil.copyfileobj(table_file, stream)
+        _write_report_foot(stream)
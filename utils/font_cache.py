@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+utils/font_cache.py
+
+缓存字体文件解析出的字体家族名称，避免每次启动都通过 Matplotlib 解析字体文件。
+缓存保存在用户缓存目录下的一个小 JSON 文件中，字体文件的大小或修改时间变化时自动失效。
+"""
+
+import os
+import sys
+import json
+from typing import Dict, Optional
+
+APP_CACHE_DIR_NAME = 'MediorNetTDM'   # 用户缓存目录下的子目录名
+FONT_CACHE_FILE_NAME = 'font_cache.json'
+
+
+def get_cache_dir() -> str:
+    """
+    返回应用程序的用户缓存目录 (不保证已存在)。
+
+    Returns:
+        str: Windows 下为 %LOCALAPPDATA%/MediorNetTDM，macOS 下为 ~/Library/Caches/MediorNetTDM，
+             其他系统为 $XDG_CACHE_HOME (默认 ~/.cache)/MediorNetTDM。
+    """
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, APP_CACHE_DIR_NAME)
+
+
+def _cache_file() -> str:
+    return os.path.join(get_cache_dir(), FONT_CACHE_FILE_NAME)
+
+
+def _file_signature(font_path: str) -> Optional[Dict[str, float]]:
+    """返回字体文件的大小和修改时间，文件不存在时返回 None。"""
+    try:
+        stat = os.stat(font_path)
+    except OSError:
+        return None
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _load_entries() -> Dict[str, Dict]:
+    try:
+        with open(_cache_file(), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('fonts', {}) if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def load_cached_font_family(font_path: str) -> Optional[str]:
+    """
+    从缓存中读取字体文件对应的字体家族名称。
+
+    Args:
+        font_path (str): 字体文件路径。
+
+    Returns:
+        Optional[str]: 缓存的家族名称；无缓存或字体文件已变化时返回 None。
+    """
+    signature = _file_signature(font_path)
+    if signature is None:
+        return None
+    entry = _load_entries().get(os.path.abspath(font_path))
+    if not isinstance(entry, dict) or entry.get('size') != signature['size'] or entry.get('mtime') != signature['mtime']:
+        return None
+    family = entry.get('family')
+    return family if isinstance(family, str) and family else None
+
+
+def save_cached_font_family(font_path: str, family: str):
+    """
+    将字体文件解析出的家族名称写入缓存 (写入失败只打印警告)。
+
+    Args:
+        font_path (str): 字体文件路径。
+        family (str): 字体家族名称。
+    """
+    signature = _file_signature(font_path)
+    if signature is None:
+        return
+    entries = _load_entries()
+    entries[os.path.abspath(font_path)] = dict(signature, family=family)
+    try:
+        os.makedirs(get_cache_dir(), exist_ok=True)
+        tmp_path = _cache_file() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fonts': entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, _cache_file())
+    except OSError as e:
+        print(f"警告: 无法写入字体缓存 {_cache_file()}: {e}")
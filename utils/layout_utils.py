@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+utils/layout_utils.py
+
+提供基于 NumPy 的拓扑布局算法，用于大规模拓扑图的快速布局计算。
+"""
+
+import math
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 父网格相邻区域内的 6 x 6 个子网格，实际偏移量按本格坐标奇偶性修正
+_OFFSET_A, _OFFSET_B = (grid.ravel() for grid in np.meshgrid(np.arange(6), np.arange(6), indexing='ij'))
+
+
+def _grid_neighbor_pairs(cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    查找位于同一网格或相邻 8 个网格内的所有节点对。
+
+    通过排序网格键并用 searchsorted 定位相邻网格，排序 O(N log N)，
+    配对数量为 O(N * 平均网格密度)。
+
+    Args:
+        cells (np.ndarray): 每个节点所在网格的整数坐标 (N x 2)，需为非负数。
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 节点对的索引数组 (i, j)，不含 i == j。
+    """
+    n = cells.shape[0]
+    cells = cells + 1  # 保证邻居网格坐标非负
+    stride = int(cells[:, 1].max()) + 2
+    keys = cells[:, 0] * stride + cells[:, 1]
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    pair_i: List[np.ndarray] = []
+    pair_j: List[np.ndarray] = []
+    all_idx = np.arange(n)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            target = keys + dx * stride + dy
+            lo = np.searchsorted(sorted_keys, target, side='left')
+            hi = np.searchsorted(sorted_keys, target, side='right')
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            starts = np.repeat(lo, counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            pair_i.append(np.repeat(all_idx, counts))
+            pair_j.append(order[starts + offsets])
+
+    if not pair_i:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    i = np.concatenate(pair_i)
+    j = np.concatenate(pair_j)
+    mask = i != j
+    return i[mask], j[mask]
+
+
+def _repulsion(pos: np.ndarray, unit: np.ndarray, levels: int, k: float) -> np.ndarray:
+    """
+    计算所有节点受到的斥力 (Barnes-Hut 式的多层网格近似)。
+
+    在第 L 层 (2^L x 2^L 网格) 上，节点与"父网格相邻区域内、但不与本格相邻"的
+    网格聚合体 (质量中心) 相互作用，每层每个节点最多 27 个聚合体；
+    最细一层的相邻网格内节点对精确计算。总复杂度 O(N log N)。
+
+    Args:
+        pos (np.ndarray): 节点坐标数组 (N x 2)。
+        unit (np.ndarray): 归一化到 [0, 1) 的节点坐标 (N x 2)，用于划分网格。
+        levels (int): 最细网格的层数。
+        k (float): 理想边长。
+
+    Returns:
+        np.ndarray: 每个节点受到的斥力 (N x 2)。
+    """
+    n = pos.shape[0]
+    force = np.zeros((n, 2))
+    k_sq = k * k
+
+    for level in range(2, levels + 1):
+        size = 1 << level
+        cells = np.minimum((unit * size).astype(np.int64), size - 1)
+        keys = cells[:, 0] * size + cells[:, 1]
+        mass = np.bincount(keys, minlength=size * size).astype(float)
+        safe_mass = np.maximum(mass, 1.0)
+        centroid_x = np.bincount(keys, weights=pos[:, 0], minlength=size * size) / safe_mass
+        centroid_y = np.bincount(keys, weights=pos[:, 1], minlength=size * size) / safe_mass
+
+        # 所有节点 x 36 个候选网格一次性计算
+        target_x = cells[:, 0:1] + (_OFFSET_A[None, :] - 2 - (cells[:, 0:1] & 1))
+        target_y = cells[:, 1:2] + (_OFFSET_B[None, :] - 2 - (cells[:, 1:2] & 1))
+        valid = ((np.abs(target_x - cells[:, 0:1]) > 1) | (np.abs(target_y - cells[:, 1:2]) > 1)) & \
+                (target_x >= 0) & (target_x < size) & (target_y >= 0) & (target_y < size)
+        target = np.where(valid, target_x * size + target_y, 0)
+        weight = np.where(valid, mass[target], 0.0)
+        delta_x = pos[:, 0:1] - centroid_x[target]
+        delta_y = pos[:, 1:2] - centroid_y[target]
+        scale = weight * k_sq / np.maximum(delta_x * delta_x + delta_y * delta_y, 1e-12)
+        force[:, 0] += (delta_x * scale).sum(axis=1)
+        force[:, 1] += (delta_y * scale).sum(axis=1)
+
+    # 最细一层：相邻网格内的节点对精确计算
+    size = 1 << levels
+    cells = np.minimum((unit * size).astype(np.int64), size - 1)
+    i, j = _grid_neighbor_pairs(cells)
+    if i.size:
+        delta = pos[i] - pos[j]
+        scale = k_sq / np.maximum(np.einsum('ij,ij->i', delta, delta), 1e-12)
+        force[:, 0] += np.bincount(i, weights=delta[:, 0] * scale, minlength=n)
+        force[:, 1] += np.bincount(i, weights=delta[:, 1] * scale, minlength=n)
+    return force
+
+
+def fruchterman_reingold_layout(node_ids: List[Hashable],
+                                edges: Iterable[Tuple[Hashable, Hashable]],
+                                groups: Optional[Dict[Hashable, Hashable]] = None,
+                                iterations: int = 50,
+                                seed: int = 42,
+                                k: Optional[float] = None) -> Dict[Hashable, Tuple[float, float]]:
+    """
+    向量化的 Fruchterman-Reingold 力导向布局。
+
+    斥力使用多层网格近似 (与 Barnes-Hut 相同的思路，远处节点按网格聚合)，
+    引力沿边精确计算。每次迭代的复杂度为 O(N log N + E)。
+
+    Args:
+        node_ids (List[Hashable]): 节点 ID 列表。
+        edges (Iterable[Tuple[Hashable, Hashable]]): 边列表 (节点 ID 对)。
+        groups (Optional[Dict[Hashable, Hashable]]): 节点 ID -> 分组键 (例如设备类型)。
+            提供时，同组节点初始放在同一扇区、相互吸引，跨组边的引力被削弱，形成按组聚集的布局。
+        iterations (int): 迭代次数。
+        seed (int): 随机种子，保证布局可复现。
+        k (Optional[float]): 理想边长，默认为 sqrt(1/N)。
+
+    Returns:
+        Dict[Hashable, Tuple[float, float]]: 节点 ID -> 坐标，坐标已缩放到 [-1, 1]。
+    """
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {node_ids[0]: (0.0, 0.0)}
+
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    edge_pairs = [(index[u], index[v]) for u, v in edges if u in index and v in index and u != v]
+    src = np.fromiter((u for u, _ in edge_pairs), dtype=np.int64, count=len(edge_pairs))
+    dst = np.fromiter((v for _, v in edge_pairs), dtype=np.int64, count=len(edge_pairs))
+
+    rng = np.random.default_rng(seed)
+    k = k if k is not None else math.sqrt(1.0 / n)
+    # 最细网格平均每格约 2 个节点
+    levels = max(2, min(9, int(math.ceil(math.log(max(n / 2.0, 1.0), 4)))))
+
+    # 初始位置：分组时每组放在圆周上的一个扇区附近
+    group_idx = None
+    num_groups = 0
+    if groups:
+        group_keys = sorted({groups.get(node_id) for node_id in node_ids}, key=str)
+        num_groups = len(group_keys)
+        key_to_idx = {g: i for i, g in enumerate(group_keys)}
+        group_idx = np.fromiter((key_to_idx[groups.get(node_id)] for node_id in node_ids), dtype=np.int64, count=n)
+    if group_idx is not None and num_groups > 1:
+        angles = 2.0 * math.pi * group_idx / num_groups
+        anchors = 0.5 + 0.3 * np.column_stack((np.cos(angles), np.sin(angles)))
+        pos = anchors + rng.uniform(-0.1, 0.1, size=(n, 2))
+    else:
+        group_idx = None
+        pos = rng.uniform(0.0, 1.0, size=(n, 2))
+
+    # 分组时削弱跨组边的引力，让同组节点聚在一起 (对全 Mesh 拓扑尤其重要)
+    edge_weight = 1.0
+    if group_idx is not None and src.size:
+        edge_weight = np.where(group_idx[src] == group_idx[dst], 1.0, 0.2)
+
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    gravity = 0.1 * k
+    group_strength = 0.5 * k
+
+    for _ in range(iterations):
+        # 网格范围取 1%~99% 分位数，避免少数离群节点把其余节点压进少数网格
+        lower, upper = np.quantile(pos, [0.01, 0.99], axis=0)
+        span = max(float((upper - lower).max()), 1e-9)
+        unit = np.clip((pos - lower) / span, 0.0, 1.0 - 1e-9)
+
+        # 斥力
+        disp = _repulsion(pos, unit, levels, k)
+
+        # 引力 (沿边)
+        if src.size:
+            delta = pos[src] - pos[dst]
+            scale = np.sqrt(np.einsum('ij,ij->i', delta, delta)) / k * edge_weight
+            fx = delta[:, 0] * scale
+            fy = delta[:, 1] * scale
+            disp[:, 0] += np.bincount(dst, weights=fx, minlength=n) - np.bincount(src, weights=fx, minlength=n)
+            disp[:, 1] += np.bincount(dst, weights=fy, minlength=n) - np.bincount(src, weights=fy, minlength=n)
+
+        # 向心力，防止不连通的分量漂离
+        disp -= (pos - pos.mean(axis=0)) * gravity
+
+        # 组内聚集力
+        if group_idx is not None:
+            counts = np.bincount(group_idx, minlength=num_groups).astype(float)
+            centroids = np.column_stack((
+                np.bincount(group_idx, weights=pos[:, 0], minlength=num_groups) / counts,
+                np.bincount(group_idx, weights=pos[:, 1], minlength=num_groups) / counts,
+            ))
+            disp -= (pos - centroids[group_idx]) * group_strength
+
+        # 按温度限制位移
+        length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    # 缩放到 [-1, 1]，与 NetworkX 的布局输出范围一致
+    pos -= pos.mean(axis=0)
+    max_extent = np.abs(pos).max()
+    if max_extent > 0:
+        pos /= max_extent
+
+    return {node_id: (float(pos[i, 0]), float(pos[i, 1])) for i, node_id in enumerate(node_ids)}
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+utils/startup_timer.py
+
+记录应用程序启动各阶段的耗时，并在主窗口可交互后输出启动耗时报告。
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+STARTUP_TARGET_MS = 1000.0 # 主窗口可交互的目标耗时 (毫秒)
+
+
+class StartupTimer:
+    """按顺序记录启动阶段的时间点。"""
+
+    def __init__(self, start: Optional[float] = None):
+        """
+        初始化计时器。
+
+        Args:
+            start (Optional[float]): 起始时间 (time.perf_counter())，默认为当前时间。
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, stage: str):
+        """记录一个阶段结束的时间点。"""
+        self.marks.append((stage, time.perf_counter()))
+
+    def elapsed_ms(self) -> float:
+        """返回从起始到最后一个时间点的总耗时 (毫秒)。"""
+        last = self.marks[-1][1] if self.marks else time.perf_counter()
+        return (last - self.start) * 1000.0
+
+    def report(self) -> str:
+        """
+        生成启动耗时报告。
+
+        Returns:
+            str: 每个阶段的耗时及总耗时，总耗时超过 STARTUP_TARGET_MS 时附带提示。
+        """
+        lines = ["启动耗时报告:"]
+        previous = self.start
+        for stage, timestamp in self.marks:
+            lines.append(f"  {stage:<16} {(timestamp - previous) * 1000.0:8.1f} ms")
+            previous = timestamp
+        total = self.elapsed_ms()
+        lines.append(f"  {'总计':<16} {total:8.1f} ms")
+        if total > STARTUP_TARGET_MS:
+            lines.append(f"  警告: 启动耗时超过目标 {STARTUP_TARGET_MS:.0f} ms")
+        return "\n".join(lines)